@@ -18,6 +18,8 @@ import sys
 from typing import Dict, List, Tuple, Optional
 from collections import defaultdict
 
+from user_lsh import UserLSHIndex
+
 
 class MovieRecommender:
     """
@@ -30,6 +32,7 @@ class MovieRecommender:
         self.ratings = defaultdict(list)  # movie_name -> [(rating, user_id), ...]
         self.user_ratings = defaultdict(list)  # user_id -> [(movie_name, rating), ...]
         self.data_loaded = False
+        self.neighbor_index = None  # UserLSHIndex, built on demand
     
     def load_movies(self, filename: str) -> bool:
         """
@@ -115,6 +118,7 @@ class MovieRecommender:
             
             print(f"Successfully loaded ratings for {len(self.ratings)} movies from '{filename}'")
             self.data_loaded = True
+            self.neighbor_index = None
             return True
             
         except Exception as e:
@@ -303,6 +307,68 @@ class MovieRecommender:
                     break
         
         return recommendations
+    
+    def build_neighbor_index(self, num_bands: int = 16, rows_per_band: int = 4,
+                             max_candidates: Optional[int] = None) -> UserLSHIndex:
+        """
+        Build the approximate user-user similarity index from loaded ratings.
+        
+        Args:
+            num_bands (int): Number of LSH bands (higher = better recall)
+            rows_per_band (int): MinHash rows per band (higher = faster, lower recall)
+            max_candidates (Optional[int]): Max bucket-mates scored per query (None = all)
+            
+        Returns:
+            UserLSHIndex: The index, also stored on self.neighbor_index
+        """
+        self.neighbor_index = UserLSHIndex.from_user_ratings(
+            self.user_ratings, num_bands=num_bands, rows_per_band=rows_per_band,
+            max_candidates=max_candidates)
+        return self.neighbor_index
+    
+    def recommend_from_neighbors(self, user_id: str, n: int = 3, k: int = 20) -> List[str]:
+        """
+        Recommend n movies liked by the users most similar to the given user.
+        
+        Neighbors come from the LSH index (built on first use). Each unrated
+        movie is scored by its similarity-weighted average rating among them.
+        
+        Args:
+            user_id (str): The user ID to recommend movies for
+            n (int): Number of movies to recommend (default: 3)
+            k (int): Number of neighbors to consult (default: 20)
+            
+        Returns:
+            List[str]: List of recommended movie names
+        """
+        if not self.data_loaded:
+            print("Error: No data loaded. Please load movies and ratings first.")
+            return []
+        
+        if user_id not in self.user_ratings:
+            print(f"User '{user_id}' not found in ratings data.")
+            return []
+        
+        if self.neighbor_index is None:
+            self.build_neighbor_index()
+        
+        neighbors = self.neighbor_index.nearest_neighbors(user_id, k)
+        user_rated_movies = {movie_name for movie_name, _ in self.user_ratings[user_id]}
+        
+        weighted_sum = defaultdict(float)
+        weight_total = defaultdict(float)
+        for neighbor_id, similarity in neighbors:
+            for movie_name, rating in self.user_ratings[neighbor_id]:
+                if movie_name not in user_rated_movies:
+                    weighted_sum[movie_name] += similarity * rating
+                    weight_total[movie_name] += similarity
+        
+        scored = [(movie_name, weighted_sum[movie_name] / weight_total[movie_name])
+                  for movie_name in weighted_sum]
+        # Sort by weighted rating (descending), then by movie name (ascending) for ties
+        scored.sort(key=lambda x: (-x[1], x[0]))
+        
+        return [movie_name for movie_name, _ in scored[:n]]
 
 
 def display_menu():
@@ -529,6 +529,54 @@ Third Movie (2000)|4.0|user1"""
     print("\n+ All case sensitivity tests passed!")
 
 
+def test_neighbor_recommendations():
+    """Test LSH neighbor search and neighbor-based recommendations."""
+    print("\n" + "="*60)
+    print("TESTING NEIGHBOR-BASED RECOMMENDATIONS")
+    print("="*60)
+    
+    movies_file, ratings_file = create_test_files()
+    
+    try:
+        recommender = MovieRecommender()
+        recommender.load_movies(movies_file)
+        recommender.load_ratings(ratings_file)
+        
+        # Test index construction
+        print("\n1. Testing neighbor index...")
+        index = recommender.build_neighbor_index(num_bands=32, rows_per_band=1)
+        assert len(index) == len(recommender.user_ratings), "Not every user was indexed"
+        print("+ Neighbor index built for all users")
+        
+        # user1 and user2 share many titles, user4 only rated Shawshank
+        print("\n2. Testing nearest neighbors...")
+        neighbors = index.nearest_neighbors("user1", 2)
+        print(f"Neighbors of user1: {neighbors}")
+        assert neighbors and neighbors[0][0] == "user2", f"Expected user2 as top neighbor, got {neighbors}"
+        assert index.nearest_neighbors("unknown_user", 2) == [], "Unknown user should have no neighbors"
+        print("+ Nearest neighbor search working")
+        
+        # Test recommendations exclude already rated movies
+        print("\n3. Testing neighbor recommendations...")
+        recommendations = recommender.recommend_from_neighbors("user1", 3)
+        print(f"Neighbor recommendations for user1: {recommendations}")
+        rated = {movie_name for movie_name, _ in recommender.user_ratings["user1"]}
+        assert recommendations, "Expected at least one recommendation"
+        assert not rated.intersection(recommendations), "Recommended an already rated movie"
+        assert recommendations[0] == "The Shawshank Redemption (1994)", f"Unexpected top pick {recommendations[0]}"
+        assert recommender.recommend_from_neighbors("unknown_user", 3) == [], "Unknown user should get nothing"
+        print("+ Neighbor recommendations working")
+        
+        # Reloading ratings must invalidate the index
+        recommender.load_ratings(ratings_file)
+        assert recommender.neighbor_index is None, "Index not invalidated on reload"
+        print("+ Index invalidated on reload")
+        
+    finally:
+        os.unlink(movies_file)
+        os.unlink(ratings_file)
+
+
 def run_comprehensive_tests():
     """Run all comprehensive tests."""
     print("MOVIE RECOMMENDATION SYSTEM - COMPREHENSIVE TEST SUITE")
@@ -540,6 +588,7 @@ def run_comprehensive_tests():
         test_tie_behavior()
         test_data_validation()
         test_case_sensitivity()
+        test_neighbor_recommendations()
         
         print("\n" + "="*60)
         print("ALL TESTS PASSED SUCCESSFULLY!")
@@ -555,6 +604,7 @@ def run_comprehensive_tests():
         print("+ Data validation and sanitization")
         print("+ Case sensitivity handling")
         print("+ Tie-breaking behavior")
+        print("+ Neighbor-based recommendations")
         
     except Exception as e:
         print(f"\nX TEST FAILED: {e}")
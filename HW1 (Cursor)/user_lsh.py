@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Approximate User-User Similarity Search
+
+A MinHash locality-sensitive-hashing index over each user's set of rated
+movie titles. Users whose rated sets overlap heavily land in the same
+band buckets with high probability, so k-nearest-neighbor queries only
+score the users sharing a bucket instead of every user.
+
+Tuning knobs:
+- num_bands / rows_per_band: more bands raise recall, more rows per band
+  make buckets stricter (faster queries, lower recall)
+- max_candidates: cap on how many bucket-mates are scored exactly
+
+Python Version: 3.12+
+"""
+
+import hashlib
+import random
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+# Mersenne prime used for the universal hash family (a * x + b) mod p
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def _title_hash(title: str) -> int:
+    """Stable 64-bit hash of a title (independent of PYTHONHASHSEED)."""
+    return int.from_bytes(hashlib.blake2b(title.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    """Exact Jaccard similarity of two title sets."""
+    if not a and not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class UserLSHIndex:
+    """
+    MinHash LSH index answering approximate nearest-neighbor user queries.
+    """
+
+    def __init__(self, num_bands: int = 16, rows_per_band: int = 4,
+                 max_candidates: Optional[int] = None, seed: int = 42):
+        """
+        Initialize an empty index.
+
+        Args:
+            num_bands (int): Number of LSH bands (higher = better recall)
+            rows_per_band (int): MinHash rows per band (higher = stricter buckets)
+            max_candidates (Optional[int]): Max bucket-mates scored per query (None = all)
+            seed (int): Seed for the MinHash permutations
+        """
+        if num_bands <= 0 or rows_per_band <= 0:
+            raise ValueError("num_bands and rows_per_band must be positive")
+        self.num_bands = num_bands
+        self.rows_per_band = rows_per_band
+        self.max_candidates = max_candidates
+
+        rng = random.Random(seed)
+        num_perm = num_bands * rows_per_band
+        self._perms = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+                       for _ in range(num_perm)]
+
+        self.user_titles: Dict[str, Set[str]] = {}
+        self._signatures: Dict[str, Tuple[int, ...]] = {}
+        self._buckets: List[Dict[Tuple[int, ...], List[str]]] = [defaultdict(list) for _ in range(num_bands)]
+
+    @classmethod
+    def from_user_ratings(cls, user_ratings: Dict[str, List[Tuple[str, float]]], **kwargs) -> "UserLSHIndex":
+        """
+        Build an index from MovieRecommender.user_ratings.
+
+        Args:
+            user_ratings: Mapping user_id -> [(movie_name, rating), ...]
+            **kwargs: Index parameters passed to the constructor
+
+        Returns:
+            UserLSHIndex: The populated index
+        """
+        index = cls(**kwargs)
+        for user_id, rated in user_ratings.items():
+            index.add_user(user_id, (movie_name for movie_name, _ in rated))
+        return index
+
+    def signature(self, titles: Iterable[str]) -> Tuple[int, ...]:
+        """
+        Compute the MinHash signature of a title set.
+
+        Args:
+            titles (Iterable[str]): Titles rated by one user
+
+        Returns:
+            Tuple[int, ...]: One minimum hash value per permutation
+        """
+        hashes = [_title_hash(t) for t in titles]
+        if not hashes:
+            return ()
+        p = _MERSENNE_PRIME
+        return tuple(min((a * h + b) % p for h in hashes) for a, b in self._perms)
+
+    def add_user(self, user_id: str, titles: Iterable[str]) -> None:
+        """
+        Insert (or replace) a user's rated-title set.
+
+        Args:
+            user_id (str): The user ID
+            titles (Iterable[str]): Titles the user has rated
+        """
+        if user_id in self._signatures:
+            self.remove_user(user_id)
+        title_set = set(titles)
+        sig = self.signature(title_set)
+        if not sig:
+            return
+        self.user_titles[user_id] = title_set
+        self._signatures[user_id] = sig
+        for band, key in enumerate(self._band_keys(sig)):
+            self._buckets[band][key].append(user_id)
+
+    def remove_user(self, user_id: str) -> None:
+        """Remove a user from the index (no-op if absent)."""
+        sig = self._signatures.pop(user_id, None)
+        if sig is None:
+            return
+        del self.user_titles[user_id]
+        for band, key in enumerate(self._band_keys(sig)):
+            bucket = self._buckets[band][key]
+            bucket.remove(user_id)
+            if not bucket:
+                del self._buckets[band][key]
+
+    def _band_keys(self, sig: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+        r = self.rows_per_band
+        return [sig[band * r:(band + 1) * r] for band in range(self.num_bands)]
+
+    def candidates(self, user_id: str) -> Set[str]:
+        """
+        Users sharing at least one band bucket with the given user.
+
+        Args:
+            user_id (str): The user ID to query
+
+        Returns:
+            Set[str]: Candidate neighbor user IDs (excluding the user)
+        """
+        sig = self._signatures.get(user_id)
+        if sig is None:
+            return set()
+        found = set()
+        for band, key in enumerate(self._band_keys(sig)):
+            found.update(self._buckets[band].get(key, ()))
+        found.discard(user_id)
+        return found
+
+    def nearest_neighbors(self, user_id: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Get approximately the k most similar users by Jaccard similarity.
+
+        Args:
+            user_id (str): The user ID to query
+            k (int): Number of neighbors to return
+
+        Returns:
+            List[Tuple[str, float]]: List of (user_id, similarity) tuples, best first
+        """
+        if user_id not in self.user_titles or k <= 0:
+            return []
+        mine = self.user_titles[user_id]
+        cands = self.candidates(user_id)
+        if self.max_candidates is not None and len(cands) > self.max_candidates:
+            # Prefer candidates whose signatures agree most with the query
+            sig = self._signatures[user_id]
+            cands = sorted(cands, key=lambda u: (-sum(x == y for x, y in zip(sig, self._signatures[u])), u))
+            cands = cands[:self.max_candidates]
+
+        scored = [(other, jaccard(mine, self.user_titles[other])) for other in cands]
+        scored = [(other, sim) for other, sim in scored if sim > 0]
+        # Sort by similarity (descending), then by user ID (ascending) for ties
+        scored.sort(key=lambda x: (-x[1], x[0]))
+        return scored[:k]
+
+    def __len__(self) -> int:
+        return len(self._signatures)
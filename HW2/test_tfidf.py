@@ -0,0 +1,673 @@
+"""
+test_tfidf.py
+Checks for tfidf.py and its optional modules. Run from anywhere:
+    python test_tfidf.py
+"""
+
+import contextlib
+import io
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+from collections import Counter
+
+import tfidf
+
+
+def print_result(test_name, actual, expected):
+    """Pretty print test comparison."""
+    print(f"\n🔹 {test_name}")
+    print(f"   Expected: {expected}")
+    print(f"   Actual:   {actual}")
+    if actual == expected:
+        print("   ✅ PASS")
+    else:
+        print("   ❌ FAIL")
+
+
+def dict_top_n(doc_counts, n, terms=None):
+    """Top-n lists from the plain dict pipeline (compute_idf + document_top_n)."""
+    idf = tfidf.compute_idf(doc_counts)
+    return [tfidf.document_top_n(counts, idf, n, terms) for counts in doc_counts]
+
+
+def tied_corpus(rng, n_docs, vocab_size, doc_lengths):
+    """
+    Term counts over a tiny vocabulary, so many words tie on score. Words
+    in every document have idf 1, and lengths like 8, 40 or 200 make their
+    tf (hence score) land exactly on .xx5.
+    """
+    vocab = [f"w{i:02d}" for i in range(vocab_size)]
+    docs = [Counter(rng.choice(vocab) for _ in range(rng.choice(doc_lengths))) for _ in range(n_docs)]
+    for counts in docs:
+        counts["every"] += 1
+    return docs
+
+
+def run_matrix_tests():
+    from tfidf_matrix import TfidfMatrix  # needs numpy
+
+    # --- Test 1: sparse top_n matches the dict pipeline on tie-heavy corpora ---
+    rng = random.Random(44)
+    same = True
+    for trial in range(200):
+        docs = tied_corpus(rng, rng.randint(1, 12), rng.randint(1, 8), (7, 8, 39, 40, 199, 200))
+        matrix = TfidfMatrix.from_counts(docs)
+        for n in (0, 1, 3, 5, 50):
+            if matrix.top_n(n) != dict_top_n(docs, n):
+                same = False
+                print(f"   mismatch: trial {trial}, n={n}")
+    print_result("sparse top_n == dict pipeline (ties, .xx5 scores)", same, True)
+
+    # --- Test 2: half-way scores really occur and are rounded like round() ---
+    docs = [Counter({"a": 1, "b": 7}), Counter({"a": 3, "b": 5}), Counter({"a": 5, "b": 35})]
+    print_result("half-way scores", TfidfMatrix.from_counts(docs).top_n(2), dict_top_n(docs, 2))
+    print_result("half-way score rounded up", TfidfMatrix.from_counts(docs).top_n(2)[0], [("b", 0.88), ("a", 0.13)])
+
+    # --- Test 3: counts by term ID give the same lists ---
+    pre = tfidf.Preprocessor(set())
+    docs = tied_corpus(rng, 10, 6, (8, 40))
+    id_docs = [pre.counts_by_id(counts) for counts in docs]
+    print_result("term-ID counts", TfidfMatrix.from_counts(id_docs, pre.terms).top_n(5),
+                 dict_top_n(id_docs, 5, pre.terms))
+
+
+WORDS = ("apple", "banana", "running", "quickly", "payment", "thing", "the", "and", "data",
+         "mining", "model", "sing", "slowly", "report", "statement", "it's", "e-mail")
+STOPWORDS = ("the", "and", "it")
+
+
+def random_text(rng, n_words):
+    words = [rng.choice(WORDS) for _ in range(n_words)]
+    if rng.random() < 0.3:
+        words.insert(rng.randrange(n_words + 1), "https://example.com/a?b=1")
+    return " ".join(words) + "\n"
+
+
+def run_main(directory, docs, doc_list, stopwords, **kwargs):
+    """
+    Bring directory's inputs to docs ({name: text}), doc_list and stopwords,
+    run tfidf.main(**kwargs) there and return its outputs {name: bytes}.
+    """
+    os.makedirs(directory, exist_ok=True)
+    for name in os.listdir(directory):
+        if name.startswith("doc") and name not in docs:
+            os.remove(os.path.join(directory, name))
+    for name, text in docs.items():
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                if f.read() == text:
+                    continue
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        # an edit must always look changed, even within one mtime tick
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    with open(os.path.join(directory, "tfidf_docs.txt"), "w", encoding="utf-8") as f:
+        f.write("\n".join(doc_list) + "\n")
+    with open(os.path.join(directory, "stopwords.txt"), "w", encoding="utf-8") as f:
+        f.write("\n".join(stopwords) + "\n")
+
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            tfidf.main(**kwargs)
+    finally:
+        os.chdir(cwd)
+    outputs = {}
+    for name in os.listdir(directory):
+        if name.startswith(("preproc_", "tfidf_")) and name != "tfidf_docs.txt":
+            with open(os.path.join(directory, name), "rb") as f:
+                outputs[name] = f.read()
+    return outputs
+
+
+def same_as_fresh_run(tmp, directory, docs, doc_list, stopwords, **kwargs):
+    """
+    Run tfidf.main(**kwargs) in directory, then the plain pipeline in a
+    new directory; True if every output of the plain run is byte-identical.
+    """
+    outputs = run_main(directory, docs, doc_list, stopwords, **kwargs)
+    fresh_dir = tempfile.mkdtemp(dir=tmp)
+    fresh = run_main(fresh_dir, docs, doc_list, stopwords)
+    shutil.rmtree(fresh_dir)
+    return bool(fresh) and all(outputs.get(name) == data for name, data in fresh.items())
+
+
+def run_index_tests(tmp):
+    rng = random.Random(45)
+    docs = {f"doc{i}.txt": random_text(rng, rng.randint(0, 40)) for i in range(12)}
+    doc_list = sorted(docs) + ["doc_missing.txt"]
+    stopwords = list(STOPWORDS)
+    work = os.path.join(tmp, "index")
+    index_path = os.path.join(work, ".tfidf_index.pkl")
+
+    # --- Test 4: a first indexed run matches the plain pipeline ---
+    print_result("index: first run", same_as_fresh_run(tmp, work, docs, doc_list, stopwords,
+                                                       index_path=index_path), True)
+
+    # --- Test 5: editing a document ---
+    docs["doc3.txt"] = random_text(rng, 30) + "payment payment mining\n"
+    print_result("index: edited document", same_as_fresh_run(tmp, work, docs, doc_list, stopwords,
+                                                            index_path=index_path), True)
+
+    # --- Test 6: adding a document with only new words: no document frequency
+    # of the others moves, but the corpus size and so every idf does ---
+    docs["doc12.txt"] = "zebra quartz zebra\n"
+    doc_list.append("doc12.txt")
+    print_result("index: added document", same_as_fresh_run(tmp, work, docs, doc_list, stopwords,
+                                                           index_path=index_path), True)
+
+    # --- Test 7: dropping a document from the list ---
+    doc_list.remove("doc5.txt")
+    print_result("index: dropped document", same_as_fresh_run(tmp, work, docs, doc_list, stopwords,
+                                                             index_path=index_path), True)
+
+    # --- Test 8: a document listed twice counts twice in the frequencies ---
+    doc_list.append("doc7.txt")
+    print_result("index: duplicate list entry", same_as_fresh_run(tmp, work, docs, doc_list, stopwords,
+                                                                 index_path=index_path), True)
+
+    # --- Test 9: a deleted preproc_ file is written again ---
+    os.remove(os.path.join(work, "preproc_doc1.txt"))
+    print_result("index: deleted preproc_ file", same_as_fresh_run(tmp, work, docs, doc_list, stopwords,
+                                                                  index_path=index_path), True)
+
+    # --- Test 10: same-sized edit of a document that shares terms with others ---
+    docs["doc2.txt"] = docs["doc2.txt"].replace("apple", "model")
+    print_result("index: same-size edit", same_as_fresh_run(tmp, work, docs, doc_list, stopwords,
+                                                           index_path=index_path), True)
+
+    # --- Test 11: changing the stopwords reprocesses everything ---
+    stopwords.append("data")
+    print_result("index: stopwords changed", same_as_fresh_run(tmp, work, docs, doc_list, stopwords,
+                                                              index_path=index_path), True)
+
+
+# pieces that stress chunk boundaries: URLs, punctuation, Unicode letters and whitespace
+FUZZ_PIECES = ("running", "payment", "quickly", "the", "it's", "e-mail", "naïve", "東京", "thing",
+               "https://example.com/x?y=1", "http://a.b/c", "x" * 23, "supercalifragilisticly",
+               "!!", "...", " ", "  ", "\n", "\t", "\u00a0", "\u2003", "\u3000", "\r\n")
+
+
+def run_stream_tests(tmp):
+    # --- Test 12: streaming in tiny chunks preprocesses exactly like the whole text ---
+    rng = random.Random(48)
+    stopwords = {"the", "it"}
+    path = os.path.join(tmp, "stream_doc.txt")
+    same = True
+    for trial in range(300):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("".join(rng.choice(FUZZ_PIECES) for _ in range(rng.randint(0, 40))))
+        with open(path, encoding="utf-8") as f:
+            expected = list(tfidf.tokenize(f.read(), stopwords))
+        for chunk_size in range(1, 11):
+            pre = tfidf.Preprocessor(stopwords)
+            output = tfidf.CollectOutput()
+            counts = tfidf.stream_file(path, pre, chunk_size, output)
+            if output.text != " ".join(expected) or pre.counts_by_term(counts) != Counter(expected):
+                same = False
+                print(f"   mismatch: trial {trial}, chunk size {chunk_size}")
+    print_result("stream_file == tokenize (chunk sizes 1-10)", same, True)
+
+
+class RecordingOutput:
+    """Output layout that keeps every document's preproc text in memory."""
+
+    def __init__(self):
+        self.texts = {}
+
+    def write_preproc(self, fname, content):
+        self.texts[fname] = content
+
+    def open_preproc(self, fname):
+        output = self
+
+        class Writer(list):
+            def close(self):
+                output.texts[fname] = "".join(self)
+        writer = Writer()
+        writer.write = writer.append
+        return writer
+
+
+def cached_run(paths, stopwords, directory, max_bytes=None, workers=1, chunk_size=None):
+    """(preproc texts, term counts, cache stats) of one count_documents run through a cache."""
+    from tfidf_cache import PreprocessCache, DEFAULT_MAX_BYTES
+    cache = PreprocessCache(stopwords, directory, max_bytes or DEFAULT_MAX_BYTES)
+    output = RecordingOutput()
+    counts = tfidf.count_documents(paths, stopwords, workers, None, chunk_size, output, cache)
+    return output.texts, counts, cache.stats()
+
+
+def entry_count(directory):
+    from tfidf_cache import ENTRY_SUFFIX
+    return sum(name.endswith(ENTRY_SUFFIX) for _, _, names in os.walk(directory) for name in names)
+
+
+def run_cache_tests(tmp):
+    import tfidf_cache
+    rng = random.Random(50)
+    docs = {f"doc{i}.txt": random_text(rng, rng.randint(5, 400)) for i in range(20)}
+    docs["doc_empty.txt"] = ""
+    doc_list = sorted(docs) + ["doc_missing.txt"]
+    stopwords = list(STOPWORDS)
+    work = os.path.join(tmp, "cache_main")
+    cache_dir = os.path.join(tmp, "cache")
+
+    # --- Test 13: cold and warm --cache runs write the plain pipeline's outputs ---
+    for label in ("cold", "warm"):
+        print_result(f"cache: {label} run", same_as_fresh_run(tmp, work, docs, doc_list, stopwords,
+                                                              cache_dir=cache_dir), True)
+    print_result("cache: warm --stream/-j run", same_as_fresh_run(tmp, work, docs, doc_list, stopwords,
+                                                                  cache_dir=cache_dir, chunk_size=7,
+                                                                  workers=2), True)
+
+    paths = [os.path.join(work, name) for name in doc_list]
+    n = len(docs)   # the missing document is never looked up
+    plain = RecordingOutput()
+    plain_counts = tfidf.count_documents(paths, stopwords, output=plain)
+
+    # --- Test 14: hits, misses and stores ---
+    counters = ("hits", "misses", "stores", "evictions")
+    directory = os.path.join(tmp, "cache_stats")
+    texts, counts, cold = cached_run(paths, stopwords, directory)
+    print_result("cache stats (cold)", [cold[k] for k in counters], [0, n, n, 0])
+    texts, counts, warm = cached_run(paths, stopwords, directory)
+    print_result("cache stats (warm)", [warm[k] for k in counters], [n, 0, 0, 0])
+    print_result("cache: warm run outputs", (texts, counts), (plain.texts, plain_counts))
+    print_result("cache size on disk", warm["bytes"],
+                 sum(os.path.getsize(os.path.join(d, f)) for d, _, fs in os.walk(directory) for f in fs))
+
+    # --- Test 15: hit/miss counters of -j workers are merged ---
+    texts, counts, merged = cached_run(paths, stopwords, directory, workers=2)
+    print_result("cache stats (-j 2)", [merged[k] for k in counters], [n, 0, 0, 0])
+    print_result("cache: -j 2 outputs", (texts, counts), (plain.texts, plain_counts))
+
+    # --- Test 16: eviction keeps the cache under max_bytes, and outputs stay right ---
+    max_bytes = warm["bytes"] // 3
+    small = os.path.join(tmp, "cache_small")
+    texts, counts, cold = cached_run(paths, stopwords, small, max_bytes)
+    kept = entry_count(small)
+    print_result("eviction (evicted)", (cold["stores"], cold["evictions"] > 0, cold["evictions"]),
+                 (n, True, n - kept))
+    print_result("eviction (under limit)", cold["bytes"] <= max_bytes, True)
+    cache = tfidf_cache.PreprocessCache(stopwords, small, max_bytes)
+    survivors = [p for p in paths if os.path.exists(p) and os.path.exists(cache._path(cache.key(p)))]
+    _, _, hit = cached_run(survivors, stopwords, small, max_bytes)
+    print_result("eviction (survivors hit)", (len(survivors), hit["hits"], hit["misses"]), (kept, kept, 0))
+    # a full scan through a cache this small mostly misses (LRU), but must stay correct
+    texts, counts, again = cached_run(paths, stopwords, small, max_bytes)
+    print_result("eviction (warm run)", (again["hits"] + again["misses"], again["bytes"] <= max_bytes),
+                 (n, True))
+    print_result("eviction (warm run outputs)", (texts, counts), (plain.texts, plain_counts))
+    print_result("eviction (smaller limit on open)",
+                 tfidf_cache.PreprocessCache(stopwords, small, max_bytes // 2).size <= max_bytes // 2, True)
+
+    # --- Test 17: other stopwords or a new tokenizer version never hit old entries ---
+    _, counts, other = cached_run(paths, stopwords + ["data"], directory)
+    print_result("invalidation (stopwords)", (other["hits"], other["misses"]), (0, n))
+    print_result("invalidation (stopwords) counts",
+                 counts, tfidf.count_documents(paths, stopwords + ["data"], output=RecordingOutput()))
+    version = tfidf.PREPROCESS_VERSION
+    tfidf.PREPROCESS_VERSION = version + 1
+    try:
+        _, _, bumped = cached_run(paths, stopwords, directory)
+    finally:
+        tfidf.PREPROCESS_VERSION = version
+    print_result("invalidation (PREPROCESS_VERSION)", (bumped["hits"], bumped["misses"]), (0, n))
+
+    # --- Test 18: hits make entries recently used, so eviction keeps them ---
+    old = 10 ** 18   # ns; well before any entry was written or read
+    for d, _, names in os.walk(directory):
+        for name in names:
+            os.utime(os.path.join(d, name), ns=(old, old))
+    recent = paths[:3]
+    cached_run(recent, stopwords, directory)
+    cache = tfidf_cache.PreprocessCache(stopwords, directory)
+    recent_entries = sorted(cache._path(cache.key(p)) for p in recent)
+    cache.evict(sum(map(os.path.getsize, recent_entries)))
+    left = sorted(os.path.join(d, f) for d, _, fs in os.walk(directory) for f in fs)
+    print_result("eviction keeps recently hit entries", left, recent_entries)
+
+    # --- Test 19: streamed documents are cached and read back the same ---
+    streamed = os.path.join(tmp, "cache_stream")
+    for label in ("cold", "warm"):
+        texts, counts, st = cached_run(paths, stopwords, streamed, chunk_size=5)
+        print_result(f"streamed entries ({label})", (st["hits"], texts, counts),
+                     (0 if label == "cold" else n, plain.texts, plain_counts))
+
+
+# extra pieces for the tokenizer: separators str.split() treats as whitespace,
+# word characters that are not letters, and case mappings that change length
+TOKEN_PIECES = FUZZ_PIECES + ("\x1c", "\x1d", "\x1e", "\x1f", "\x85", "\u2028", "\x0b", "\x0c",
+                              "snake_case", "42", "Ⅻ", "İstanbul", "Straße", "ǅ", "MENT", "Sing",
+                              "café's", "—", "«»", "@#$%", "https://", "://x", "HTTP://X.Y")
+
+
+def run_tokenizer_tests():
+    # --- Test 20: the fused tokenizer matches the original three-step chain ---
+    rng = random.Random(42)
+    stopwords = {"the", "it", "its", "sing"}
+    same = True
+    for trial in range(2000):
+        text = "".join(rng.choice(TOKEN_PIECES) for _ in range(rng.randint(0, 30)))
+        cleaned = tfidf.clean_text(text)
+        expected = tfidf.stem_text(tfidf.remove_stopwords_from_text(cleaned, stopwords)).split()
+        if tfidf.split_words(text) != cleaned.split() or list(tfidf.tokenize(text, stopwords)) != expected:
+            same = False
+            print(f"   mismatch: {text!r}")
+    print_result("tokenize == clean_text -> remove_stopwords_from_text -> stem_text", same, True)
+
+
+def run_cli(directory, *args):
+    """Run tfidf.py as a script in directory; returns (exit code, stderr)."""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tfidf.py")
+    proc = subprocess.run([sys.executable, script, *args], cwd=directory, capture_output=True, text=True)
+    return proc.returncode, proc.stderr
+
+
+def run_worker_tests(tmp):
+    rng = random.Random(43)
+    docs = {f"doc{i}.txt": random_text(rng, rng.randint(0, 300)) for i in range(12)}
+    doc_list = sorted(docs) + ["doc_missing.txt"]
+    stopwords = list(STOPWORDS)
+
+    # --- Test 21: -j N writes byte-identical outputs to -j 1 ---
+    serial = run_main(os.path.join(tmp, "workers_1"), docs, doc_list, stopwords)
+    for workers in (2, 3):
+        parallel = run_main(os.path.join(tmp, f"workers_{workers}"), docs, doc_list, stopwords, workers=workers)
+        print_result(f"-j {workers} outputs == -j 1", (len(parallel), parallel == serial),
+                     (2 * len(doc_list), True))
+
+    # --- Test 22: a negative worker count or an empty --stream chunk is a usage error ---
+    code, err = run_cli(os.path.join(tmp, "workers_1"), "-j", "-1")
+    print_result("-j -1 rejected", (code, "must be 0 (one per CPU) or more" in err), (2, True))
+    for chars in ("0", "-5"):
+        code, err = run_cli(os.path.join(tmp, "workers_1"), "--stream", chars)
+        print_result(f"--stream {chars} rejected", (code, "--stream CHARS must be at least 1" in err), (2, True))
+
+
+def brute_force_scores(doc_counts, names, stopwords, query):
+    """{name: cosine similarity} of every document sharing a term with query, by plain dicts."""
+    idf = tfidf.idf_from_frequencies(tfidf.compute_document_frequencies(doc_counts), len(doc_counts))
+
+    def unit(counts):
+        vector = {w: tf * idf[w] for w, tf in tfidf.compute_tf_from_counts(counts).items() if w in idf}
+        norm = sum(v * v for v in vector.values()) ** 0.5
+        return {w: v / norm for w, v in vector.items()}
+
+    q = unit(Counter(tfidf.tokenize(query, stopwords)))
+    scores = {}
+    for name, counts in zip(names, doc_counts):
+        d = unit(counts)
+        if q.keys() & d.keys():
+            scores[name] = sum(v * d[w] for w, v in q.items() if w in d)
+    return scores
+
+
+def same_top_k(results, brute, order, k, tol=1e-5):
+    """
+    True if results are a top-k of brute: the right length, scores that
+    agree, best first, nothing better left out, exact ties in document order.
+    """
+    if len(results) != min(k, len(brute)):
+        return False
+    if any(abs(score - brute[name]) > tol for name, score in results):
+        return False
+    for (a, sa), (b, sb) in zip(results, results[1:]):
+        if sa < sb or (sa == sb and order[a] > order[b]):
+            return False
+    cutoff = results[-1][1] if results else float("inf")
+    chosen = {name for name, _ in results}
+    return all(name in chosen for name, score in brute.items() if score > cutoff + tol)
+
+
+def run_search_tests():
+    from tfidf_search import SearchIndex
+    rng = random.Random(46)
+    stopwords = set(STOPWORDS)
+    rare = [f"term{i}" for i in range(40)]
+    texts = [random_text(rng, rng.randint(1, 60)) for _ in range(25)]
+    # short documents over a wider vocabulary, so many documents match only later query terms
+    texts += [" ".join(rng.choices(rare, k=rng.randint(1, 4))) for _ in range(40)]
+    texts += texts[:5]          # identical documents score exactly alike
+    texts.append("the and it\n")  # a document with no terms left
+    names = [f"doc{i}.txt" for i in range(len(texts))]
+    order = {name: i for i, name in enumerate(names)}
+    doc_counts = [Counter(tfidf.tokenize(text, stopwords)) for text in texts]
+    index = SearchIndex.from_counts(doc_counts, names, stopwords)
+
+    # --- Test 23: max-score top-k == brute-force cosine over the TF-IDF vectors ---
+    queries = ["", "the and", "zebra", "zebra apple", "running runs RUN", "https://example.com/a?b=1"]
+    vocab = WORDS + tuple(rare) + ("zebra", "quux")
+    queries += [" ".join(rng.choices(vocab, k=rng.randint(1, 8))) for _ in range(300)]
+    same = True
+    for query in queries:
+        brute = brute_force_scores(doc_counts, names, stopwords, query)
+        for k in (1, 2, 3, 5, 10, len(names) + 3):
+            if not same_top_k(index.search(query, k), brute, order, k):
+                same = False
+                print(f"   mismatch: {query!r}, k={k}")
+    print_result("search == brute-force cosine (k up to n + 3)", same, True)
+
+    # --- Test 24: unknown, stopword-only and empty queries find nothing; ties keep document order ---
+    print_result("no matches", [index.search(q, 5) for q in ("", "the and it", "zebra quux", "!!!")],
+                 [[], [], [], []])
+    tied = SearchIndex.from_counts([Counter(a=1), Counter(b=1), Counter(a=1), Counter(a=1, b=1)],
+                                   ["w.txt", "x.txt", "y.txt", "z.txt"])
+    print_result("ties in document order", [name for name, _ in tied.search("a", 3)], ["w.txt", "y.txt", "z.txt"])
+
+
+def run_memo_tests(tmp):
+    rng = random.Random(47)
+    stopwords = set(STOPWORDS)
+
+    # --- Test 25: a tiny memo is reset when a document would overflow it ---
+    pre = tfidf.Preprocessor(stopwords, memo_size=2)
+    for text in ("apple banana", "banana apple", "data", "apple"):
+        pre.token_ids(text)
+    st = pre.stats()
+    print_result("tiny memo counters", [st[k] for k in ("hits", "misses", "resets", "memo_entries")], [2, 4, 1, 2])
+
+    # --- Test 26: resets never change the term IDs or the text ---
+    texts = [random_text(rng, rng.randint(0, 30)) for _ in range(100)]
+    same = True
+    for memo_size in (1, 2, 3):
+        pre = tfidf.Preprocessor(stopwords, memo_size)
+        for text in texts:
+            expected = list(tfidf.tokenize(text, stopwords))
+            ids = pre.token_ids(text)
+            if pre.text_of(ids) != " ".join(expected) or ids != [pre.term_ids[w] for w in expected]:
+                same = False
+                print(f"   mismatch: memo_size {memo_size}, {text!r}")
+        same = same and pre.resets > 0
+    print_result("tiny memo == tokenize (memo_size 1-3)", same, True)
+
+    # --- Test 27: memo counters of -j workers are merged ---
+    paths = []
+    for i, text in enumerate(texts[:20]):
+        paths.append(os.path.join(tmp, f"memo_doc{i}.txt"))
+        with open(paths[-1], "w", encoding="utf-8") as f:
+            f.write(text)
+    lookups = sum(len(set(tfidf.split_words(text))) for text in texts[:20])
+    for workers in (1, 2):
+        pre = tfidf.Preprocessor(stopwords)
+        tfidf.count_documents(paths, stopwords, workers, pre, output=RecordingOutput())
+        st = pre.stats()
+        print_result(f"memo lookups (-j {workers})", st["hits"] + st["misses"], lookups)
+
+
+def read_jsonl(paths):
+    """[(shard, record), ...] of JSON Lines shard files, in file order."""
+    import json
+    records = []
+    for shard, path in enumerate(paths):
+        with open(path, encoding="utf-8") as f:
+            records += [(shard, json.loads(line)) for line in f]
+    return records
+
+
+def run_jsonl_tests(tmp):
+    from tfidf_output import JsonlOutput, shard_paths
+    rng = random.Random(49)
+
+    # --- Test 28: sharded records round-trip, streamed ones escaped piece by piece ---
+    tricky = ['"', "\\", "\\\"", "naïve", "東京", "\n", "\t", "\x00", "\x1f", "\u2028", "é\"\\", " ", "word"]
+    expected = {}
+    path = os.path.join(tmp, "out.jsonl")
+    with JsonlOutput(path, 3) as output:
+        for i in range(30):
+            fname = f'doc "{i}" \\ ü.txt'
+            pieces = [rng.choice(tricky) for _ in range(rng.randint(0, 20))]
+            if i % 2:
+                writer = output.open_preproc(fname)
+                for piece in pieces:
+                    writer.write(piece)
+                writer.close()
+            else:
+                output.write_preproc(fname, "".join(pieces))
+            top = [(rng.choice(tricky), round(rng.random(), 2)) for _ in range(rng.randint(0, 5))]
+            output.write_tfidf(fname, top)
+            expected[fname] = ("".join(pieces), [list(pair) for pair in top])
+    records = read_jsonl(shard_paths(path, 3))
+    docs = {}
+    for shard, record in records:
+        kind = "preproc" if "preproc" in record else "tfidf"
+        docs.setdefault(record["doc"], {})[kind] = (shard, record[kind])
+    print_result("jsonl round trip (records)", len(records), 2 * len(expected))
+    print_result("jsonl round trip (contents)",
+                 {name: (d["preproc"][1], d["tfidf"][1]) for name, d in docs.items()} == expected, True)
+    print_result("jsonl: both records of a document in one shard",
+                 (all(d["preproc"][0] == d["tfidf"][0] for d in docs.values()),
+                  len({d["preproc"][0] for d in docs.values()})), (True, 3))
+
+    # --- Test 29: --jsonl --shards --stream writes the per-file pipeline's outputs ---
+    docs = {f"doc{i}.txt": random_text(rng, rng.randint(0, 200)) for i in range(10)}
+    doc_list = sorted(docs)
+    plain = run_main(os.path.join(tmp, "jsonl_plain"), docs, doc_list, list(STOPWORDS))
+    work = os.path.join(tmp, "jsonl_main")
+    run_main(work, docs, doc_list, list(STOPWORDS), jsonl_path="out.jsonl", shards=2, chunk_size=5)
+    records = [r for _, r in read_jsonl(shard_paths(os.path.join(work, "out.jsonl"), 2))]
+    preproc = {f"preproc_{r['doc']}": r["preproc"] for r in records if "preproc" in r}
+    top = {f"tfidf_{r['doc']}": [tuple(pair) for pair in r["tfidf"]] for r in records if "tfidf" in r}
+    print_result("jsonl main: preproc records", preproc == {
+        name: data.decode("utf-8").rstrip("\n") for name, data in plain.items() if name.startswith("preproc_")}, True)
+    print_result("jsonl main: tfidf records", {name: repr(t) + "\n" for name, t in top.items()} == {
+        name: data.decode("utf-8") for name, data in plain.items() if name.startswith("tfidf_")}, True)
+
+    # --- Test 30: streaming with workers into a consolidated output is refused ---
+    paths = [os.path.join(work, name) for name in doc_list]
+    try:
+        tfidf.count_documents(paths, STOPWORDS, 2, None, 5, tfidf.CollectOutput())
+        refused = False
+    except ValueError:
+        refused = True
+    print_result("count_documents: stream + workers + collected output", refused, True)
+    code, err = run_cli(work, "--stream", "--jsonl", "x.jsonl", "-j", "2")
+    print_result("--stream --jsonl -j 2 rejected", (code, "needs -j 1" in err), (2, True))
+
+
+def damage_entries(directory):
+    """Damage every cache entry but the first few, each in one of several ways; returns how many."""
+    import tfidf_cache
+    entries = sorted(os.path.join(d, f) for d, _, fs in os.walk(directory) for f in fs
+                     if f.endswith(tfidf_cache.ENTRY_SUFFIX))
+    for i, path in enumerate(entries[3:]):
+        with open(path, "rb") as f:
+            data = bytearray(f.read())
+        (length,) = tfidf_cache.FOOTER.unpack(data[-tfidf_cache.FOOTER.size:])
+        text_end = len(data) - tfidf_cache.FOOTER.size - length
+        way = i % 5
+        if way == 0:
+            data = b""                          # empty
+        elif way == 1:
+            data = data[:5]                     # shorter than the footer
+        elif way == 2:
+            data = data[:len(data) // 2]        # truncated
+        elif way == 3:
+            data[text_end // 2] ^= 0xFF         # corrupt compressed text
+        else:
+            data[text_end:] = data[-tfidf_cache.FOOTER.size:]   # counts missing
+        with open(path, "wb") as f:
+            f.write(data)
+    return len(entries) - 3
+
+
+def run_damaged_cache_tests(tmp):
+    import tfidf_cache
+    rng = random.Random(51)
+    stopwords = list(STOPWORDS)
+    paths = []
+    for i in range(15):
+        paths.append(os.path.join(tmp, f"damage_doc{i}.txt"))
+        with open(paths[-1], "w", encoding="utf-8") as f:
+            f.write(random_text(rng, rng.randint(0, 400)))
+    plain = RecordingOutput()
+    plain_counts = tfidf.count_documents(paths, stopwords, output=plain)
+    n = len(paths)
+
+    # --- Test 31: damaged entries are misses, get rewritten, and never reach the outputs ---
+    read_size = tfidf_cache.READ_SIZE
+    for label, size in (("whole", read_size), ("streamed", 64)):
+        tfidf_cache.READ_SIZE = size   # 64: every entry is checked and then streamed in blocks
+        try:
+            directory = os.path.join(tmp, f"cache_damaged_{label}")
+            cached_run(paths, stopwords, directory)
+            damaged = damage_entries(directory)
+            texts, counts, st = cached_run(paths, stopwords, directory)
+            print_result(f"damaged entries ({label})",
+                         ((st["hits"], st["misses"], st["stores"]), texts == plain.texts, counts == plain_counts),
+                         ((n - damaged, damaged, damaged), True, True))
+            print_result(f"damaged entries (size, {label})", st["bytes"],
+                         sum(os.path.getsize(os.path.join(d, f)) for d, _, fs in os.walk(directory) for f in fs))
+            _, _, st = cached_run(paths, stopwords, directory)
+            print_result(f"damaged entries rewritten ({label})", (st["hits"], st["misses"]), (n, 0))
+        finally:
+            tfidf_cache.READ_SIZE = read_size
+
+    # --- Test 32: an entry evicted between lookup and read is a miss ---
+    class EvictingCache(tfidf_cache.PreprocessCache):
+        def lookup(self, key):
+            path = super().lookup(key)
+            if path is not None:
+                os.remove(path)
+            return path
+
+    directory = os.path.join(tmp, "cache_evicted")
+    cached_run(paths, stopwords, directory)
+    cache = EvictingCache(stopwords, directory)
+    output = RecordingOutput()
+    counts = tfidf.count_documents(paths, stopwords, 1, None, None, output, cache)
+    st = cache.stats()
+    print_result("evicted after lookup",
+                 ((st["hits"], st["misses"], st["stores"]), output.texts == plain.texts, counts == plain_counts),
+                 ((0, n, n), True, True))
+
+
+def run_tests():
+    print("📄 Running automated tests for tfidf.py...\n")
+    tmp = tempfile.mkdtemp(prefix="tfidf_test_")
+    try:
+        run_matrix_tests()
+        run_index_tests(tmp)
+        run_stream_tests(tmp)
+        run_cache_tests(tmp)
+        run_tokenizer_tests()
+        run_worker_tests(tmp)
+        run_search_tests()
+        run_memo_tests(tmp)
+        run_jsonl_tests(tmp)
+        run_damaged_cache_tests(tmp)
+    finally:
+        shutil.rmtree(tmp)
+    print("\n🎉 ALL TESTS FINISHED 🎉")
+
+
+if __name__ == "__main__":
+    run_tests()
@@ -3,8 +3,10 @@ tfidf.py
 Problem 1 - Text Processing and TF-IDF
 """
 
+import hashlib
 import re
 import math
+import os
 import sys
 from collections import Counter
 from pathlib import Path
@@ -57,12 +59,14 @@ def remove_stopwords_from_text(text, stopwords):
     filtered = [w for w in words if w not in stopwords]
     return " ".join(filtered)
 
-def stem_token(token):
-    # Some exceptions for 'ing' ending
-    ing_exceptions = {"sing", "fling", "cling", "bring", "thing", "sling"}
+# Endings stem_token may remove
+STEM_SUFFIXES = ("ing", "ly", "ment")
+# Some exceptions for 'ing' ending
+ING_EXCEPTIONS = frozenset({"sing", "fling", "cling", "bring", "thing", "sling"})
 
+def stem_token(token):
     # Aggressively stem 'ing' if word is longer than 4 and not in exceptions
-    if token.endswith("ing") and token not in ing_exceptions and len(token) > 4:
+    if token.endswith("ing") and token not in ING_EXCEPTIONS and len(token) > 4:
         return token[:-3]  
         
     # Stem 'ly' endings if longer than 3
@@ -83,30 +87,178 @@ def stem_text(text):
     # collapse again in case stemming produced empty strings or extra spaces
     return " ".join([w for w in stemmed if w]).strip()
 
+# -----------------------
+# Fused tokenizer
+# -----------------------
+
+# Bump whenever tokenize() would produce different tokens for the same input
+PREPROCESS_VERSION = 1
+
+def preprocess_key(stopwords):
+    """Identifies the preprocessing settings; a change invalidates saved term counts."""
+    h = hashlib.blake2b("\n".join(sorted(stopwords)).encode("utf-8"), digest_size=16)
+    return PREPROCESS_VERSION, h.hexdigest()
+
+URL_RE = re.compile(r"https?://\S+")
+NONWORD_RE = re.compile(r"[^\w\s]")
+# the same characters as NONWORD_RE, for deleting with bytes.translate on ASCII text
+ASCII_NONWORD = bytes(c for c in range(128) if NONWORD_RE.match(chr(c)))
+
+def split_words(text):
+    """The words of clean_text(text), before stopword removal and stemming."""
+    if "://" in text:
+        text = URL_RE.sub("", text)
+    if text.isascii():
+        text = text.encode("ascii").translate(None, ASCII_NONWORD).decode("ascii")
+    else:
+        text = NONWORD_RE.sub("", text)
+    # lower() never adds or removes whitespace, so split() collapses it as before
+    return text.lower().split()
+
+def tokenize(text, stopwords):
+    """
+    Return an iterator over the final preprocessed tokens of raw text: the
+    same words as clean_text -> remove_stopwords_from_text -> stem_text,
+    without building the intermediate strings. Whitespace collapsing is left
+    to split(), lowercasing twice is skipped since lower() is idempotent,
+    and each distinct word is stemmed only once.
+    """
+    words = split_words(text)
+    # word -> stem for words stem_token may shorten, None for stopwords;
+    # any other word maps to itself
+    unique = set(words)
+    stems = {w: stem_token(w) for w in unique if w.endswith(STEM_SUFFIXES)}
+    stems.update(dict.fromkeys(unique.intersection(stopwords)))
+    return filter(None, map(stems.get, words, words))
+
+DEFAULT_MEMO_SIZE = 1 << 20  # words remembered by a Preprocessor
+
+class Preprocessor:
+    """
+    tokenize() for a whole corpus, producing integer term IDs.
+
+    Every distinct word seen goes through stopword removal and stem_token
+    once, and the memo maps it straight to the ID of its stem (None for
+    stopwords). The memo holds at most memo_size words and is emptied when
+    a document would overflow it. Term IDs start at 1 and are kept for the
+    life of the Preprocessor; terms[id] is the term. Documents counted by
+    ID share one int object per term instead of one string per document.
+    """
+
+    def __init__(self, stopwords, memo_size=DEFAULT_MEMO_SIZE):
+        self.stopwords = stopwords
+        self.memo_size = memo_size
+        self.memo = {}          # word -> term ID, or None for stopwords
+        self.term_ids = {}      # term -> ID
+        self.terms = [None]     # ID -> term
+        self.hits = self.misses = self.resets = 0
+
+    def intern(self, term):
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            term_id = self.term_ids[term] = len(self.terms)
+            self.terms.append(term)
+        return term_id
+
+    def token_ids(self, text):
+        """Term IDs of tokenize(text, stopwords), in order."""
+        words = split_words(text)
+        unique = set(words)
+        memo = self.memo
+        new = unique.difference(memo)
+        if len(memo) + len(new) > self.memo_size:
+            memo.clear()
+            self.resets += 1
+            new = unique
+        self.misses += len(new)
+        self.hits += len(unique) - len(new)
+        stopwords, intern = self.stopwords, self.intern
+        for w in new:
+            memo[w] = None if w in stopwords else intern(stem_token(w))
+        return list(filter(None, map(memo.__getitem__, words)))
+
+    def text_of(self, term_ids):
+        return " ".join(map(self.terms.__getitem__, term_ids))
+
+    def counts_by_term(self, id_counts):
+        """{term ID: n} -> {term: n}"""
+        counts = Counter()
+        dict.update(counts, zip(map(self.terms.__getitem__, id_counts), id_counts.values()))
+        return counts
+
+    def counts_by_id(self, term_counts):
+        """{term: n} -> {term ID: n}, interning new terms"""
+        ids = list(map(self.term_ids.get, term_counts))
+        if None in ids:
+            intern = self.intern
+            ids = [i or intern(w) for i, w in zip(ids, term_counts)]
+        counts = Counter()
+        dict.update(counts, zip(ids, term_counts.values()))
+        return counts
+
+    def take_counters(self):
+        """(hits, misses, resets) since the last call, for merging across processes."""
+        counters = self.hits, self.misses, self.resets
+        self.hits = self.misses = self.resets = 0
+        return counters
+
+    def add_counters(self, counters):
+        hits, misses, resets = counters
+        self.hits += hits
+        self.misses += misses
+        self.resets += resets
+
+    def stats(self):
+        """Memo hit rate (over distinct words per document) and approximate memory use."""
+        lookups = self.hits + self.misses
+        memo_bytes = sys.getsizeof(self.memo) + sum(map(sys.getsizeof, self.memo))
+        vocab_bytes = (sys.getsizeof(self.term_ids) + sys.getsizeof(self.terms)
+                       + sum(map(sys.getsizeof, self.terms)))
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "resets": self.resets,
+            "memo_entries": len(self.memo),
+            "memo_bytes": memo_bytes,
+            "terms": len(self.terms) - 1,
+            "vocabulary_bytes": vocab_bytes,
+        }
+
 # -----------------------
 # TF-IDF computation
 # -----------------------
 
 def compute_tf(word_list):
-    total = len(word_list)
+    return compute_tf_from_counts(Counter(word_list))
+
+def compute_tf_from_counts(counts):
+    """counts: {word: occurrences} -> {word: tf}"""
+    total = sum(counts.values())
     if total == 0:
         return {}
-    counts = Counter(word_list)
-    return {w: counts[w] / total for w in counts}
+    return {w: c / total for w, c in counts.items()}
+
+def compute_document_frequencies(all_docs_wordlists):
+    """
+    Count, in one pass over the corpus, how many documents contain each word.
+    Each document (a word list or term counts) contributes its unique words once.
+    """
+    df = Counter()
+    for wl in all_docs_wordlists:
+        df.update(set(wl))
+    return df
 
 def compute_idf(all_docs_wordlists):
     N = len(all_docs_wordlists)
-    idf = {}
-    # collect unique words across corpus
-    all_words = set()
-    for wl in all_docs_wordlists:
-        all_words.update(wl)
-    for w in all_words:
-        doc_count = sum(1 for wl in all_docs_wordlists if w in wl)
-        if doc_count == 0:
-            continue
-        idf[w] = math.log(N / doc_count) + 1.0
-    return idf
+    df = compute_document_frequencies(all_docs_wordlists)
+    return idf_from_frequencies(df, N)
+
+def idf_from_frequencies(df, N):
+    """df: {word: documents containing it} over a corpus of N docs -> {word: idf}"""
+    # many words share a document count, so compute each distinct idf once
+    idf_by_count = {c: math.log(N / c) + 1.0 for c in set(df.values())}
+    return {w: idf_by_count[c] for w, c in df.items()}
 
 def compute_tfidf_for_doc(tf_dict, idf_dict):
     """
@@ -136,6 +288,16 @@ def top_n_by_tfidf(tfidf_dict, n=5):
     items.sort(key=lambda kv: (-kv[1], kv[0]))
     return items[:n]
 
+def document_top_n(counts, idf, n=5, terms=None):
+    """
+    Top-n (word, score) list of one document given its term counts; if
+    counts and idf are by term ID, terms[id] gives the word.
+    """
+    tfidf = compute_tfidf_for_doc(compute_tf_from_counts(counts), idf)
+    if terms is not None:
+        tfidf = {terms[i]: score for i, score in tfidf.items()}
+    return top_n_by_tfidf(tfidf, n)
+
 # -----------------------
 # File I/O and orchestration
 # -----------------------
@@ -153,28 +315,269 @@ def write_tfidf_file(orig_filename, top_list):
         f.write(repr(top_list) + "\n")
     return out_name
 
+# Output layouts: objects with write_preproc(fname, content),
+# open_preproc(fname) -> writer with write(text)/close(), write_tfidf(fname,
+# top_list) and close(). tfidf_output.JsonlOutput is the consolidated one.
+
+class _PreprocFileWriter:
+    """A preproc_ file written piece by piece, ending like write_preproc_file's."""
+
+    def __init__(self, fname):
+        self.f = open(f"preproc_{fname}", "w", encoding="utf-8")
+        self.empty = True
+
+    def write(self, text):
+        if text:
+            self.f.write(text)
+            self.empty = False
+
+    def close(self):
+        if not self.empty:
+            self.f.write("\n")
+        self.f.close()
+
+class FileOutput:
+    """The per-file layout: preproc_<name> and tfidf_<name> for every document."""
+
+    def write_preproc(self, fname, content):
+        write_preproc_file(fname, content)
+
+    def open_preproc(self, fname):
+        return _PreprocFileWriter(fname)
+
+    def write_tfidf(self, fname, top_list):
+        write_tfidf_file(fname, top_list)
+
+    def close(self):
+        pass
+
+FILES = FileOutput()
+
+class _CollectedText:
+    def __init__(self, output):
+        self.output = output
+        self.parts = []
+
+    def write(self, text):
+        self.parts.append(text)
+
+    def close(self):
+        self.output.text = "".join(self.parts)
+
+class CollectOutput:
+    """
+    Keeps the last document's preproc_ text, for a worker process to hand
+    back. The whole text is held in memory, so workers never stream into it.
+    """
+
+    def __init__(self):
+        self.text = None
+
+    def write_preproc(self, fname, content):
+        self.text = content
+
+    def open_preproc(self, fname):
+        return _CollectedText(self)
+
+def preprocess_file(fname, stopwords, preprocessor=None, output=FILES):
+    """
+    Preprocess one document, write its preproc_ output and return its words,
+    or its term IDs when a Preprocessor is given.
+    """
+    p = Path(fname)
+    if not p.exists():
+        # If file doesn't exist, create empty preproc file and record empty doc
+        output.write_preproc(fname, "")
+        return []
+    text = p.read_text(encoding="utf-8")
+    if preprocessor is not None:
+        term_ids = preprocessor.token_ids(text)
+        output.write_preproc(fname, preprocessor.text_of(term_ids))
+        return term_ids
+    words = list(tokenize(text, stopwords))
+    # only lowercase words separated by single space
+    output.write_preproc(fname, " ".join(words))
+    return words
+
+DEFAULT_CHUNK_SIZE = 1 << 20  # characters per read when streaming documents
+
+def read_chunks(f, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield the text of a stream in pieces of about chunk_size characters that
+    end at whitespace (or at the end of the stream). Words and URLs never
+    contain whitespace, so no piece splits one and the pieces preprocess
+    exactly like the whole text.
+    """
+    parts = []
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        if chunk[-1].isspace():
+            cut = len(chunk)
+        else:
+            # length up to the last whitespace; 0 if the chunk is all one word
+            cut = len(chunk) - len(chunk.rsplit(None, 1)[-1])
+        if not cut:
+            parts.append(chunk)
+            continue
+        parts.append(chunk[:cut])
+        yield "".join(parts)
+        parts = [chunk[cut:]]
+    tail = "".join(parts)
+    if tail:
+        yield tail
+
+def stream_file(fname, preprocessor, chunk_size=DEFAULT_CHUNK_SIZE, output=FILES):
+    """
+    Like preprocess_file with a Preprocessor, but reading the document and
+    writing its preproc_ output a chunk at a time, so memory depends on the
+    vocabulary rather than the document size. Returns its term-ID counts.
+    """
+    counts = Counter()
+    if not Path(fname).exists():
+        output.write_preproc(fname, "")
+        return counts
+    with open(fname, "r", encoding="utf-8") as f:
+        out = output.open_preproc(fname)
+        try:
+            sep = ""
+            for piece in read_chunks(f, chunk_size):
+                term_ids = preprocessor.token_ids(piece)
+                if term_ids:
+                    out.write(sep + preprocessor.text_of(term_ids))
+                    sep = " "
+                    counts.update(term_ids)
+        finally:
+            out.close()
+    return counts
+
 def process_documents(doc_filenames, stopwords):
     preproc_wordlists = []
     for fname in doc_filenames:
         if not fname:
             continue
-        p = Path(fname)
-        if not p.exists():
-            # If file doesn't exist, create empty preproc file and record empty doc
-            write_preproc_file(fname, "")
-            preproc_wordlists.append([])
-            continue
-        text = p.read_text(encoding="utf-8")
-        cleaned = clean_text(text)
-        no_stop = remove_stopwords_from_text(cleaned, stopwords)
-        stemmed = stem_text(no_stop)
-        # final ensure: only lowercase words separated by single space
-        final = collapse_whitespace(stemmed.lower())
-        write_preproc_file(fname, final)
-        words = final.split() if final else []
-        preproc_wordlists.append(words)
+        preproc_wordlists.append(preprocess_file(fname, stopwords))
     return preproc_wordlists
 
+class _TeeWriter:
+    def __init__(self, out, entry):
+        self.out = out
+        self.entry = entry
+
+    def write(self, text):
+        self.out.write(text)
+        self.entry.write(text)
+
+    def close(self):
+        self.out.close()
+
+class _TeeOutput:
+    """Output layout that also copies the preproc text into a cache entry."""
+
+    def __init__(self, output, entry):
+        self.output = output
+        self.entry = entry
+
+    def write_preproc(self, fname, content):
+        self.output.write_preproc(fname, content)
+        self.entry.write(content)
+
+    def open_preproc(self, fname):
+        return _TeeWriter(self.output.open_preproc(fname), self.entry)
+
+def _count_file_ids(fname, preprocessor, chunk_size=None, output=FILES, cache=None):
+    key = cache.key(fname) if cache is not None else None
+    if key is not None:
+        path = cache.lookup(key)
+        if path is not None:
+            try:
+                counts, pieces = cache.read(path)
+            except cache.READ_ERRORS:
+                # evicted since the lookup, truncated or corrupt: preprocess it again
+                cache.discard(path)
+            else:
+                # cached: copy the preprocessed text, no preprocessing at all
+                out = output.open_preproc(fname)
+                try:
+                    for piece in pieces:
+                        out.write(piece)
+                finally:
+                    out.close()
+                return preprocessor.counts_by_id(counts)
+        entry = cache.writer(key)
+        try:
+            counts = _count_file_ids(fname, preprocessor, chunk_size, _TeeOutput(output, entry))
+        except BaseException:
+            entry.abort()
+            raise
+        entry.finish(preprocessor.counts_by_term(counts))
+        return counts
+    if chunk_size:
+        return stream_file(fname, preprocessor, chunk_size, output)
+    return Counter(preprocess_file(fname, preprocessor.stopwords, preprocessor, output))
+
+# Preprocessor, chunk size, output and cache of a worker process, set once by _init_worker
+_worker_preprocessor = None
+_worker_chunk_size = None
+_worker_output = None
+_worker_cache = None
+
+def _init_worker(stopwords, chunk_size, collect, cache):
+    global _worker_preprocessor, _worker_chunk_size, _worker_output, _worker_cache
+    _worker_preprocessor = Preprocessor(stopwords)
+    _worker_chunk_size = chunk_size
+    # with a consolidated output only the parent writes; workers send the text back
+    _worker_output = CollectOutput() if collect else FILES
+    _worker_cache = cache
+
+def _count_file(fname):
+    pre, output, cache = _worker_preprocessor, _worker_output, _worker_cache
+    counts = pre.counts_by_term(_count_file_ids(fname, pre, _worker_chunk_size, output, cache))
+    return (counts, (output.text if output is not FILES else None),
+            (cache.take_counters() if cache is not None else None), pre.take_counters())
+
+def count_documents(doc_filenames, stopwords, workers=1, preprocessor=None, chunk_size=None,
+                    output=FILES, cache=None):
+    """
+    Like process_documents, but returns each document's term counts
+    ({word: occurrences}) instead of its word list; with a Preprocessor,
+    the counts are by its term IDs instead of words. With workers > 1 (or
+    None for one per CPU) documents are preprocessed in a process pool;
+    results come back in input order and the preproc_ files are the same.
+    With a chunk_size, documents are streamed through stream_file; workers
+    can only stream to preproc_ files, since for any other output they hand
+    each document's whole text back to the parent, so that combination is
+    rejected. With a tfidf_cache.PreprocessCache, documents found in it are
+    not preprocessed.
+    """
+    doc_filenames = [fname for fname in doc_filenames if fname]
+    if chunk_size and output is not FILES and workers != 1:
+        raise ValueError("streamed documents can only be written to this output with workers=1")
+    if workers == 1 or len(doc_filenames) < 2:
+        pre = preprocessor or Preprocessor(stopwords)
+        id_counts = [_count_file_ids(fname, pre, chunk_size, output, cache) for fname in doc_filenames]
+        return id_counts if preprocessor else list(map(pre.counts_by_term, id_counts))
+
+    from concurrent.futures import ProcessPoolExecutor
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(doc_filenames) // (workers * 4))
+    initargs = (stopwords, chunk_size, output is not FILES, cache)
+    doc_counts = []
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=initargs) as pool:
+        results = pool.map(_count_file, doc_filenames, chunksize=chunksize)
+        for fname, (counts, text, cache_counters, memo_counters) in zip(doc_filenames, results):
+            if text is not None:
+                output.write_preproc(fname, text)
+            if cache_counters is not None:
+                cache.add_counters(cache_counters)
+            if preprocessor is not None:
+                preprocessor.add_counters(memo_counters)
+            doc_counts.append(counts)
+    if cache is not None:
+        cache.rescan()
+    return list(map(preprocessor.counts_by_id, doc_counts)) if preprocessor else doc_counts
+
 def read_tfidf_doclist(path="tfidf_docs.txt"):
     try:
         with open(path, "r", encoding="utf-8") as f:
@@ -184,24 +587,125 @@ def read_tfidf_doclist(path="tfidf_docs.txt"):
         sys.exit(1)
     return lines
 
-def main():
-    # Read list of docs and stopwords
-    doc_filenames = read_tfidf_doclist("tfidf_docs.txt")
-    stopwords = read_stopwords("stopwords.txt")
-
-    # Preprocess and write preproc_ files
-    preproc_wordlists = process_documents(doc_filenames, stopwords)
+def write_tfidf_outputs(doc_filenames, doc_counts, sparse=False, terms=None, output=FILES):
+    """doc_counts are by word, or by term ID with terms[id] the word."""
+    if sparse:
+        # Whole-corpus TF-IDF on a sparse document-term matrix (needs numpy)
+        from tfidf_matrix import TfidfMatrix
+        matrix = TfidfMatrix.from_counts(doc_counts, terms)
+        for fname, top5 in zip(doc_filenames, matrix.top_n(5)):
+            output.write_tfidf(fname, top5)
+        return
 
     # Compute IDF across all preprocessed docs
-    idf = compute_idf(preproc_wordlists)
+    idf = compute_idf(doc_counts)
 
     # For each document compute TF, TF-IDF and write tfidf_ file with top 5
-    for fname, words in zip(doc_filenames, preproc_wordlists):
-        tf = compute_tf(words)
-        tfidf = compute_tfidf_for_doc(tf, idf)
-        top5 = top_n_by_tfidf(tfidf, 5)
-        
-        write_tfidf_file(fname, top5)
+    for fname, counts in zip(doc_filenames, doc_counts):
+        output.write_tfidf(fname, document_top_n(counts, idf, 5, terms))
+
+def print_preprocessor_stats(preprocessor):
+    st = preprocessor.stats()
+    print(f"stem memo: {st['hits']} hits, {st['misses']} misses ({st['hit_rate']:.1%} hit rate), "
+          f"{st['resets']} resets, {st['memo_entries']} entries in this process "
+          f"(~{st['memo_bytes'] / 1e6:.1f} MB); "
+          f"vocabulary: {st['terms']} terms (~{st['vocabulary_bytes'] / 1e6:.1f} MB)", file=sys.stderr)
+
+def print_cache_stats(cache):
+    st = cache.stats()
+    print(f"preprocess cache: {st['hits']} hits, {st['misses']} misses ({st['hit_rate']:.1%} hit rate), "
+          f"{st['stores']} stored, {st['evictions']} evicted, {st['bytes'] / 1e6:.1f} MB", file=sys.stderr)
+
+def main(workers=1, sparse=False, index_path=None, queries=(), k=10, show_stats=False, chunk_size=None,
+         jsonl_path=None, shards=1, cache_dir=None, cache_bytes=None):
+    # Read list of docs and stopwords
+    doc_filenames = read_tfidf_doclist("tfidf_docs.txt")
+    stopwords = read_stopwords("stopwords.txt")
+
+    cache = None
+    if cache_dir:
+        # Reuse the preprocessing of documents whose content was seen before
+        from tfidf_cache import PreprocessCache, DEFAULT_MAX_BYTES
+        cache = PreprocessCache(stopwords, cache_dir, cache_bytes or DEFAULT_MAX_BYTES)
+
+    if index_path:
+        # Incremental run: only redo what changed since the indexed run
+        from tfidf_index import TfidfIndex
+        index = TfidfIndex.load(index_path)
+        stats = index.update(doc_filenames, stopwords, workers, 5, chunk_size, cache)
+        index.save()
+        print(f"{stats['documents']} documents: {stats['reprocessed']} preprocessed, "
+              f"{stats['rescored']} rescored, {stats['rewritten']} tfidf files rewritten")
+        doc_filenames = index.doc_list
+        doc_counts = [index.files[fname]["counts"] for fname in doc_filenames]
+    else:
+        output = FILES
+        if jsonl_path:
+            # All outputs in one (or a few sharded) JSON Lines files
+            from tfidf_output import JsonlOutput
+            output = JsonlOutput(jsonl_path, shards)
+        # Preprocess and write preproc_ outputs, keeping each document's counts by term ID
+        preprocessor = Preprocessor(stopwords)
+        try:
+            id_counts = count_documents(doc_filenames, stopwords, workers, preprocessor, chunk_size, output,
+                                        cache)
+            write_tfidf_outputs(doc_filenames, id_counts, sparse, preprocessor.terms, output)
+        finally:
+            output.close()
+        if show_stats:
+            print_preprocessor_stats(preprocessor)
+        doc_counts = list(map(preprocessor.counts_by_term, id_counts)) if queries else None
+    if show_stats and cache is not None:
+        print_cache_stats(cache)
+
+    if queries:
+        # Ranked search over the processed corpus (needs numpy)
+        from tfidf_search import SearchIndex, show_search_results
+        search = SearchIndex.from_counts(doc_counts, doc_filenames, stopwords)
+        for query in queries:
+            show_search_results(search, query, k)
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description="Preprocess the documents in tfidf_docs.txt and write their top TF-IDF words.")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="processes for preprocessing (0 = one per CPU; default 1)")
+    parser.add_argument("--sparse", action="store_true",
+                        help="compute TF-IDF on a sparse document-term matrix (needs numpy)")
+    parser.add_argument("--index", nargs="?", const=".tfidf_index.pkl", metavar="PATH",
+                        help="keep a persistent index and only reprocess changed documents "
+                             "(default PATH: .tfidf_index.pkl)")
+    parser.add_argument("--search", action="append", default=[], metavar="QUERY",
+                        help="afterwards, list the documents most similar to QUERY (repeatable)")
+    parser.add_argument("-k", type=int, default=10, help="documents listed per search (default 10)")
+    parser.add_argument("--stats", action="store_true",
+                        help="report stem memo hit rate (including -j workers) and memory use "
+                             "(of this process) on stderr")
+    parser.add_argument("--stream", nargs="?", type=int, const=DEFAULT_CHUNK_SIZE, metavar="CHARS",
+                        help="read and write documents in chunks of CHARS characters, for documents "
+                             f"too large for memory (default CHARS: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--jsonl", metavar="PATH",
+                        help="write all preproc and tfidf outputs as JSON Lines records to PATH "
+                             "instead of preproc_/tfidf_ files per document (with --stream, only -j 1)")
+    parser.add_argument("--shards", type=int, default=1,
+                        help="split --jsonl output over this many files (default 1)")
+    parser.add_argument("--cache", nargs="?", const=".tfidf_cache", metavar="DIR",
+                        help="cache preprocessed documents by content in DIR and reuse them "
+                             "(default DIR: .tfidf_cache)")
+    parser.add_argument("--cache-size", type=int, default=1024, metavar="MB",
+                        help="evict least recently used --cache entries beyond this size (default 1024)")
+    args = parser.parse_args()
+    if args.workers < 0:
+        parser.error("-j/--workers must be 0 (one per CPU) or more")
+    if args.stream is not None and args.stream < 1:
+        parser.error("--stream CHARS must be at least 1")
+    if args.stream is not None and args.jsonl and args.workers != 1:
+        parser.error("--stream with --jsonl needs -j 1: workers would hold each whole document in memory")
+    if args.jsonl and args.index:
+        parser.error("--index keeps the per-document file layout; it cannot be combined with --jsonl")
+    if args.shards < 1:
+        parser.error("--shards must be at least 1")
+    if args.cache_size < 1:
+        parser.error("--cache-size must be at least 1")
+    main(args.workers or None, args.sparse, args.index, args.search, args.k, args.stats, args.stream,
+         args.jsonl, args.shards, args.cache, args.cache_size << 20)
@@ -0,0 +1,239 @@
+"""
+tfidf_cache.py
+Content-addressed cache of preprocessed documents for tfidf.py.
+
+An entry is keyed by a hash of the document's raw bytes together with the
+preprocessing settings (tfidf.preprocess_key: stopword list and tokenizer
+version), so the same text is reused across runs, file names and corpora,
+and never reused after the settings change. It holds the document's term
+counts and its zlib-compressed preprocessed text, which is enough to skip
+preprocessing entirely. Entry layout:
+
+    [compressed text][pickled {term: count}][8-byte pickle length]
+
+Both parts are streamed, so documents of any size can be cached. Entries
+are written to a temporary file and renamed into place. When the cache
+grows past max_bytes the least recently used entries (by mtime, refreshed
+on every hit) are deleted until it is back under 90% of the limit. An
+entry is checked in full before its text is used; one that was evicted
+meanwhile, or is truncated or corrupt, is deleted and counts as a miss.
+"""
+
+import codecs
+import hashlib
+import os
+import pickle
+import struct
+import tempfile
+import zlib
+from collections import deque
+
+import tfidf
+
+DEFAULT_CACHE_DIR = ".tfidf_cache"
+DEFAULT_MAX_BYTES = 1 << 30
+ENTRY_SUFFIX = ".entry"
+READ_SIZE = 1 << 20
+FOOTER = struct.Struct("<Q")
+COMPRESS_LEVEL = 1      # entries are written on every miss; favour speed over size
+
+
+class _EntryWriter:
+    """A cache entry being written: text pieces first, then the counts."""
+
+    def __init__(self, cache, key):
+        self.cache = cache
+        self.key = key
+        fd, self.tmp = tempfile.mkstemp(prefix=".tmp-", dir=cache.directory)
+        self.f = os.fdopen(fd, "wb")
+        self.compressor = zlib.compressobj(COMPRESS_LEVEL)
+
+    def write(self, text):
+        if text:
+            self.f.write(self.compressor.compress(text.encode("utf-8")))
+
+    def finish(self, counts):
+        self.f.write(self.compressor.flush())
+        data = pickle.dumps(dict(counts), pickle.HIGHEST_PROTOCOL)
+        self.f.write(data)
+        self.f.write(FOOTER.pack(len(data)))
+        self.f.close()
+        path = self.cache._path(self.key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        size = os.path.getsize(self.tmp)
+        os.replace(self.tmp, path)
+        self.cache._stored(size)
+
+    def abort(self):
+        self.f.close()
+        os.remove(self.tmp)
+
+
+def _text_pieces(f, size):
+    """The decoded text of an entry's first size bytes, in pieces."""
+    f.seek(0)
+    decompressor = zlib.decompressobj()
+    # blocks can end inside a multi-byte character
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    while size:
+        block = f.read(min(READ_SIZE, size))
+        if not block:
+            raise EOFError("cache entry ends early")
+        size -= len(block)
+        yield decoder.decode(decompressor.decompress(block))
+    yield decoder.decode(decompressor.flush(), final=True)
+    if not decompressor.eof:
+        raise zlib.error("incomplete compressed text in cache entry")
+
+
+def _closing(f, pieces):
+    with f:
+        yield from pieces
+
+
+class PreprocessCache:
+    # what read() raises for an entry that vanished or is damaged
+    READ_ERRORS = (OSError, EOFError, ValueError, struct.error, pickle.UnpicklingError, zlib.error)
+
+    def __init__(self, stopwords, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.salt = repr(tfidf.preprocess_key(stopwords)).encode("utf-8")
+        os.makedirs(directory, exist_ok=True)
+        self.hits = self.misses = self.stores = self.evictions = 0
+        self.rescan()
+        if self.size > max_bytes:   # e.g. opened with a smaller limit than before
+            self.evict()
+
+    def rescan(self):
+        """Recount the size on disk, e.g. after other processes used the cache."""
+        self.size = sum(size for _, _, size in self._entries())
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ENTRY_SUFFIX)
+
+    def _entries(self):
+        """(mtime, path, size) of every entry."""
+        for sub in os.scandir(self.directory):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                if entry.name.endswith(ENTRY_SUFFIX):
+                    try:
+                        st = entry.stat()
+                    except FileNotFoundError:
+                        continue   # evicted by another process
+                    yield st.st_mtime_ns, entry.path, st.st_size
+
+    def key(self, fname):
+        """Cache key of a document file, or None if it does not exist."""
+        h = hashlib.blake2b(self.salt, digest_size=20)
+        try:
+            with open(fname, "rb") as f:
+                for block in iter(lambda: f.read(READ_SIZE), b""):
+                    h.update(block)
+        except FileNotFoundError:
+            return None
+        return h.hexdigest()
+
+    def lookup(self, key):
+        """Path of the entry for key, or None; counts as a hit or a miss."""
+        path = self._path(key)
+        if os.path.exists(path):
+            self.hits += 1
+            return path
+        self.misses += 1
+        return None
+
+    def read(self, path):
+        """
+        Check an entry and return ({term: count}, its preprocessed text in
+        pieces). An entry that is missing, truncated or corrupt raises one of
+        READ_ERRORS before any text is returned.
+        """
+        f = open(path, "rb")
+        try:
+            end = f.seek(-FOOTER.size, os.SEEK_END)
+            (length,) = FOOTER.unpack(f.read(FOOTER.size))
+            if length > end:
+                raise ValueError(f"damaged cache entry: {path}")
+            f.seek(end - length)
+            counts = pickle.loads(f.read(length))
+            if not isinstance(counts, dict):
+                raise ValueError(f"damaged cache entry: {path}")
+            size = end - length
+            if size <= READ_SIZE:
+                f.seek(0)
+                pieces = [zlib.decompress(f.read(size)).decode("utf-8")]
+                f.close()
+            else:
+                # too large to hold: check the whole text, then stream it again
+                deque(_text_pieces(f, size), maxlen=0)
+                pieces = _closing(f, _text_pieces(f, size))
+        except BaseException:
+            f.close()
+            raise
+        try:
+            os.utime(path)   # most recently used
+        except FileNotFoundError:
+            pass   # evicted meanwhile; the open file is still readable
+        return counts, pieces
+
+    def discard(self, path):
+        """Delete an entry read() rejected; the lookup that found it counts as a miss."""
+        self.hits -= 1
+        self.misses += 1
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return   # already evicted
+        self.size -= size
+
+    def writer(self, key):
+        return _EntryWriter(self, key)
+
+    def _stored(self, size):
+        self.stores += 1
+        self.size += size
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def evict(self, target=None):
+        """Delete least recently used entries until the cache is under target bytes."""
+        target = int(self.max_bytes * 0.9) if target is None else target
+        entries = sorted(self._entries())
+        self.size = sum(size for _, _, size in entries)
+        for _, path, size in entries:
+            if self.size <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self.size -= size
+            self.evictions += 1
+
+    def take_counters(self):
+        """(hits, misses, stores, evictions) since the last call, for merging across processes."""
+        counters = self.hits, self.misses, self.stores, self.evictions
+        self.hits = self.misses = self.stores = self.evictions = 0
+        return counters
+
+    def add_counters(self, counters):
+        hits, misses, stores, evictions = counters
+        self.hits += hits
+        self.misses += misses
+        self.stores += stores
+        self.evictions += evictions
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "bytes": self.size,
+        }
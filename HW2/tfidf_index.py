@@ -0,0 +1,151 @@
+"""
+tfidf_index.py
+Persistent, incremental TF-IDF index for tfidf.py.
+
+The index file keeps, for the last run's document list:
+- each source file's content hash (plus size and mtime, so unchanged files
+  are not even re-read) and its preprocessed term counts;
+- the global document frequencies;
+- the top-n list last written to each tfidf_ file.
+
+On the next run only new or changed documents are preprocessed, the
+document frequencies are adjusted for them, and TF-IDF is recomputed for
+the documents whose scores can have moved: all of them if the number of
+documents changed, otherwise those sharing a term whose document frequency
+changed. A tfidf_ file is rewritten only if its top-n list is different.
+The outputs are the same as a full run of tfidf.main().
+"""
+
+import hashlib
+import os
+import pickle
+from collections import Counter
+from pathlib import Path
+
+import tfidf
+
+DEFAULT_INDEX_PATH = ".tfidf_index.pkl"
+INDEX_VERSION = 1
+
+
+def file_state(fname):
+    """(size, mtime_ns) of a file, or None if it does not exist."""
+    try:
+        st = os.stat(fname)
+    except FileNotFoundError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+def file_digest(fname):
+    h = hashlib.blake2b(digest_size=16)
+    with open(fname, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+class TfidfIndex:
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        self.preprocess = None   # preprocess_key() the term counts were made with
+        self.n = None            # length of the stored top-n lists
+        self.doc_list = []       # document list of the last run
+        self.files = {}          # fname -> {"state", "hash", "counts", "top"}
+        self.df = Counter()      # word -> documents in doc_list containing it
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX_PATH):
+        """The index stored at path, or an empty one if there is none (or it is outdated)."""
+        index = cls(path)
+        try:
+            with open(path, "rb") as f:
+                version, state = pickle.load(f)
+        except FileNotFoundError:
+            return index
+        if version == INDEX_VERSION:
+            index.preprocess, index.n, index.doc_list, index.files, index.df = state
+        return index
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            state = (self.preprocess, self.n, self.doc_list, self.files, self.df)
+            pickle.dump((INDEX_VERSION, state), f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
+
+    def _stale_files(self, names):
+        """Files in names that must be preprocessed again, with their (state, hash)."""
+        stale = {}
+        for fname in names:
+            state = file_state(fname)
+            entry = self.files.get(fname)
+            if entry is not None and not Path(f"preproc_{fname}").exists():
+                entry = None
+            if entry is not None and entry["state"] == state:
+                continue
+            digest = file_digest(fname) if state is not None else None
+            if entry is not None and entry["hash"] == digest:
+                entry["state"] = state   # touched, same content
+                continue
+            stale[fname] = (state, digest)
+        return stale
+
+    def update(self, doc_filenames, stopwords, workers=1, n=5, chunk_size=None, cache=None):
+        """
+        Bring preproc_ and tfidf_ outputs up to date for doc_filenames,
+        doing only the work the changes since the last run require.
+        Returns counts of documents reprocessed, rescored and rewritten.
+        """
+        names = [fname for fname in doc_filenames if fname]
+        key = tfidf.preprocess_key(stopwords)
+        if key != self.preprocess:
+            self.preprocess, self.doc_list, self.files, self.df = key, [], {}, Counter()
+
+        old_mult, new_mult = Counter(self.doc_list), Counter(names)
+        stale = self._stale_files(new_mult)
+        fresh_counts = tfidf.count_documents(list(stale), stopwords, workers, chunk_size=chunk_size,
+                                             cache=cache)
+
+        # Adjust document frequencies for changed documents and list entries
+        df = self.df
+        before = {}
+        new_counts = dict(zip(stale, fresh_counts))
+        for fname in old_mult.keys() | new_mult.keys():
+            old_m, new_m = old_mult[fname], new_mult[fname]
+            if old_m == new_m and fname not in new_counts:
+                continue
+            old_c = self.files[fname]["counts"] if old_m else {}
+            new_c = new_counts.get(fname, old_c) if new_m else {}
+            for w in old_c:
+                before.setdefault(w, df[w])
+                df[w] -= old_m
+            for w in new_c:
+                before.setdefault(w, df[w])
+                df[w] += new_m
+        changed_terms = {w for w, c in before.items() if df[w] != c}
+        for w in changed_terms:
+            if not df[w]:
+                del df[w]
+
+        for fname, (state, digest) in stale.items():
+            self.files[fname] = {"state": state, "hash": digest, "counts": new_counts[fname], "top": None}
+        for fname in self.files.keys() - new_mult.keys():
+            del self.files[fname]
+
+        # Rescore documents whose TF-IDF can have changed
+        idf = tfidf.idf_from_frequencies(df, len(names))
+        rescore_all = len(names) != len(self.doc_list) or n != self.n
+        rescored = rewritten = 0
+        for fname in new_mult:
+            entry = self.files[fname]
+            missing = not Path(f"tfidf_{fname}").exists()
+            if not (rescore_all or missing or entry["top"] is None
+                    or not changed_terms.isdisjoint(entry["counts"])):
+                continue
+            rescored += 1
+            top = tfidf.document_top_n(entry["counts"], idf, n)
+            if top != entry["top"] or missing:
+                tfidf.write_tfidf_file(fname, top)
+                entry["top"] = top
+                rewritten += 1
+        self.doc_list, self.n = names, n
+        return {"documents": len(names), "reprocessed": len(stale), "rescored": rescored, "rewritten": rewritten}
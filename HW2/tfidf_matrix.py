@@ -0,0 +1,126 @@
+"""
+tfidf_matrix.py
+Sparse-matrix TF-IDF for a whole corpus at once.
+
+The corpus is held as a CSR document-term matrix of raw term counts
+(indptr/indices/data NumPy arrays, one row per document, integer term IDs
+assigned in alphabetical order). TF, IDF and TF-IDF are array operations
+over the stored entries, and top_n gives the same lists as
+tfidf.top_n_by_tfidf: scores rounded the way compute_tfidf_for_doc rounds
+them, ties broken alphabetically.
+"""
+
+import math
+from itertools import chain
+
+import numpy as np
+
+
+class TfidfMatrix:
+    def __init__(self, vocab, indptr, indices, data):
+        """
+        vocab: sorted list of terms (term ID = position)
+        indptr, indices, data: CSR arrays of term counts per document
+        (entries of a row need not be sorted by term ID)
+        """
+        self.vocab = vocab
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+
+    @classmethod
+    def from_counts(cls, doc_counts, terms=None):
+        """
+        Build from one {word: occurrences} mapping per document. If the
+        mappings are by external term ID instead, terms[id] gives the word.
+        """
+        keys = set().union(*doc_counts)
+        if terms is None:
+            vocab = sorted(keys)
+            term_ids = {w: i for i, w in enumerate(vocab)}
+        else:
+            keys = sorted(keys, key=terms.__getitem__)
+            vocab = [terms[key] for key in keys]
+            term_ids = {key: i for i, key in enumerate(keys)}
+        lengths = np.fromiter(map(len, doc_counts), dtype=np.int64, count=len(doc_counts))
+        indptr = np.zeros(len(doc_counts) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        nnz = int(indptr[-1])
+        indices = np.fromiter(map(term_ids.__getitem__, chain.from_iterable(doc_counts)),
+                              dtype=np.int32, count=nnz)
+        data = np.fromiter(chain.from_iterable(c.values() for c in doc_counts),
+                           dtype=np.int64, count=nnz)
+        return cls(vocab, indptr, indices, data)
+
+    @classmethod
+    def from_wordlists(cls, wordlists):
+        from collections import Counter
+        return cls.from_counts([Counter(words) for words in wordlists])
+
+    @property
+    def n_docs(self):
+        return len(self.indptr) - 1
+
+    def _rows(self):
+        """Document index of every stored entry."""
+        return np.repeat(np.arange(self.n_docs), np.diff(self.indptr))
+
+    def tf(self):
+        """TF of every stored entry: count / document length."""
+        rows = self._rows()
+        totals = np.bincount(rows, weights=self.data, minlength=self.n_docs)
+        return self.data / totals[rows]
+
+    def document_frequencies(self):
+        return np.bincount(self.indices, minlength=len(self.vocab))
+
+    def idf(self):
+        """IDF per term ID, log(N / df) + 1 as in tfidf.compute_idf."""
+        df = self.document_frequencies()
+        counts, inverse = np.unique(df, return_inverse=True)
+        # math.log, like compute_idf, once per distinct document frequency
+        values = [math.log(self.n_docs / c) + 1.0 for c in counts.tolist()]
+        return np.array(values)[inverse]
+
+    def tfidf(self, rounded=True):
+        """
+        TF-IDF of every stored entry. rounded=True rounds like
+        compute_tfidf_for_doc: round(score + 1e-12, 2).
+        """
+        scores = self.tf() * self.idf()[self.indices]
+        if not rounded:
+            return scores
+        scores += 1e-12
+        result = np.round(scores, 2)
+        # np.round scales by 100 first, so it may differ from round() right
+        # at a half-way point; redo those few entries with round() itself
+        scaled = scores * 100
+        halfway = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+        for i in halfway.tolist():
+            result[i] = round(float(scores[i]), 2)
+        return result
+
+    def top_n(self, n=5):
+        """
+        Each document's top-n (word, score) list, sorted by descending rounded
+        score and then alphabetically, exactly like top_n_by_tfidf.
+        """
+        scores = self.tfidf()
+        # one integer key per entry: higher score first, then lower term ID,
+        # which is alphabetical order
+        cents = np.rint(scores * 100).astype(np.int64)
+        keys = (cents.max(initial=0) - cents) * len(self.vocab) + self.indices
+
+        vocab = self.vocab
+        indptr = self.indptr.tolist()
+        tops = []
+        for start, end in zip(indptr, indptr[1:]):
+            row = keys[start:end]
+            if end - start > n:
+                best = np.argpartition(row, n - 1)[:n] if n > 0 else row[:0]
+            else:
+                best = np.arange(end - start)
+            best = best[np.argsort(row[best])] + start
+            tops.append(list(zip(map(vocab.__getitem__, self.indices[best].tolist()),
+                                 scores[best].tolist())))
+        return tops
@@ -0,0 +1,107 @@
+"""
+tfidf_output.py
+Consolidated JSON Lines output for tfidf.py.
+
+Instead of a preproc_ and a tfidf_ file per document, every output is one
+JSON record in a single file (or in a few shard files):
+
+    {"doc": "a.txt", "preproc": "word word ..."}
+    {"doc": "a.txt", "tfidf": [["word", 0.12], ...]}
+
+Both records of a document go to the same shard, chosen from a hash of
+its name. Records are serialized by the caller and written by a
+background thread through large buffers, so preprocessing never waits on
+the filesystem and no per-document files are created.
+"""
+
+import json
+import os
+import queue
+import threading
+import zlib
+
+BUFFER_SIZE = 1 << 20   # bytes buffered per shard file
+QUEUE_SIZE = 4096       # records waiting for the writer thread
+
+
+def shard_paths(path, shards):
+    """path itself for one shard, else path with -00000-of-00004 style suffixes."""
+    if shards == 1:
+        return [path]
+    root, ext = os.path.splitext(path)
+    return [f"{root}-{i:05d}-of-{shards:05d}{ext}" for i in range(shards)]
+
+
+class _PreprocRecord:
+    """open_preproc() writer: one preproc record streamed piece by piece."""
+
+    def __init__(self, output, shard, fname):
+        self.output = output
+        self.shard = shard
+        prefix = json.dumps({"doc": fname, "preproc": ""}, ensure_ascii=False)
+        output._put(shard, prefix[:-2])   # up to and including the opening quote
+
+    def write(self, text):
+        if text:
+            # JSON escaping is per character, so pieces can be escaped separately
+            self.output._put(self.shard, json.dumps(text, ensure_ascii=False)[1:-1])
+
+    def close(self):
+        self.output._put(self.shard, '"}\n')
+
+
+class JsonlOutput:
+    def __init__(self, path, shards=1):
+        self.paths = shard_paths(path, shards)
+        self.files = [open(p, "w", encoding="utf-8", buffering=BUFFER_SIZE) for p in self.paths]
+        self.queue = queue.Queue(QUEUE_SIZE)
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name="tfidf-jsonl-writer", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            if self.error is None:
+                try:
+                    self.files[item[0]].write(item[1])
+                except OSError as e:
+                    self.error = e   # keep draining so producers never block
+
+    def _put(self, shard, text):
+        if self.error is not None:
+            raise self.error
+        self.queue.put((shard, text))
+
+    def _shard(self, fname):
+        return zlib.crc32(fname.encode("utf-8")) % len(self.files)
+
+    def write_preproc(self, fname, content):
+        record = json.dumps({"doc": fname, "preproc": content}, ensure_ascii=False)
+        self._put(self._shard(fname), record + "\n")
+
+    def open_preproc(self, fname):
+        return _PreprocRecord(self, self._shard(fname), fname)
+
+    def write_tfidf(self, fname, top_list):
+        record = json.dumps({"doc": fname, "tfidf": top_list}, ensure_ascii=False)
+        self._put(self._shard(fname), record + "\n")
+
+    def close(self):
+        """Wait for every queued record to be written, then close the files."""
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        for f in self.files:
+            f.close()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
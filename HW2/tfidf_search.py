@@ -0,0 +1,144 @@
+"""
+tfidf_search.py
+Ranked free-text search over the TF-IDF corpus.
+
+Documents are indexed as L2-normalized TF-IDF vectors in an inverted index:
+for every term, the IDs of the documents containing it (ascending) and the
+term's weight in each, stored term-major as NumPy arrays, together with
+the term's largest weight. A query goes through the same tokenize()
+pipeline as the documents and is scored by cosine similarity.
+
+Top-k retrieval uses max-score pruning. Query terms are taken in order of
+their score upper bound (query weight x largest document weight):
+- while a document matching none of the terms seen so far could still
+  reach the current k-th best score, each term's whole postings list is
+  added into an accumulator;
+- after that no new document can enter the top k, so each remaining term
+  is only looked up (binary search) for the surviving candidates, and
+  candidates whose score plus the remaining upper bounds cannot reach the
+  k-th best are dropped as soon as that is known.
+Long postings lists of common terms are mostly never scanned.
+"""
+
+import math
+from collections import Counter
+
+import numpy as np
+
+import tfidf
+from tfidf_matrix import TfidfMatrix
+
+# Slack for floating-point error when comparing pruning bounds
+EPSILON = 1e-9
+
+
+class SearchIndex:
+    def __init__(self, names, vocab, idf, term_ptr, doc_ids, weights, stopwords=()):
+        """
+        names: document names, by document ID
+        vocab: sorted list of terms (term ID = position), idf: idf per term ID
+        term_ptr, doc_ids, weights: term-major postings; term t's postings
+            are doc_ids/weights[term_ptr[t]:term_ptr[t + 1]], doc IDs ascending
+        """
+        self.names = names
+        self.vocab = vocab
+        self.term_ids = {w: i for i, w in enumerate(vocab)}
+        self.idf = idf
+        self.term_ptr = term_ptr
+        self.doc_ids = doc_ids
+        self.weights = weights
+        self.stopwords = stopwords
+        # largest weight of each term, the per-term upper bound
+        nonempty = np.diff(term_ptr) > 0
+        self.max_weight = np.zeros(len(vocab), dtype=np.float64)
+        self.max_weight[nonempty] = np.maximum.reduceat(weights, term_ptr[:-1][nonempty])
+        # accumulator reused across queries (touched entries are reset after each)
+        self._acc = np.zeros(len(names), dtype=np.float64)
+
+    @classmethod
+    def from_matrix(cls, matrix, names, stopwords=()):
+        """Index the documents of a TfidfMatrix."""
+        weights = matrix.tfidf(rounded=False)
+        rows = matrix._rows()
+        norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=matrix.n_docs))
+        weights = (weights / norms[rows]).astype(np.float32)
+        # term-major order; a stable sort keeps document IDs ascending per term
+        order = np.argsort(matrix.indices, kind="stable")
+        term_ptr = np.zeros(len(matrix.vocab) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(matrix.indices, minlength=len(matrix.vocab)), out=term_ptr[1:])
+        return cls(names, matrix.vocab, matrix.idf(), term_ptr,
+                   rows[order].astype(np.int32), weights[order], stopwords)
+
+    @classmethod
+    def from_counts(cls, doc_counts, names, stopwords=()):
+        return cls.from_matrix(TfidfMatrix.from_counts(doc_counts), names, stopwords)
+
+    def query_vector(self, text):
+        """[(term ID, weight)] of a query's normalized TF-IDF vector, unknown terms dropped."""
+        counts = Counter(tfidf.tokenize(text, self.stopwords))
+        total = sum(counts.values())
+        vector = [(self.term_ids[w], c / total * self.idf[self.term_ids[w]])
+                  for w, c in counts.items() if w in self.term_ids]
+        norm = math.sqrt(sum(v * v for _, v in vector))
+        return [(t, v / norm) for t, v in vector]
+
+    def _postings(self, t):
+        lo, hi = self.term_ptr[t], self.term_ptr[t + 1]
+        return self.doc_ids[lo:hi], self.weights[lo:hi]
+
+    def search(self, text, k=10):
+        """Top-k (name, cosine similarity) for a free-text query, best first."""
+        vector = self.query_vector(text)
+        if not vector or k <= 0:
+            return []
+        bounds = [v * self.max_weight[t] for t, v in vector]
+        order = sorted(range(len(vector)), key=lambda i: -bounds[i])
+        remaining = sum(bounds)
+
+        # Phase 1: full postings into the accumulator while new documents can still make the top k
+        acc = self._acc
+        candidates = np.empty(0, dtype=np.int32)
+        threshold = -math.inf
+        i = 0
+        while i < len(order) and remaining >= threshold - EPSILON:
+            t, v = vector[order[i]]
+            ids, ws = self._postings(t)
+            acc[ids] += v * ws
+            candidates = np.union1d(candidates, ids)
+            remaining -= bounds[order[i]]
+            threshold = self._kth_best(acc[candidates], k)
+            i += 1
+        scores = acc[candidates]
+        acc[candidates] = 0.0
+
+        # Phase 2: remaining terms only update surviving candidates
+        for j in order[i:]:
+            keep = scores + remaining >= threshold - EPSILON
+            candidates, scores = candidates[keep], scores[keep]
+            t, v = vector[j]
+            ids, ws = self._postings(t)
+            pos = np.searchsorted(ids, candidates)
+            pos[pos == len(ids)] = 0
+            hit = ids[pos] == candidates
+            scores[hit] += v * ws[pos[hit]]
+            remaining -= bounds[j]
+            threshold = self._kth_best(scores, k)
+
+        best = np.lexsort((candidates, -scores))[:k]
+        return [(self.names[d], s) for d, s in zip(candidates[best].tolist(), scores[best].tolist())]
+
+    @staticmethod
+    def _kth_best(scores, k):
+        if len(scores) < k:
+            return -math.inf
+        return float(np.partition(scores, len(scores) - k)[len(scores) - k])
+
+
+def show_search_results(index, text, k=10):
+    results = index.search(text, k)
+    if not results:
+        print(f"No documents match '{text}'.")
+        return
+    print(f"Top {len(results)} documents for '{text}':")
+    for rank, (name, score) in enumerate(results, 1):
+        print(f"{rank}. {name} ({score:.4f})")
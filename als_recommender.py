@@ -0,0 +1,294 @@
+"""
+als_recommender.py
+------------------
+Matrix-factorization recommender trained with alternating least squares.
+
+The model learns a latent factor vector for every user and every movie
+from the user -> movie ratings loaded by movie_recommender.py, so it can
+recommend across genres instead of only inside the user's favorite one.
+Each half-iteration solves all users (or all movies) at once with a
+batched NumPy solve.
+
+Usage:
+    python als_recommender.py ratings.txt --factors 20 --save model.npz
+    python als_recommender.py --load model.npz --user 1 -n 5
+"""
+import argparse
+import time
+
+import numpy as np
+
+import movie_recommender as mr
+
+
+# Upper bound on floats materialized per batch of padded factor rows
+GRAM_CHUNK_FLOATS = 1 << 22
+
+
+# ------------------------------
+# Data preparation
+# ------------------------------
+def build_rating_index(user_ratings):
+    """
+    Turn {user_id: {movie_name: rating}} into sorted user ids, sorted
+    titles and CSR arrays (indptr, item index, rating) grouped by user.
+    Users without any ratings are dropped.
+    """
+    user_ids = sorted(u for u, rated in user_ratings.items() if rated)
+    titles = sorted({m for u in user_ids for m in user_ratings[u]})
+    title_index = {t: i for i, t in enumerate(titles)}
+
+    indptr = np.zeros(len(user_ids) + 1, dtype=np.int64)
+    items = []
+    values = []
+    for row, user_id in enumerate(user_ids):
+        rated = user_ratings[user_id]
+        items.extend(title_index[m] for m in rated)
+        values.extend(rated.values())
+        indptr[row + 1] = indptr[row] + len(rated)
+
+    items = np.asarray(items, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+
+    return user_ids, titles, indptr, items, values
+
+
+def transpose_csr(indptr, indices, values, n_cols):
+    """Regroup CSR arrays by column instead of by row."""
+    rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    order = np.argsort(indices, kind="stable")
+    counts = np.bincount(indices, minlength=n_cols)
+    col_indptr = np.zeros(n_cols + 1, dtype=np.int64)
+    np.cumsum(counts, out=col_indptr[1:])
+    return col_indptr, rows[order], values[order]
+
+
+# ------------------------------
+# Alternating least squares
+# ------------------------------
+def _solve_side(fixed, indptr, indices, values, regularization):
+    """
+    Solve the regularized least-squares problem for every row at once.
+
+    For row u with rated columns J and ratings r, the new factor is
+    (F_J^T F_J + reg * |J| * I)^-1 F_J^T r, where F is the fixed side.
+    Rows are bucketed by power-of-two rating counts and zero-padded so
+    each bucket's Gram matrices come from one batched matmul; all
+    systems then go through a single batched solve.
+    """
+    n_rows = len(indptr) - 1
+    k = fixed.shape[1]
+    counts = np.diff(indptr)
+    gram = np.empty((n_rows, k, k))
+    rhs = np.empty((n_rows, k))
+
+    buckets = np.ceil(np.log2(np.maximum(counts, 1))).astype(np.int64)
+    for bucket in np.unique(buckets):
+        rows = np.flatnonzero(buckets == bucket)
+        width = int(counts[rows].max())
+        step = max(1, GRAM_CHUNK_FLOATS // (width * k))
+        for lo in range(0, len(rows), step):
+            batch = rows[lo:lo + step]
+            pos = indptr[batch, None] + np.arange(width)
+            mask = np.arange(width) < counts[batch, None]
+            pos = np.where(mask, pos, 0)
+            f = fixed[indices[pos]] * mask[:, :, None]
+            gram[batch] = np.matmul(f.transpose(0, 2, 1), f)
+            rhs[batch] = np.matmul(f.transpose(0, 2, 1), (values[pos] * mask)[:, :, None])[:, :, 0]
+
+    gram += (regularization * counts.astype(np.float64))[:, None, None] * np.eye(k)
+    return np.linalg.solve(gram, rhs[:, :, None])[:, :, 0]
+
+
+class ALSModel:
+    """Explicit-feedback matrix factorization: rating ~ mean + user . movie."""
+
+    def __init__(self, factors=20, regularization=0.1, iterations=10, seed=0):
+        self.factors = factors
+        self.regularization = regularization
+        self.iterations = iterations
+        self.seed = seed
+
+        self.user_ids = []
+        self.titles = []
+        self.global_mean = 0.0
+        self.user_factors = np.zeros((0, factors))
+        self.item_factors = np.zeros((0, factors))
+        self.rated_indptr = np.zeros(1, dtype=np.int64)
+        self.rated_items = np.zeros(0, dtype=np.int64)
+        self._user_row = {}
+        self._title_col = {}
+
+    def fit(self, user_ratings, verbose=False):
+        """Train on {user_id: {movie_name: rating}} and return self."""
+        user_ids, titles, indptr, items, values = build_rating_index(user_ratings)
+        if not user_ids:
+            raise ValueError("No ratings available to train on.")
+
+        self.global_mean = float(values.mean())
+        centered = values - self.global_mean
+        item_indptr, item_users, item_values = transpose_csr(indptr, items, centered, len(titles))
+
+        rng = np.random.default_rng(self.seed)
+        scale = 1.0 / np.sqrt(self.factors)
+        users = rng.normal(0.0, scale, (len(user_ids), self.factors))
+        movies = rng.normal(0.0, scale, (len(titles), self.factors))
+
+        for it in range(1, self.iterations + 1):
+            start = time.perf_counter()
+            users = _solve_side(movies, indptr, items, centered, self.regularization)
+            movies = _solve_side(users, item_indptr, item_users, item_values, self.regularization)
+            if verbose:
+                rmse = self._rmse(users, movies, indptr, items, centered)
+                print(f"Iteration {it}: train RMSE {rmse:.4f} ({time.perf_counter() - start:.2f}s)")
+
+        self.user_ids = user_ids
+        self.titles = titles
+        self.user_factors = users
+        self.item_factors = movies
+        self.rated_indptr = indptr
+        self.rated_items = items
+        self._build_lookups()
+        return self
+
+    @staticmethod
+    def _rmse(users, movies, indptr, items, centered):
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        pred = np.einsum("ij,ij->i", users[rows], movies[items])
+        return float(np.sqrt(np.mean((pred - centered) ** 2)))
+
+    def _build_lookups(self):
+        self._user_row = {u: i for i, u in enumerate(self.user_ids)}
+        self._title_col = {t: i for i, t in enumerate(self.titles)}
+
+    # ------------------------------
+    # Scoring
+    # ------------------------------
+    def predict(self, user_id, movie_name):
+        """Predicted rating, or None if the user or movie is unknown."""
+        row = self._user_row.get(user_id)
+        col = self._title_col.get(movie_name)
+        if row is None or col is None:
+            return None
+        return self.global_mean + float(self.user_factors[row] @ self.item_factors[col])
+
+    def recommend(self, user_id, n=3):
+        """Top n unrated movies for one user as [(movie_name, score), ...]."""
+        row = self._user_row.get(user_id)
+        if row is None:
+            return []
+        scores = self.global_mean + self.item_factors @ self.user_factors[row]
+        scores[self.rated_items[self.rated_indptr[row]:self.rated_indptr[row + 1]]] = -np.inf
+        n = min(n, len(scores))
+        if n <= 0:
+            return []
+        top = np.argpartition(-scores, n - 1)[:n]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.titles[i], float(scores[i])) for i in top if np.isfinite(scores[i])]
+
+    def recommend_all(self, n=10):
+        """
+        Top n unrated movies for every user.
+
+        Scores all users with a single matrix multiply, masks already
+        rated movies and selects each row's top n with argpartition.
+        Returns {user_id: [(movie_name, score), ...]}.
+        """
+        n = min(n, len(self.titles))
+        if n <= 0 or not self.user_ids:
+            return {u: [] for u in self.user_ids}
+
+        scores = self.user_factors.astype(np.float32) @ self.item_factors.astype(np.float32).T
+        scores += np.float32(self.global_mean)
+        rows = np.repeat(np.arange(len(self.user_ids)), np.diff(self.rated_indptr))
+        scores[rows, self.rated_items] = -np.inf
+
+        top = np.argpartition(-scores, n - 1, axis=1)[:, :n]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        results = {}
+        for row, user_id in enumerate(self.user_ids):
+            results[user_id] = [(self.titles[i], float(s))
+                                for i, s in zip(top[row], top_scores[row]) if np.isfinite(s)]
+        return results
+
+    # ------------------------------
+    # Persistence
+    # ------------------------------
+    def save(self, path):
+        """Save the trained model as a .npz archive."""
+        np.savez(
+            path,
+            user_factors=self.user_factors,
+            item_factors=self.item_factors,
+            user_ids=np.asarray(self.user_ids),
+            titles=np.asarray(self.titles, dtype=str),
+            rated_indptr=self.rated_indptr,
+            rated_items=self.rated_items,
+            global_mean=self.global_mean,
+            params=np.array([self.factors, self.regularization, self.iterations, self.seed]),
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Load a model written by save()."""
+        with np.load(path, allow_pickle=False) as data:
+            factors, regularization, iterations, seed = data["params"].tolist()
+            model = cls(int(factors), regularization, int(iterations), int(seed))
+            model.user_factors = data["user_factors"]
+            model.item_factors = data["item_factors"]
+            model.user_ids = data["user_ids"].tolist()
+            model.titles = data["titles"].tolist()
+            model.rated_indptr = data["rated_indptr"]
+            model.rated_items = data["rated_items"]
+            model.global_mean = float(data["global_mean"])
+        model._build_lookups()
+        return model
+
+
+# ------------------------------
+# CLI
+# ------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train or query an ALS movie recommender.")
+    parser.add_argument("ratings", nargs="?", help="ratings file (movie|rating|user)")
+    parser.add_argument("--load", help="load a saved .npz model instead of training")
+    parser.add_argument("--save", help="write the trained model to this .npz path")
+    parser.add_argument("--factors", type=int, default=20)
+    parser.add_argument("--reg", type=float, default=0.1)
+    parser.add_argument("--iters", type=int, default=10)
+    parser.add_argument("--user", type=int, help="user ID to recommend for")
+    parser.add_argument("-n", type=int, default=3, help="number of recommendations")
+    args = parser.parse_args(argv)
+
+    if args.load:
+        model = ALSModel.load(args.load)
+    elif args.ratings:
+        _, user_ratings = mr.load_ratings_file(args.ratings)
+        if not user_ratings:
+            print("⚠️  No ratings loaded. Please check the file path or file format.")
+            return
+        start = time.perf_counter()
+        model = ALSModel(args.factors, args.reg, args.iters).fit(user_ratings, verbose=True)
+        print(f"Trained on {len(model.user_ids)} users x {len(model.titles)} movies "
+              f"in {time.perf_counter() - start:.2f}s")
+    else:
+        parser.error("either a ratings file or --load is required")
+
+    if args.save:
+        model.save(args.save)
+        print(f"Model saved to {args.save}")
+
+    if args.user is not None:
+        recs = model.recommend(args.user, args.n)
+        if not recs:
+            print(f"No recommendations available for user {args.user}.")
+        for i, (movie, score) in enumerate(recs, start=1):
+            print(f"{i}. {movie} — {score:.2f}")
+
+
+if __name__ == "__main__":
+    main()
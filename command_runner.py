@@ -0,0 +1,185 @@
+"""
+command_runner.py
+-----------------
+Run movie_recommender queries from a command file, without the menu.
+
+Each non-empty line of the command file is one command (shell-style
+quoting, '#' starts a comment):
+
+    load movies.txt ratings.txt
+    topn 10 [mean|bayesian|wilson]
+    genre-topn "science fiction" 5
+    topgenres 3 [mean|bayesian|wilson]
+    favgenre 42
+    recommend 42
+
+Every command produces one JSON object on its own output line as soon as
+it finishes, with its timing in milliseconds:
+
+    {"line": 2, "command": "topn", "args": ["10"], "ok": true,
+     "ms": 0.41, "result": [{"movie": "...", "score": 4.5}, ...]}
+
+Failures are reported the same way with "ok": false and an "error"
+message, and the run continues. Messages printed by the loaders go to
+stderr so stdout stays pure JSON Lines.
+
+Usage:
+    python command_runner.py commands.txt [-o results.jsonl]
+    python command_runner.py - < commands.txt
+"""
+import argparse
+import contextlib
+import inspect
+import json
+import shlex
+import sys
+import time
+
+import movie_recommender as mr
+
+
+class CommandRunner:
+    """Executes commands against one loaded dataset."""
+
+    def __init__(self):
+        self.movies = {}
+        self.ratings = {}
+        self.user_ratings = {}
+
+    def _require_data(self):
+        if not self.movies or not self.ratings:
+            raise ValueError("no dataset loaded; run 'load <movies> <ratings>' first")
+
+    # ------------------------------
+    # Commands (each returns a JSON-serializable result)
+    # ------------------------------
+    def cmd_load(self, movies_path, ratings_path):
+        movies = mr.load_movies_file(movies_path)
+        ratings, user_ratings = mr.load_ratings_file(ratings_path, movies)
+        if not movies or not ratings:
+            raise ValueError("movies or ratings file could not be loaded")
+        self.movies, self.ratings, self.user_ratings = movies, ratings, user_ratings
+        return {"movies": len(movies), "rated_movies": len(ratings), "users": len(user_ratings)}
+
+    def cmd_topn(self, n, rank_by="mean"):
+        self._require_data()
+        top = mr.top_movies(self.movies, self.ratings, int(n), rank_by)
+        return [{"movie": m, "score": s} for m, s in top]
+
+    def cmd_genre_topn(self, genre, n):
+        self._require_data()
+        top = mr.top_movies_in_genre(self.movies, self.ratings, genre, int(n))
+        return [{"movie": m, "score": s} for m, s in top]
+
+    def cmd_topgenres(self, n, rank_by="mean"):
+        self._require_data()
+        top = mr.top_genres(self.movies, self.ratings, int(n), rank_by)
+        return [{"genre": g, "score": s} for g, s in top]
+
+    def cmd_favgenre(self, user_id):
+        self._require_data()
+        user_id = int(user_id)
+        return {"user": user_id, "genre": mr.user_favorite_genre(user_id, self.movies, self.user_ratings)}
+
+    def cmd_recommend(self, user_id, n=3):
+        self._require_data()
+        user_id = int(user_id)
+        genre, recs = mr.genre_recommendations(self.movies, self.ratings, self.user_ratings, user_id, int(n))
+        return {"user": user_id, "genre": genre, "movies": [{"movie": m, "score": s} for m, s in recs]}
+
+    COMMANDS = {
+        "load": cmd_load,
+        "topn": cmd_topn,
+        "genre-topn": cmd_genre_topn,
+        "topgenres": cmd_topgenres,
+        "favgenre": cmd_favgenre,
+        "recommend": cmd_recommend,
+    }
+
+    def execute(self, command, args):
+        """Run one command; returns its result or raises on bad input."""
+        handler = self.COMMANDS.get(command)
+        if handler is None:
+            raise ValueError(f"unknown command '{command}'")
+        try:
+            inspect.signature(handler).bind(self, *args)
+        except TypeError:
+            raise ValueError(f"wrong number of arguments for '{command}'") from None
+        try:
+            return handler(self, *args)
+        except KeyError as e:
+            raise ValueError(f"unknown value {e}") from None
+
+
+def parse_command_line(line):
+    """[command, *args] for one command-file line, or None for blanks/comments."""
+    parts = shlex.split(line, comments=True)
+    return parts or None
+
+
+def run_commands(lines, out, runner=None):
+    """
+    Execute commands from an iterable of lines, writing one JSON object per
+    command to out (flushed after each). Returns (succeeded, failed).
+    """
+    runner = runner or CommandRunner()
+    succeeded = failed = 0
+    for line_num, line in enumerate(lines, start=1):
+        try:
+            parts = parse_command_line(line)
+        except ValueError as e:
+            parts, parse_error = [line.strip()], e
+        else:
+            parse_error = None
+        if parts is None:
+            continue
+
+        record = {"line": line_num, "command": parts[0], "args": parts[1:]}
+        start = time.perf_counter()
+        try:
+            if parse_error is not None:
+                raise ValueError(f"cannot parse line: {parse_error}")
+            with contextlib.redirect_stdout(sys.stderr):
+                result = runner.execute(parts[0], parts[1:])
+            record.update(ok=True, ms=round((time.perf_counter() - start) * 1000, 3), result=result)
+            succeeded += 1
+        except ValueError as e:
+            record.update(ok=False, ms=round((time.perf_counter() - start) * 1000, 3), error=str(e))
+            failed += 1
+        except Exception as e:
+            # Unexpected failure inside one command: record it and keep going
+            record.update(ok=False, ms=round((time.perf_counter() - start) * 1000, 3),
+                          error=f"{type(e).__name__}: {e}")
+            failed += 1
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+    return succeeded, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run movie recommender commands from a file, as JSON Lines.")
+    parser.add_argument("commands", help="command file, or - for stdin")
+    parser.add_argument("-o", "--output", help="write results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    try:
+        source = sys.stdin if args.commands == "-" else open(args.commands, "r", encoding="utf-8")
+    except OSError as e:
+        print(f"Error: cannot read command file '{args.commands}': {e.strerror}", file=sys.stderr)
+        return 2
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    start = time.perf_counter()
+    try:
+        succeeded, failed = run_commands(source, out)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+    print(f"✅ {succeeded} commands succeeded, {failed} failed in {time.perf_counter() - start:.2f}s",
+          file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+cooccurrence_index.py
+---------------------
+"People who rated X also rated ..." lookups from a co-occurrence index.
+
+The index is built in one pass over each user's rated titles: every pair
+of titles rated by the same user bumps a co-occurrence count. Two limits
+keep it affordable:
+
+- users with more than max_user_titles ratings are skipped, since a
+  single heavy user contributes a quadratic number of weak pairs;
+- optionally, each movie keeps at most `capacity` partner counts; when
+  it overflows, a heap selection keeps the strongest half, but never
+  fewer than top_k (the long tail is dropped, trading exactness for
+  bounded memory). capacity must be at least top_k.
+
+Each movie's top-K partners are kept as a ready-made sorted list, so an
+"also rated" query is O(K). Appended ratings update the counts
+incrementally and only the touched movies' lists are re-selected (lazily,
+on their next query).
+"""
+import heapq
+from collections import Counter
+
+import movie_recommender as mr
+
+
+DEFAULT_TOP_K = 10
+DEFAULT_MAX_USER_TITLES = 500
+
+
+class CooccurrenceIndex:
+    """Top-K co-rated titles per movie, maintained incrementally."""
+
+    def __init__(self, top_k=DEFAULT_TOP_K, max_user_titles=DEFAULT_MAX_USER_TITLES, capacity=None):
+        if capacity is not None and capacity < max(top_k, 1):
+            raise ValueError(f"capacity must be at least top_k ({top_k}), got {capacity}.")
+        self.top_k = top_k
+        self.max_user_titles = max_user_titles
+        self.capacity = capacity
+        self.counts = {}        # movie -> {other movie: users who rated both}
+        self.user_titles = {}   # user_id -> set of rated titles
+        self.heavy_users = set()
+        self._top = {}          # movie -> [(other, count), ...] best first
+        self._dirty = set()     # movies whose _top needs re-selecting
+
+    @classmethod
+    def from_user_ratings(cls, user_ratings, **kwargs):
+        """Build the index from {user_id: {movie_name: rating}}."""
+        index = cls(**kwargs)
+        for user_id, rated in user_ratings.items():
+            index.add_user(user_id, rated)
+        return index
+
+    # ------------------------------
+    # Updates
+    # ------------------------------
+    def _pair(self, movie, others):
+        """Count one co-rating of movie with each title in others."""
+        partners = self.counts.get(movie)
+        if partners is None:
+            partners = self.counts[movie] = Counter()
+        partners.update(others)
+        if movie in partners:
+            del partners[movie]
+        if self.capacity is not None and len(partners) > self.capacity:
+            keep = heapq.nsmallest(max(self.capacity // 2, self.top_k), partners.items(), key=lambda kv: (-kv[1], kv[0]))
+            self.counts[movie] = Counter(dict(keep))
+        self._dirty.add(movie)
+
+    def add_user(self, user_id, titles):
+        """Add a user's rated titles, pairing each new title with all the others."""
+        seen = self.user_titles.setdefault(user_id, set())
+        new = [t for t in dict.fromkeys(titles) if t not in seen]
+        if not new:
+            return
+        if user_id in self.heavy_users or len(seen) + len(new) > self.max_user_titles:
+            # Heavy user: stop pairing; counts already added stay
+            self.heavy_users.add(user_id)
+            seen.update(new)
+            return
+        old = list(seen)
+        seen.update(new)
+        for title in new:
+            self._pair(title, seen)
+        for title in old:
+            self._pair(title, new)
+
+    def add_rating(self, user_id, title):
+        """Record that user_id rated title (incremental update)."""
+        self.add_user(user_id, (title,))
+
+    def append_ratings_file(self, filename):
+        """Apply ratings appended to a movie|rating|user file. Returns lines applied."""
+        applied = 0
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                for line_num, line in enumerate(f, start=1):
+                    parsed = mr.parse_ratings_line(line, line_num)
+                    if parsed is None:
+                        continue
+                    movie_name, _, user_id = parsed
+                    self.add_rating(user_id, movie_name)
+                    applied += 1
+        except FileNotFoundError:
+            print(f"Error: Ratings file '{filename}' not found.")
+        return applied
+
+    # ------------------------------
+    # Queries
+    # ------------------------------
+    def also_rated(self, title, n=None):
+        """[(other_title, co-raters), ...] for the titles most often co-rated with title."""
+        if title in self._dirty:
+            partners = self.counts.get(title, {})
+            # Highest count first, then alphabetical title for ties
+            self._top[title] = heapq.nsmallest(self.top_k, partners.items(), key=lambda kv: (-kv[1], kv[0]))
+            self._dirty.discard(title)
+        top = self._top.get(title, [])
+        return top if n is None or n >= len(top) else top[:n]
+
+    def __contains__(self, title):
+        return title in self.counts
+
+
+def show_also_rated(index, title, n):
+    """Display the top n titles co-rated with a title."""
+    title = title.strip().title()
+    top = index.also_rated(title, n)
+    if not top:
+        print(f"No co-rated movies found for '{title}'.")
+        return
+    print(f"\n🎞️  Viewers of '{title}' also rated:")
+    for i, (movie, count) in enumerate(top, 1):
+        print(f"{i}. {movie} — {count} shared viewer{'s' if count != 1 else ''}")
@@ -0,0 +1,203 @@
+"""
+dataset_registry.py
+-------------------
+Several named movie/ratings datasets held side by side under a memory budget.
+
+Each dataset is the usual (movies, ratings, user_ratings) triple. The
+registry estimates every dataset's in-memory footprint and, when the total
+goes over the budget, evicts the least-recently-used dataset to a pickle
+snapshot on disk. Touching an evicted dataset reloads it from the snapshot,
+which is much faster than reparsing the original text files.
+
+Queries are routed by dataset name:
+    registry.query("eu", "topn", 5)
+"""
+import itertools
+import os
+import pickle
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import movie_recommender as mr
+
+
+DEFAULT_MEMORY_BUDGET = 512 * 1024 * 1024  # bytes
+
+# Query name -> function of (dataset, *args), all routed to movie_recommender
+QUERIES = {
+    "topn": lambda d, n, rank_by="mean": mr.top_n_movies(d.movies, d.ratings, n, rank_by),
+    "genre-topn": lambda d, genre, n: mr.top_n_movies_in_genre(d.movies, d.ratings, genre, n),
+    "topgenres": lambda d, n, rank_by="mean": mr.top_n_genres(d.movies, d.ratings, n, rank_by),
+    "favgenre": lambda d, user_id: mr.user_favorite_genre(user_id, d.movies, d.user_ratings),
+    "recommend": lambda d, user_id: mr.recommend_movies(d.movies, d.ratings, d.user_ratings, user_id),
+}
+
+
+def estimate_bytes(*objs):
+    """
+    Approximate deep size of nested dicts/lists/tuples of str/int/float.
+    Objects shared between containers (e.g. title strings) count once.
+    """
+    seen = set()
+    total = 0
+    stack = list(objs)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set)):
+            stack.extend(obj)
+    return total
+
+
+class Dataset:
+    """One named (movies, ratings, user_ratings) triple and its bookkeeping."""
+
+    def __init__(self, name, movies, ratings, user_ratings, snapshot_path):
+        self.name = name
+        self.movies = movies
+        self.ratings = ratings
+        self.user_ratings = user_ratings
+        self.snapshot_path = snapshot_path
+        self.nbytes = estimate_bytes(movies, ratings, user_ratings)
+        self.dirty = True          # in-memory data not yet in the snapshot
+        self.loaded = True
+        self.last_used = time.monotonic()
+
+    def unload(self):
+        """Write the snapshot if needed and drop the in-memory data."""
+        if self.dirty:
+            tmp = self.snapshot_path + ".tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump((self.movies, self.ratings, self.user_ratings), f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.snapshot_path)
+            self.dirty = False
+        self.movies = self.ratings = self.user_ratings = None
+        self.loaded = False
+
+    def reload(self):
+        """Bring an evicted dataset back from its snapshot."""
+        with open(self.snapshot_path, "rb") as f:
+            self.movies, self.ratings, self.user_ratings = pickle.load(f)
+        self.loaded = True
+
+
+class DatasetRegistry:
+    """Named datasets with LRU eviction under a memory budget (in bytes)."""
+
+    def __init__(self, memory_budget=None, snapshot_dir=None):
+        self.memory_budget = DEFAULT_MEMORY_BUDGET if memory_budget is None else memory_budget
+        self._owns_snapshot_dir = not snapshot_dir   # a temporary directory close() removes
+        self.snapshot_dir = snapshot_dir or tempfile.mkdtemp(prefix="movie_datasets_")
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        self._datasets = {}
+        self._lru = OrderedDict()   # loaded dataset names, least recently used first
+        self._lock = threading.RLock()
+        self._snapshot_ids = itertools.count()
+        self.evictions = 0
+        self.reloads = 0
+
+    def close(self):
+        """Delete the snapshot directory if the registry created it."""
+        with self._lock:
+            if self._owns_snapshot_dir:
+                shutil.rmtree(self.snapshot_dir, ignore_errors=True)
+                self._owns_snapshot_dir = False
+
+    def _snapshot_path(self, name):
+        safe = re.sub(r"[^\w.-]", "_", name)
+        return os.path.join(self.snapshot_dir, f"{safe}-{next(self._snapshot_ids)}.pkl")
+
+    # ------------------------------
+    # Registration
+    # ------------------------------
+    def add(self, name, movies, ratings, user_ratings):
+        """Register (or replace) a dataset that is already in memory."""
+        with self._lock:
+            old = self._datasets.get(name)
+            if (old is not None and old.loaded and old.movies is movies
+                    and old.ratings is ratings and old.user_ratings is user_ratings):
+                return self.get(name)  # same objects: just mark as recently used
+            path = old.snapshot_path if old else self._snapshot_path(name)
+            dataset = Dataset(name, movies, ratings, user_ratings, path)
+            self._datasets[name] = dataset
+            self._lru[name] = None
+            self._lru.move_to_end(name)
+            self._enforce_budget(keep=name)
+            return dataset
+
+    def load(self, name, movies_path, ratings_path):
+        """Parse a movies/ratings file pair and register it under name."""
+        movies = mr.load_movies_file(movies_path)
+        ratings, user_ratings = mr.load_ratings_file(ratings_path, movies)
+        return self.add(name, movies, ratings, user_ratings)
+
+    def remove(self, name):
+        with self._lock:
+            dataset = self._datasets.pop(name)
+            self._lru.pop(name, None)
+            if os.path.exists(dataset.snapshot_path):
+                os.remove(dataset.snapshot_path)
+
+    # ------------------------------
+    # Access
+    # ------------------------------
+    def get(self, name):
+        """Return the named dataset, reloading it if it was evicted."""
+        with self._lock:
+            dataset = self._datasets[name]
+            if not dataset.loaded:
+                dataset.reload()
+                self.reloads += 1
+            dataset.last_used = time.monotonic()
+            self._lru[name] = None
+            self._lru.move_to_end(name)
+            self._enforce_budget(keep=name)
+            return dataset
+
+    def query(self, name, command, *args):
+        """Run a named query (see QUERIES) against the named dataset."""
+        if command not in QUERIES:
+            raise KeyError(f"Unknown query '{command}'.")
+        return QUERIES[command](self.get(name), *args)
+
+    def _enforce_budget(self, keep=None):
+        """Evict least-recently-used datasets until the loaded total fits."""
+        while self.memory_usage() > self.memory_budget:
+            victim = next((n for n in self._lru if n != keep), None)
+            if victim is None:
+                break  # only the dataset in use is left; keep it even if over budget
+            self._datasets[victim].unload()
+            del self._lru[victim]
+            self.evictions += 1
+
+    # ------------------------------
+    # Introspection
+    # ------------------------------
+    def __contains__(self, name):
+        return name in self._datasets
+
+    def names(self):
+        return sorted(self._datasets)
+
+    def loaded_names(self):
+        """Loaded datasets, least recently used first."""
+        return list(self._lru)
+
+    def memory_usage(self):
+        """Approximate bytes held by loaded datasets."""
+        return sum(self._datasets[n].nbytes for n in self._lru)
+
+    def summary(self):
+        """[(name, loaded, approx_bytes), ...] sorted by name."""
+        return [(n, d.loaded, d.nbytes) for n, d in sorted(self._datasets.items())]
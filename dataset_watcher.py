@@ -0,0 +1,253 @@
+"""
+dataset_watcher.py
+------------------
+Hot reload of the movies/ratings files with an atomic snapshot swap.
+
+A background thread watches both input files. Polling compares each
+file's (mtime, size) signature every interval; on Linux the watcher can
+instead sleep on inotify events for the files' directories and only stat
+when something happened. A change is acted on once the signature has
+been stable for one check, so half-written files are not loaded.
+
+The dataset and the indexes the menu queries (co-occurrence, rating
+statistics, title search) are rebuilt off the query path into a
+new immutable Snapshot, then published with a single reference
+assignment: readers always see either the old or the new snapshot, never
+a mix.
+
+Usage:
+    python dataset_watcher.py movies.txt ratings.txt --interval 2 [--inotify]
+"""
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import threading
+import time
+
+import movie_recommender as mr
+
+
+# ------------------------------
+# Snapshots
+# ------------------------------
+class Snapshot:
+    """
+    One loaded dataset plus the indexes the menu queries, all built when
+    the snapshot is (off the query path). Never mutated.
+    """
+
+    def __init__(self, version, movies, ratings, user_ratings, signatures):
+        from cooccurrence_index import CooccurrenceIndex
+        from movie_stats import rating_statistics  # needs numpy
+        from title_index import TitleIndex  # needs numpy
+
+        self.version = version
+        self.movies = movies
+        self.ratings = ratings
+        self.user_ratings = user_ratings
+        self.signatures = signatures
+        self.loaded_at = time.time()
+
+        # Derived indexes
+        self.also_index = CooccurrenceIndex.from_user_ratings(user_ratings)
+        self.stats = rating_statistics(ratings)
+        self.titles = TitleIndex(movies.keys() | ratings.keys())
+
+
+def file_signature(path):
+    """(mtime_ns, size) of a file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+# ------------------------------
+# Optional inotify support (Linux)
+# ------------------------------
+class _InotifyWaiter:
+    """Block until something is written or moved into the watched directories."""
+
+    IN_MODIFY = 0x002
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_NONBLOCK = 0o4000
+
+    def __init__(self, paths):
+        libc_name = ctypes.util.find_library("c")
+        libc = ctypes.CDLL(libc_name, use_errno=True) if libc_name else None
+        if libc is None or not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available on this platform")
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        for directory in {os.path.dirname(os.path.abspath(p)) for p in paths}:
+            if libc.inotify_add_watch(self.fd, directory.encode(), mask) < 0:
+                os.close(self.fd)
+                raise OSError(ctypes.get_errno(), f"cannot watch {directory}")
+
+    def wait(self, timeout):
+        """True if events arrived within timeout seconds (events are drained)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            while os.read(self.fd, 64 * 1024):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        os.close(self.fd)
+
+
+# ------------------------------
+# Watcher
+# ------------------------------
+class DatasetWatcher:
+    """Keeps `current` in sync with the movies and ratings files on disk."""
+
+    def __init__(self, movies_path, ratings_path, interval=2.0, use_inotify=False, on_reload=None):
+        self.movies_path = movies_path
+        self.ratings_path = ratings_path
+        self.interval = interval
+        self.on_reload = on_reload
+        self.current = None
+
+        self.reloads = 0
+        self.failures = 0
+        self.last_reload_seconds = 0.0
+        self._pending = None          # signatures of a change not yet applied
+        self._pending_since = None    # when that change was first seen
+        self._failed = None           # signatures that failed to load
+        self._stop = threading.Event()
+        self._thread = None
+        self._waiter = None
+        if use_inotify:
+            try:
+                self._waiter = _InotifyWaiter([movies_path, ratings_path])
+            except OSError as e:
+                print(f"⚠️  inotify unavailable ({e}); falling back to polling.")
+
+    def _signatures(self):
+        return file_signature(self.movies_path), file_signature(self.ratings_path)
+
+    def reload(self, signatures=None):
+        """Rebuild the snapshot from disk and swap it in. Returns the new snapshot."""
+        signatures = signatures or self._signatures()
+        start = time.perf_counter()
+        movies = mr.load_movies_file(self.movies_path)
+        ratings, user_ratings = mr.load_ratings_file(self.ratings_path, movies)
+        if not movies or not ratings:
+            self.failures += 1
+            return None
+        version = self.current.version + 1 if self.current else 1
+        snapshot = Snapshot(version, movies, ratings, user_ratings, signatures)
+        self.current = snapshot  # atomic swap: a single reference assignment
+        self.last_reload_seconds = time.perf_counter() - start
+        self.reloads += 1
+        self._pending = self._pending_since = self._failed = None
+        if self.on_reload:
+            self.on_reload(snapshot)
+        return snapshot
+
+    def check(self):
+        """
+        One watch step: reload if the files changed and their signatures
+        have not moved since the previous check. Returns True on reload.
+        """
+        seen = self._signatures()
+        if self.current is not None and seen == self.current.signatures:
+            self._pending = self._pending_since = None
+            return False
+        if None in seen or seen == self._failed:
+            return False
+        if seen != self._pending:
+            # Changed (or still being written): wait one check for it to settle
+            if self._pending_since is None:
+                self._pending_since = time.time()
+            self._pending = seen
+            return False
+        if self.reload(seen) is None:
+            self._failed = seen
+            return False
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.check()
+            except Exception as e:
+                self.failures += 1
+                print(f"Unexpected error while reloading: {e}")
+            if self._pending_since is not None:
+                self._stop.wait(self.interval)   # re-check soon to confirm stability
+            elif self._waiter is not None:
+                self._waiter.wait(self.interval)
+            else:
+                self._stop.wait(self.interval)
+
+    def start(self):
+        """Load once (if needed) and start watching in a daemon thread."""
+        if self.current is None:
+            self.reload()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="dataset-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._waiter is not None:
+            self._waiter.close()
+            self._waiter = None
+
+    def metrics(self):
+        """Reload counters, last reload duration and staleness in seconds."""
+        now = time.time()
+        snap = self.current
+        return {
+            "version": snap.version if snap else 0,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_reload_seconds": self.last_reload_seconds,
+            "snapshot_age_seconds": now - snap.loaded_at if snap else None,
+            "staleness_seconds": now - self._pending_since if self._pending_since else 0.0,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch movie/ratings files and hot-reload them.")
+    parser.add_argument("movies")
+    parser.add_argument("ratings")
+    parser.add_argument("--interval", type=float, default=2.0, help="seconds between checks")
+    parser.add_argument("--inotify", action="store_true", help="wait on inotify events (Linux)")
+    args = parser.parse_args(argv)
+
+    def report(snapshot):
+        print(f"🔄 Loaded version {snapshot.version}: {len(snapshot.movies)} movies, "
+              f"{len(snapshot.ratings)} movies rated ({watcher.last_reload_seconds:.2f}s)")
+
+    watcher = DatasetWatcher(args.movies, args.ratings, args.interval, args.inotify, on_reload=report)
+    watcher.start()
+    try:
+        while True:
+            time.sleep(args.interval * 5)
+            print(f"📈 {watcher.metrics()}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+evaluate_recommenders.py
+------------------------
+Offline evaluation harness for the movie recommender strategies.
+
+Each user's ratings are split into a train part and a held-out test part.
+Every strategy is built from the train data only and asked for top-k
+recommendations per user; the held-out movies are the relevant items.
+Users are split into partitions that are evaluated in parallel worker
+processes.
+
+Reported per strategy: precision@k, recall@k, catalog coverage and
+per-user recommendation latency percentiles.
+
+Usage:
+    python evaluate_recommenders.py movies.txt ratings.txt -k 3 --strategies genre,popular,als
+"""
+import argparse
+import math
+import multiprocessing
+import random
+import time
+from statistics import mean
+
+import movie_recommender as mr
+
+
+# ------------------------------
+# Train/test split
+# ------------------------------
+def holdout_split(user_ratings, test_fraction=0.2, seed=42):
+    """
+    Split {user_id: {movie: rating}} per user into (train, test).
+
+    Each user with at least two ratings keeps at least one rating in
+    train and holds out round(test_fraction * count) ratings (at least one).
+    Users with a single rating stay entirely in train.
+    """
+    rng = random.Random(seed)
+    train, test = {}, {}
+    for user_id in sorted(user_ratings):
+        rated = sorted(user_ratings[user_id].items())
+        if len(rated) < 2:
+            train[user_id] = dict(rated)
+            continue
+        rng.shuffle(rated)
+        n_test = min(len(rated) - 1, max(1, round(test_fraction * len(rated))))
+        test[user_id] = dict(rated[:n_test])
+        train[user_id] = dict(rated[n_test:])
+    return train, test
+
+
+def ratings_from_user_ratings(user_ratings):
+    """Rebuild the movie -> list of ratings map from per-user ratings."""
+    ratings = {}
+    for rated in user_ratings.values():
+        for movie_name, rating in rated.items():
+            ratings.setdefault(movie_name, []).append(rating)
+    return ratings
+
+
+# ------------------------------
+# Strategies
+# ------------------------------
+class GenreStrategy:
+    """The existing recommend_movies logic: top movies of the favorite genre."""
+
+    def __init__(self, movies, ratings, user_ratings):
+        self.movies = movies
+        self.ratings = ratings
+        self.user_ratings = user_ratings
+
+    def recommend(self, user_id, n):
+        if user_id not in self.user_ratings:
+            return []
+        _, recs = mr.genre_recommendations(self.movies, self.ratings, self.user_ratings, user_id, n)
+        return [movie for movie, _ in recs]
+
+
+class PopularStrategy:
+    """Baseline: highest average-rated movies the user has not rated."""
+
+    def __init__(self, movies, ratings, user_ratings):
+        self.user_ratings = user_ratings
+        movie_avg = {movie: mean(rlist) for movie, rlist in ratings.items() if rlist}
+        self.ranked = sorted(movie_avg, key=movie_avg.get, reverse=True)
+
+    def recommend(self, user_id, n):
+        rated = self.user_ratings.get(user_id, {})
+        recs = []
+        for movie in self.ranked:
+            if movie not in rated:
+                recs.append(movie)
+                if len(recs) == n:
+                    break
+        return recs
+
+
+class ALSStrategy:
+    """Matrix factorization model from als_recommender.py."""
+
+    def __init__(self, movies, ratings, user_ratings):
+        # Imported here so the harness still runs without NumPy
+        from als_recommender import ALSModel
+        self.model = ALSModel().fit(user_ratings)
+
+    def recommend(self, user_id, n):
+        return [movie for movie, _ in self.model.recommend(user_id, n)]
+
+
+# Strategy name -> class built from (movies, train ratings, train user_ratings)
+STRATEGIES = {
+    "genre": GenreStrategy,
+    "popular": PopularStrategy,
+    "als": ALSStrategy,
+}
+
+
+# ------------------------------
+# Parallel evaluation
+# ------------------------------
+_worker_strategy = None
+
+
+def _init_worker(strategy):
+    global _worker_strategy
+    _worker_strategy = strategy
+
+
+def _evaluate_partition(args):
+    """Recommend for one partition of users; returns per-user results."""
+    users, test, k, min_rating = args
+    results = []
+    for user_id in users:
+        relevant = {m for m, r in test[user_id].items() if r >= min_rating}
+        start = time.perf_counter()
+        recs = _worker_strategy.recommend(user_id, k)
+        latency = time.perf_counter() - start
+        hits = len(relevant.intersection(recs))
+        results.append((user_id, hits, len(relevant), recs, latency))
+    return results
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def evaluate_strategy(strategy, train, test, k=3, workers=None, min_rating=0.0, catalog=None):
+    """
+    Evaluate a built strategy against held-out test ratings.
+
+    Returns a dict with precision@k, recall@k, coverage, user count and
+    latency percentiles (in milliseconds).
+    """
+    users = sorted(u for u in test if u in train)
+    workers = workers or multiprocessing.cpu_count()
+    n_parts = max(1, min(len(users), workers * 4))
+    partitions = []
+    for i in range(n_parts):
+        part = users[i::n_parts]
+        partitions.append((part, {u: test[u] for u in part}, k, min_rating))
+
+    if workers > 1 and len(users) > 1:
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(strategy,)) as pool:
+            chunks = pool.map(_evaluate_partition, partitions)
+    else:
+        _init_worker(strategy)
+        chunks = [_evaluate_partition(p) for p in partitions]
+
+    precisions, recalls, latencies = [], [], []
+    recommended = set()
+    for chunk in chunks:
+        for _, hits, n_relevant, recs, latency in chunk:
+            latencies.append(latency * 1000)
+            recommended.update(recs)
+            if n_relevant == 0:
+                continue
+            precisions.append(hits / k)
+            recalls.append(hits / n_relevant)
+
+    if catalog is None:
+        catalog = {m for rated in train.values() for m in rated}
+    latencies.sort()
+    return {
+        "users": len(precisions),
+        "precision": mean(precisions) if precisions else 0.0,
+        "recall": mean(recalls) if recalls else 0.0,
+        "coverage": len(recommended) / len(catalog) if catalog else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p90_ms": percentile(latencies, 90),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+def run_evaluation(movies, user_ratings, strategy_names, k=3, test_fraction=0.2,
+                   seed=42, workers=None, min_rating=0.0):
+    """Split once, then build and evaluate each named strategy on the same split."""
+    train, test = holdout_split(user_ratings, test_fraction, seed)
+    train_ratings = ratings_from_user_ratings(train)
+    catalog = set(movies) | set(train_ratings)
+
+    report = {}
+    for name in strategy_names:
+        start = time.perf_counter()
+        strategy = STRATEGIES[name](movies, train_ratings, train)
+        build_seconds = time.perf_counter() - start
+        report[name] = evaluate_strategy(strategy, train, test, k, workers, min_rating, catalog)
+        report[name]["build_s"] = build_seconds
+    return report
+
+
+def print_report(report, k):
+    print(f"\n📊 Offline evaluation (k={k})")
+    print(f"{'strategy':<10} {'users':>6} {'P@k':>7} {'R@k':>7} {'cov':>7} "
+          f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'build s':>8}")
+    for name, r in report.items():
+        print(f"{name:<10} {r['users']:>6} {r['precision']:>7.4f} {r['recall']:>7.4f} "
+              f"{r['coverage']:>7.2%} {r['p50_ms']:>8.3f} {r['p90_ms']:>8.3f} "
+              f"{r['p99_ms']:>8.3f} {r['build_s']:>8.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate recommender strategies offline.")
+    parser.add_argument("movies", help="movies file (genre|id|title)")
+    parser.add_argument("ratings", help="ratings file (movie|rating|user)")
+    parser.add_argument("-k", type=int, default=3, help="recommendations per user")
+    parser.add_argument("--strategies", default="genre,popular",
+                        help=f"comma-separated subset of: {', '.join(STRATEGIES)}")
+    parser.add_argument("--test-fraction", type=float, default=0.2)
+    parser.add_argument("--min-rating", type=float, default=0.0,
+                        help="held-out ratings below this are not counted as relevant")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    names = [s.strip() for s in args.strategies.split(",") if s.strip()]
+    unknown = [s for s in names if s not in STRATEGIES]
+    if unknown:
+        parser.error(f"unknown strategies: {', '.join(unknown)}")
+
+    movies = mr.load_movies_file(args.movies)
+    ratings, user_ratings = mr.load_ratings_file(args.ratings, movies)
+    if not mr.check_data_loaded(movies, ratings):
+        return
+
+    report = run_evaluation(movies, user_ratings, names, args.k, args.test_fraction,
+                            args.seed, args.workers, args.min_rating)
+    print_report(report, args.k)
+
+
+if __name__ == "__main__":
+    main()
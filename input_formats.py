@@ -0,0 +1,270 @@
+"""
+input_formats.py
+----------------
+Pluggable input formats for the movies and ratings loaders.
+
+Supported inputs:
+- pipe format (genre|id|title, movie|rating|user), the original format;
+- MovieLens CSV: movies.csv (movieId,title,genres with quoted titles and
+  '|'-separated genre lists) and ratings.csv (userId,movieId,rating,...);
+- any of the above compressed with gzip, bz2 or xz (detected from the
+  magic bytes, not the file name);
+- standard input, by passing "-" as the file name.
+
+Files are read through large buffered blocks. movies.csv is parsed by
+the C `csv` reader. ratings.csv, which is plain numeric rows grouped by
+user, is parsed a block at a time with C-level splitting and mapping
+(movie id -> title and rating text -> float lookups are memoized); any
+block that is not plain falls back to the csv reader row by row.
+
+Performance note: the goal for this loader was a gzipped ratings.csv at
+least 3x faster than the pipe loader on the same data. It does not meet
+that. On 2M ratings it is about 1.4-1.6x faster (3.5-3.9s vs 4.8-5.6s on
+one core), down from the 1.8x first measured because of the per-line
+field-count check that keeps ragged rows out of the fast path. Most of
+the remaining time is splitting the text and filling the per-movie lists
+and per-user dicts. A 3x gain would need different in-memory structures
+(e.g. the columnar arrays in ratings_binary), not a faster parser.
+"""
+import bz2
+import csv
+import gzip
+import io
+import lzma
+import os
+import sys
+from collections import Counter, deque
+from itertools import repeat
+from operator import ne
+
+
+BUFFER_SIZE = 1 << 20  # bytes per block read
+
+# Magic bytes -> wrapper that decompresses a binary stream
+COMPRESSION_MAGIC = {
+    b"\x1f\x8b": lambda raw: gzip.GzipFile(fileobj=raw, mode="rb"),
+    b"BZh": bz2.BZ2File,
+    b"\xfd7zXZ\x00": lzma.LZMAFile,
+}
+
+FORMATS = ("pipe", "csv")
+CSV_HEADERS = (b"movieId,", b"userId,")
+
+
+class _DecompressedReader(io.BufferedReader):
+    """Buffered decompressed stream that also closes the underlying file."""
+
+    def __init__(self, stream, source, buffer_size):
+        super().__init__(stream, buffer_size)
+        self._source = source
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self._source.close()
+
+
+def open_input(filename, buffer_size=BUFFER_SIZE):
+    """
+    Open a (possibly compressed) input file, or stdin for "-", as a binary
+    buffered stream. Raises FileNotFoundError like open().
+    """
+    if filename == "-":
+        raw = open(sys.stdin.fileno(), "rb", buffering=buffer_size, closefd=False)
+    else:
+        raw = open(filename, "rb", buffering=buffer_size)
+    head = raw.peek(8)[:8]
+    for magic, opener in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return _DecompressedReader(opener(raw), raw, buffer_size)
+    return raw
+
+
+def detect_format(filename, stream):
+    """'csv' for MovieLens-style input (by header or .csv name), else 'pipe'."""
+    first_line = stream.peek(256).split(b"\n", 1)[0]
+    if first_line.startswith(CSV_HEADERS):
+        return "csv"
+    name = os.path.basename(filename).lower()
+    for suffix in (".gz", ".bz2", ".xz"):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return "csv" if name.endswith(".csv") else "pipe"
+
+
+def open_text(filename, fmt=None):
+    """(text stream, format) for a movies or ratings input file."""
+    stream = open_input(filename)
+    if fmt is None:
+        fmt = detect_format(filename, stream)
+    elif fmt not in FORMATS:
+        stream.close()
+        raise ValueError(f"Unknown input format '{fmt}' (expected one of {', '.join(FORMATS)}).")
+    # newline="" lets the csv module handle quoted newlines itself
+    return io.TextIOWrapper(stream, encoding="utf-8", newline="" if fmt == "csv" else None), fmt
+
+
+# ------------------------------
+# MovieLens CSV
+# ------------------------------
+def load_movies_csv(f):
+    """
+    Parse movies.csv rows (movieId,title,genres) into {title: {"id", "genre",
+    "genres"}}. "genre" is the first listed genre so single-genre code keeps
+    working; "genres" holds the full list.
+    """
+    movies = {}
+    reader = csv.reader(f)
+    for row in reader:
+        if not row:
+            continue
+        line_num = reader.line_num
+        if len(row) != 3:
+            print(f"Skipping line {line_num}: wrong number of fields -> {','.join(row)}")
+            continue
+        if line_num == 1 and row[0] == "movieId":
+            continue
+        try:
+            movie_id = int(row[0])
+        except ValueError:
+            print(f"Skipping line {line_num}: invalid movie ID -> {','.join(row)}")
+            continue
+        title = row[1].strip().title()
+        if title in movies:
+            print(f"Skipping line {line_num}: duplicate movie title '{title}'")
+            continue
+        genres = [g.strip().lower() for g in row[2].split("|") if g.strip()] or ["unknown"]
+        movies[title] = {"id": movie_id, "genre": genres[0], "genres": genres}
+    return movies
+
+
+def _ratings_rows_slow(rows, first_line, titles, rating_values, ratings, user_ratings):
+    """Row-at-a-time parsing with per-line error reporting."""
+    reader = csv.reader(rows)
+    for row in reader:
+        line_num = first_line + reader.line_num - 1
+        if not 3 <= len(row) <= 4:
+            if row:
+                print(f"Skipping line {line_num}: wrong number of fields -> {','.join(row)}")
+            continue
+        u, m, r = row[0], row[1], row[2]
+        if line_num == 1 and u == "userId":
+            continue  # header
+
+        rating = rating_values.get(r)
+        if rating is None:
+            try:
+                rating = float(r)
+            except ValueError:
+                print(f"Skipping line {line_num}: invalid numeric value -> {','.join(row)}")
+                continue
+            if not 0 <= rating <= 5:
+                print(f"Skipping line {line_num}: invalid rating '{rating}' -> {','.join(row)}")
+                continue
+            rating_values[r] = rating
+
+        title = m if titles is None else titles.get(m)
+        if title is None:
+            print(f"Skipping line {line_num}: unknown movie ID -> {','.join(row)}")
+            continue
+        try:
+            user_id = int(u)
+        except ValueError:
+            print(f"Skipping line {line_num}: invalid numeric value -> {','.join(row)}")
+            continue
+
+        ratings.setdefault(title, []).append(rating)
+        user_ratings.setdefault(user_id, {})[title] = rating
+
+
+def _ratings_block_fast(body, titles, rating_values, ratings, user_ratings):
+    """
+    Parse a block of complete, unquoted lines with C-level string and list
+    operations only. Returns False (having changed nothing) if the block
+    needs the row-at-a-time path: quoting, ragged rows, bad values, or
+    users not grouped together.
+    """
+    if '"' in body or "\r" in body:
+        return False
+    # every line must have the same number of fields, not just the block in total
+    commas = set(map(str.count, body.split("\n"), repeat(",")))
+    width = commas.pop() + 1
+    if commas or width not in (3, 4):
+        return False
+    fields = body.replace("\n", ",").split(",")
+    users, movie_ids, texts = fields[0::width], fields[1::width], fields[2::width]
+
+    for r in set(texts).difference(rating_values):
+        try:
+            value = float(r)
+        except ValueError:
+            return False
+        if not 0 <= value <= 5:
+            return False
+        rating_values[r] = value
+    values = list(map(rating_values.__getitem__, texts))
+
+    # ratings.csv is grouped by user: one run per distinct user in the block
+    runs = Counter(users)
+    if sum(map(ne, users[1:], users[:-1])) != len(runs) - 1:
+        return False
+    try:
+        names = movie_ids if titles is None else list(map(titles.__getitem__, movie_ids))
+        runs = [(int(u), count) for u, count in runs.items()]
+    except (KeyError, ValueError):
+        return False
+
+    for name in set(names).difference(ratings):
+        ratings[name] = []
+    deque(map(list.append, map(ratings.__getitem__, names), values), maxlen=0)
+    start = 0
+    for user_id, count in runs:
+        rated = user_ratings.get(user_id)
+        if rated is None:
+            rated = user_ratings[user_id] = {}
+        rated.update(zip(names[start:start + count], values[start:start + count]))
+        start += count
+    return True
+
+
+def load_ratings_csv(f, movies=None):
+    """
+    Parse ratings.csv rows (userId,movieId,rating[,timestamp]) into the usual
+    (ratings, user_ratings) dicts, mapping movie ids to titles via movies.
+    Without movies, the movie id itself is used as the title.
+
+    The stream is read in large blocks. Blocks of plain rows are split and
+    converted with C-level operations; any block with quoting or an invalid
+    row is re-parsed row by row with the csv reader.
+    """
+    titles = {str(data["id"]): title for title, data in movies.items()} if movies else None
+    if titles is None:
+        print("⚠️  No movies loaded; using MovieLens movie IDs as titles.")
+
+    ratings = {}
+    user_ratings = {}
+    rating_values = {}   # rating text -> float, for valid ratings
+    line_num = 1         # file line number of the first line in the block
+    carry = ""
+    while True:
+        block = f.read(BUFFER_SIZE)
+        text = carry + block
+        if not block:
+            body, carry = text, ""
+        else:
+            cut = text.rfind("\n")
+            if cut < 0:
+                carry = text
+                continue
+            body, carry = text[:cut], text[cut + 1:]
+        if line_num == 1 and body.startswith("userId,"):
+            _, _, body = body.partition("\n")
+            line_num = 2
+        lines = body.count("\n") + 1
+        if body and not _ratings_block_fast(body, titles, rating_values, ratings, user_ratings):
+            _ratings_rows_slow(body.split("\n"), line_num, titles, rating_values, ratings, user_ratings)
+        line_num += lines
+        if not block:
+            break
+    return ratings, user_ratings
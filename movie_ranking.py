@@ -0,0 +1,109 @@
+"""
+movie_ranking.py
+----------------
+Confidence-aware rankings for the top-N reports.
+
+Ranking by raw mean lets a movie with a single 5.0 beat one with 10,000
+ratings averaging 4.8. Two alternative scores account for support:
+
+- bayesian: the mean shrunk toward the global mean, as if every movie
+  had `prior_weight` extra ratings at the global mean
+  (default weight: the median number of ratings per movie);
+- wilson: the lower bound of the Wilson score interval (95%) for the
+  mean rating scaled to [0, 1], mapped back to the 0-5 star scale.
+
+Movies with fewer than `min_support` ratings are left out entirely.
+
+All scores are computed with NumPy in one pass when a RankingTable is
+built, and every method's movie and genre orderings are stored as sorted
+arrays, so a top-N query is just a slice.
+"""
+import numpy as np
+
+
+RANK_METHODS = ("mean", "bayesian", "wilson")
+RANK_LABELS = {"mean": "Average Rating", "bayesian": "Bayesian Average", "wilson": "Wilson Lower Bound"}
+DEFAULT_MIN_SUPPORT = 1
+MAX_RATING = 5.0
+WILSON_Z = 1.96
+
+
+class RankingTable:
+    """Per-movie and per-genre scores for every method, pre-sorted best first."""
+
+    def __init__(self, movies, ratings, min_support=DEFAULT_MIN_SUPPORT, prior_weight=None):
+        self.min_support = min_support
+        titles = [t for t, r in ratings.items() if r]
+        counts = np.fromiter((len(ratings[t]) for t in titles), dtype=np.int64, count=len(titles))
+        values = np.fromiter((x for t in titles for x in ratings[t]), dtype=np.float64, count=int(counts.sum()))
+        sums = np.bincount(np.repeat(np.arange(len(titles)), counts), weights=values, minlength=len(titles))
+        n = np.maximum(counts, 1)
+        means = sums / n
+
+        global_mean = float(values.mean()) if len(values) else 0.0
+        if prior_weight is None:
+            prior_weight = float(np.median(counts)) if len(counts) else 0.0
+        self.prior_weight = prior_weight
+        bayesian = (prior_weight * global_mean + sums) / (prior_weight + n)
+
+        z2 = WILSON_Z * WILSON_Z
+        p = np.clip(means / MAX_RATING, 0.0, 1.0)
+        wilson = ((p + z2 / (2 * n) - WILSON_Z * np.sqrt((p * (1 - p) + z2 / (4 * n)) / n))
+                  / (1 + z2 / n)) * MAX_RATING
+
+        # Only supported movies are ranked; ties keep the ratings-file order
+        kept = np.flatnonzero(counts >= min_support)
+        self.titles = titles
+        self.counts = counts
+        self.scores = {"mean": means, "bayesian": bayesian, "wilson": wilson}
+        self.movie_order = {m: kept[np.lexsort((kept, -s[kept]))] for m, s in self.scores.items()}
+
+        # Genres score the average of their supported movies' scores
+        genre_names = []
+        genre_index = {}
+        genre_of = np.full(len(titles), -1, dtype=np.int64)
+        for i in kept.tolist():
+            data = movies.get(titles[i])
+            if data is None:
+                continue
+            genre = data["genre"].lower()
+            if genre not in genre_index:
+                genre_index[genre] = len(genre_names)
+                genre_names.append(genre)
+            genre_of[i] = genre_index[genre]
+        in_genre = kept[genre_of[kept] >= 0]
+        sizes = np.bincount(genre_of[in_genre], minlength=len(genre_names))
+        self.genres = genre_names
+        self.genre_scores = {
+            m: np.bincount(genre_of[in_genre], weights=s[in_genre], minlength=len(genre_names)) / np.maximum(sizes, 1)
+            for m, s in self.scores.items()
+        }
+        ids = np.arange(len(genre_names))
+        self.genre_order = {m: ids[np.lexsort((ids, -s))] for m, s in self.genre_scores.items()}
+
+    def top_movies(self, n, rank_by="mean"):
+        """[(movie, score, count), ...] for the n best supported movies."""
+        order = self.movie_order[rank_by][:n].tolist()
+        scores = self.scores[rank_by]
+        return [(self.titles[i], float(scores[i]), int(self.counts[i])) for i in order]
+
+    def top_genres(self, n, rank_by="mean"):
+        """[(genre, score), ...] for the n best genres."""
+        scores = self.genre_scores[rank_by]
+        return [(self.genres[g], float(scores[g])) for g in self.genre_order[rank_by][:n].tolist()]
+
+
+_cached = None  # (movies, ratings, min_support, table) of the last build
+
+
+def ranking_table(movies, ratings, min_support=DEFAULT_MIN_SUPPORT):
+    """
+    RankingTable for these dicts, rebuilt only when different dicts (or a
+    different min_support) are passed; loaded dicts are never mutated.
+    """
+    global _cached
+    if _cached is not None and _cached[0] is movies and _cached[1] is ratings and _cached[2] == min_support:
+        return _cached[3]
+    table = RankingTable(movies, ratings, min_support)
+    _cached = (movies, ratings, min_support, table)
+    return table
@@ -18,38 +18,51 @@ movies = {}       # movie_name -> {"id": id, "genre": genre}
 ratings = {}      # movie_name -> list of ratings
 user_ratings = {} # user_id -> dict of movie_name -> rating
 
+# First bytes of a columnar ratings file (see ratings_binary.py)
+BINARY_RATINGS_MAGIC = b"MRATBIN1"
+
 
 # ------------------------------
 # File loading functions
 # ------------------------------
-def load_movies_file(filename):
+def load_movies_file(filename, fmt=None):
+    """
+    Load movies from a pipe-format or MovieLens CSV file (see input_formats),
+    optionally compressed; "-" reads stdin. fmt forces "pipe" or "csv".
+    """
+    from input_formats import load_movies_csv, open_text
+
     movies = {}
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, start=1):
-                line = line.strip()
-                if not line:
-                    continue  # Skip empty lines
-
-                parts = line.split('|')
-                if len(parts) != 3:
-                    print(f"Skipping line {line_num}: wrong number of fields -> {line}")
-                    continue
+        f, fmt = open_text(filename, fmt)
+        with f:
+            if fmt == "csv":
+                movies = load_movies_csv(f)
+            else:
+                for line_num, line in enumerate(f, start=1):
+                    line = line.strip()
+                    if not line:
+                        continue  # Skip empty lines
+
+                    parts = line.split('|')
+                    if len(parts) != 3:
+                        print(f"Skipping line {line_num}: wrong number of fields -> {line}")
+                        continue
 
-                try:
-                    genre = parts[0].strip().lower()
-                    movie_id = int(parts[1])
-                    title = parts[2].strip().title()
+                    try:
+                        genre = parts[0].strip().lower()
+                        movie_id = int(parts[1])
+                        title = parts[2].strip().title()
 
-                    if title in movies:
-                        print(f"Skipping line {line_num}: duplicate movie title '{title}'")
-                        continue
+                        if title in movies:
+                            print(f"Skipping line {line_num}: duplicate movie title '{title}'")
+                            continue
 
-                    movies[title] = {"id": movie_id, "genre": genre}
+                        movies[title] = {"id": movie_id, "genre": genre}
 
-                except ValueError:
-                    print(f"Skipping line {line_num}: invalid movie ID -> {line}")
-                    continue
+                    except ValueError:
+                        print(f"Skipping line {line_num}: invalid movie ID -> {line}")
+                        continue
     except FileNotFoundError:
         print(f"Error: Movies file '{filename}' not found.")
     except Exception as e:
@@ -57,30 +70,71 @@ def load_movies_file(filename):
     return movies
 
 
-def load_ratings_file(filename):
-    ratings = {}
-    user_ratings = {}
+def parse_ratings_line(line, line_num):
+    """
+    Parse one 'movie|rating|user' line into (movie_name, rating, user_id).
+    Returns None for blank lines and, after reporting why, invalid ones.
+    """
+    line = line.strip()
+    if not line:
+        return None  # skip blank lines
+
+    parts = line.split('|')
+    if len(parts) != 3:
+        print(f"Skipping line {line_num}: wrong number of fields -> {line}")
+        return None
+
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, start=1):
-                line = line.strip()
-                if not line:
-                    continue  # skip blank lines
-
-                parts = line.split('|')
-                if len(parts) != 3:
-                    print(f"Skipping line {line_num}: wrong number of fields -> {line}")
-                    continue
+        movie_name = parts[0].strip().title()
+        rating = float(parts[1])
+        user_id = int(parts[2])
+    except ValueError:
+        print(f"Skipping line {line_num}: invalid numeric value -> {line}")
+        return None
+
+    # Validate rating range
+    if not (0 <= rating <= 5):
+        print(f"Skipping line {line_num}: invalid rating '{rating}' -> {line}")
+        return None
+
+    return movie_name, rating, user_id
+
+
+def is_binary_ratings_file(filename):
+    """True if the file is a columnar ratings file written by ratings_binary.py."""
+    try:
+        with open(filename, 'rb') as f:
+            return f.read(len(BINARY_RATINGS_MAGIC)) == BINARY_RATINGS_MAGIC
+    except OSError:
+        return False
 
-                try:
-                    movie_name = parts[0].strip().title()
-                    rating = float(parts[1])
-                    user_id = int(parts[2])
 
-                    # Validate rating range
-                    if not (0 <= rating <= 5):
-                        print(f"Skipping line {line_num}: invalid rating '{rating}' -> {line}")
+def load_ratings_file(filename, movies=None, fmt=None):
+    """
+    Load (ratings, user_ratings) from a pipe-format, MovieLens CSV or binary
+    ratings file; text files may be compressed and "-" reads stdin. MovieLens
+    ratings refer to movie IDs, which are mapped to titles through movies.
+    """
+    if is_binary_ratings_file(filename):
+        # Imported here so the text format keeps working without NumPy
+        import ratings_binary
+        return ratings_binary.load_ratings_binary(filename)
+
+    from input_formats import load_ratings_csv, open_text
+
+    ratings = {}
+    user_ratings = {}
+    try:
+        f, fmt = open_text(filename, fmt)
+        with f:
+            if fmt == "csv":
+                ratings, user_ratings = load_ratings_csv(f, movies)
+            else:
+                for line_num, line in enumerate(f, start=1):
+                    parsed = parse_ratings_line(line, line_num)
+                    if parsed is None:
                         continue
+                    movie_name, rating, user_id = parsed
 
                     # Add to movie ratings
                     ratings.setdefault(movie_name, []).append(rating)
@@ -88,10 +142,6 @@ def load_ratings_file(filename):
                     # Add to user ratings
                     user_ratings.setdefault(user_id, {})[movie_name] = rating
 
-                except ValueError:
-                    print(f"Skipping line {line_num}: invalid numeric value -> {line}")
-                    continue
-
     except FileNotFoundError:
         print(f"Error: Ratings file '{filename}' not found.")
     except Exception as e:
@@ -118,45 +168,68 @@ def movie_average_map():
 # ------------------------------
 # Program features
 # ------------------------------
-def top_n_movies(movies, ratings, n):
-    """Display top N movies by average rating."""
+def top_movies(movies, ratings, n, rank_by="mean", min_support=1):
+    """Return [(movie, score), ...] for the top N movies by average rating (or by rank_by)."""
+    if rank_by != "mean" or min_support > 1:
+        from movie_ranking import ranking_table  # needs numpy
+        return [(m, s) for m, s, _ in ranking_table(movies, ratings, min_support).top_movies(n, rank_by)]
+
+    movie_avg = {movie: mean(rlist) for movie, rlist in ratings.items()}
+    sorted_movies = sorted(movie_avg.items(), key=lambda x: x[1], reverse=True)
+    return sorted_movies[:n]
+
+
+def top_n_movies(movies, ratings, n, rank_by="mean", min_support=1):
+    """Display top N movies by average rating (or by rank_by, see movie_ranking)."""
     if not ratings:
         print("No ratings data available.")
         return
 
-    movie_avg = {movie: mean(rlist) for movie, rlist in ratings.items()}
-    sorted_movies = sorted(movie_avg.items(), key=lambda x: x[1], reverse=True)
+    top = top_movies(movies, ratings, n, rank_by, min_support)
+    if rank_by != "mean" or min_support > 1:
+        from movie_ranking import RANK_LABELS
+        print(f"\n🏆 Top {n} Movies by {RANK_LABELS[rank_by]} (min {min_support} ratings):")
+        for i, (movie, score) in enumerate(top, 1):
+            print(f"{i}. {movie} — {score:.2f} ({len(ratings[movie])} ratings)")
+        return
 
     print(f"\n🏆 Top {n} Movies by Average Rating:")
-    for i, (movie, avg) in enumerate(sorted_movies[:n], 1):
+    for i, (movie, avg) in enumerate(top, 1):
         print(f"{i}. {movie} — {avg:.2f}")
 
 
-def top_n_movies_in_genre(movies, ratings, genre, n):
-    """Display top N movies in a specific genre by average rating."""
+def top_movies_in_genre(movies, ratings, genre, n):
+    """Return [(movie, avg), ...] for the top N rated movies in a genre ([] if none)."""
     genre = genre.lower()
 
     # Filter movies in that genre that have ratings
     genre_movies = {name: ratings[name] for name, data in movies.items()
                     if data["genre"] == genre and name in ratings}
 
-    if not genre_movies:
-        print(f"No movies found for genre '{genre}'.")
-        return
-
     movie_avg = {name: mean(rlist) for name, rlist in genre_movies.items()}
     sorted_movies = sorted(movie_avg.items(), key=lambda x: x[1], reverse=True)
+    return sorted_movies[:n]
+
+
+def top_n_movies_in_genre(movies, ratings, genre, n):
+    """Display top N movies in a specific genre by average rating."""
+    genre = genre.lower()
+    top = top_movies_in_genre(movies, ratings, genre, n)
+
+    if not top:
+        print(f"No movies found for genre '{genre}'.")
+        return
 
     print(f"\n🏆 Top {n} Movies in Genre '{genre.title()}':")
-    for i, (movie, avg) in enumerate(sorted_movies[:n], 1):
+    for i, (movie, avg) in enumerate(top, 1):
         print(f"{i}. {movie} — {avg:.2f}")
 
 
-def top_n_genres(movies, ratings, n):
-    """Display top N genres ranked by the average of average movie ratings."""
-    if not ratings:
-        print("No ratings data available.")
-        return
+def top_genres(movies, ratings, n, rank_by="mean", min_support=1):
+    """Return [(genre, score), ...] for the top N genres by the average of average movie ratings."""
+    if rank_by != "mean" or min_support > 1:
+        from movie_ranking import ranking_table  # needs numpy
+        return ranking_table(movies, ratings, min_support).top_genres(n, rank_by)
 
     genre_movies = {}
     for movie_name, data in movies.items():
@@ -166,9 +239,22 @@ def top_n_genres(movies, ratings, n):
 
     genre_avg = {g: mean(vals) for g, vals in genre_movies.items()}
     sorted_genres = sorted(genre_avg.items(), key=lambda x: x[1], reverse=True)
+    return sorted_genres[:n]
+
 
-    print(f"\n🏆 Top {n} Genres by Average Rating:")
-    for i, (genre, avg) in enumerate(sorted_genres[:n], 1):
+def top_n_genres(movies, ratings, n, rank_by="mean", min_support=1):
+    """Display top N genres ranked by the average of average movie ratings (or of rank_by scores)."""
+    if not ratings:
+        print("No ratings data available.")
+        return
+
+    top = top_genres(movies, ratings, n, rank_by, min_support)
+    if rank_by != "mean" or min_support > 1:
+        from movie_ranking import RANK_LABELS
+        print(f"\n🏆 Top {n} Genres by {RANK_LABELS[rank_by]} (min {min_support} ratings per movie):")
+    else:
+        print(f"\n🏆 Top {n} Genres by Average Rating:")
+    for i, (genre, avg) in enumerate(top, 1):
         print(f"{i}. {genre.title()} — {avg:.2f}")
 
 
@@ -192,12 +278,14 @@ def user_favorite_genre(user_id, movies, user_ratings):
     return max(genre_avg, key=genre_avg.get)
 
 
-def recommend_movies(movies, ratings, user_ratings, user_id):
-    """Recommend top 3 movies from user's favorite genre."""
+def genre_recommendations(movies, ratings, user_ratings, user_id, n=3):
+    """
+    Return (favorite_genre, [(movie, avg), ...]) with the user's top n unrated
+    movies from their favorite genre. favorite_genre is None if unknown.
+    """
     favorite_genre = user_favorite_genre(user_id, movies, user_ratings)
     if not favorite_genre:
-        print(f"\nCould not determine a favorite genre for user {user_id}.")
-        return
+        return None, []
 
     genre_movies = [m for m, d in movies.items() if d["genre"] == favorite_genre]
     rated = user_ratings.get(user_id, {})
@@ -205,10 +293,19 @@ def recommend_movies(movies, ratings, user_ratings, user_id):
 
     rated_avg = [(m, mean(ratings[m])) for m in unrated if m in ratings and ratings[m]]
     rated_avg.sort(key=lambda x: x[1], reverse=True)
+    return favorite_genre, rated_avg[:n]
+
+
+def recommend_movies(movies, ratings, user_ratings, user_id):
+    """Recommend top 3 movies from user's favorite genre."""
+    favorite_genre, rated_avg = genre_recommendations(movies, ratings, user_ratings, user_id, 3)
+    if not favorite_genre:
+        print(f"\nCould not determine a favorite genre for user {user_id}.")
+        return
 
     if rated_avg:
         print(f"\nTop 3 Recommended Movies for User {user_id} (genre: {favorite_genre.title()}):")
-        for i, (movie, avg) in enumerate(rated_avg[:3], start=1):
+        for i, (movie, avg) in enumerate(rated_avg, start=1):
             print(f"{i}. {movie} — {avg:.2f}")
     else:
         print(f"No available recommendations for user {user_id}'s favorite genre: {favorite_genre.title()}.")
@@ -235,14 +332,50 @@ def check_data_loaded(movies, ratings):
     return True
 
 
-def main_menu():
+def main_menu(memory_budget=None, rank_by="mean", min_support=1):
     """Command-line interface for the Movie Recommender System."""
+    from dataset_registry import DatasetRegistry  # imports this module
+    from dataset_watcher import DatasetWatcher
+    from cooccurrence_index import CooccurrenceIndex, show_also_rated
+
     movies = {}
     ratings = {}
     user_ratings = {}
+    registry = DatasetRegistry(memory_budget)
+    current = "default"
+    movies_path = ratings_path = None
+    watcher = None
+    watched = None
+    also_index = also_source = None   # built on first use for the current user_ratings
+    stats = stats_source = None       # likewise for the current ratings
+    titles = titles_source = None     # title search index for the current movies/ratings
+
+    def prepare_rankings(movies, ratings):
+        """Score every movie as soon as data is loaded, so the top N reports are just slices."""
+        if ratings and (rank_by != "mean" or min_support > 1):
+            from movie_ranking import ranking_table  # needs numpy
+            ranking_table(movies, ratings, min_support)
+
+    def use_snapshot(snapshot):
+        """Switch to a watcher snapshot, taking over the indexes it already built."""
+        nonlocal movies, ratings, user_ratings, also_index, also_source, stats, stats_source
+        nonlocal titles, titles_source
+        movies, ratings, user_ratings = snapshot.movies, snapshot.ratings, snapshot.user_ratings
+        also_index, also_source = snapshot.also_index, user_ratings
+        stats, stats_source = snapshot.stats, ratings
+        titles, titles_source = snapshot.titles, (movies, ratings)
+
+    def title_search():
+        """Title index for the loaded data, rebuilt only when the data changes."""
+        nonlocal titles, titles_source
+        from title_index import TitleIndex  # needs numpy
+        if titles is None or titles_source[0] is not movies or titles_source[1] is not ratings:
+            titles = TitleIndex(movies.keys() | ratings.keys())
+            titles_source = (movies, ratings)
+        return titles
 
     while True:
-        print("\n🎬 Movie Recommender Menu")
+        print(f"\n🎬 Movie Recommender Menu (dataset: {current})")
         print("1. Load movies file")
         print("2. Load ratings file")
         print("3. Show top N movies (by average rating)")
@@ -250,23 +383,47 @@ def main_menu():
         print("5. Show top N genres")
         print("6. Show user’s favorite genre")
         print("7. Recommend movies for a user")
-        print("8. Exit")
+        print("8. Switch dataset")
+        print("9. Toggle auto-reload of loaded files")
+        print("10. Show movies also rated by viewers of a title")
+        print("11. Show rating statistics (count, mean, median, spread)")
+        print("12. Search movie titles")
+        print("13. Exit")
 
         choice = input("Enter your choice: ").strip()
 
+        # Pick up a snapshot the watcher swapped in since the last command
+        if watcher is not None and watcher.current is not watched and watcher.current is not None:
+            watched = watcher.current
+            use_snapshot(watched)
+            print(f"🔄 Reloaded changed files (version {watched.version}, "
+                  f"{watcher.last_reload_seconds:.2f}s)")
+
         if choice == "1":
             path = input("Enter the path to your movies file: ").strip()
+            movies_path = path
+            if watcher is not None:
+                watcher.stop()
+                watcher = None
+                print("⏸️  Auto-reload stopped; enable it again to watch the new file.")
             movies = load_movies_file(path)
             if movies:
                 print(f"📁 Movies file loaded successfully. ({len(movies)} movies)")
+                prepare_rankings(movies, ratings)
             else:
                 print("⚠️  No movies loaded. Please check the file path or file format.")
 
         elif choice == "2":
             path = input("Enter the path to your ratings file: ").strip()
-            ratings, user_ratings = load_ratings_file(path)
+            ratings_path = path
+            if watcher is not None:
+                watcher.stop()
+                watcher = None
+                print("⏸️  Auto-reload stopped; enable it again to watch the new file.")
+            ratings, user_ratings = load_ratings_file(path, movies)
             if ratings and user_ratings:
                 print(f"📁 Ratings file loaded successfully. ({len(ratings)} movies rated)")
+                prepare_rankings(movies, ratings)
             else:
                 print("⚠️  No ratings loaded. Please check the file path or file format.")
 
@@ -275,7 +432,7 @@ def main_menu():
                 continue
             try:
                 n = int(input("Enter number of top movies to display: "))
-                top_n_movies(movies, ratings, n)
+                top_n_movies(movies, ratings, n, rank_by, min_support)
             except ValueError:
                 print("❌ Please enter a valid number.")
 
@@ -302,7 +459,7 @@ def main_menu():
                 if n > max_genres:
                     print(f"⚠️ You requested more genres than available. Showing top {max_genres} genres instead.")
                     n = max_genres
-                top_n_genres(movies, ratings, n)
+                top_n_genres(movies, ratings, n, rank_by, min_support)
             except ValueError:
                 print("❌ Please enter a valid number.")
 
@@ -327,6 +484,82 @@ def main_menu():
                 print("❌ Please enter a valid user ID (number).")
 
         elif choice == "8":
+            name = input("Enter dataset name to switch to: ").strip()
+            if not name:
+                print("❌ Please enter a dataset name.")
+                continue
+            # Park the current dataset in the registry instead of discarding it
+            if movies or ratings:
+                registry.add(current, movies, ratings, user_ratings)
+            if name in registry:
+                dataset = registry.get(name)
+                movies, ratings, user_ratings = dataset.movies, dataset.ratings, dataset.user_ratings
+                print(f"📂 Switched to dataset '{name}'. ({len(movies)} movies, {len(ratings)} movies rated)")
+                prepare_rankings(movies, ratings)
+            else:
+                movies, ratings, user_ratings = {}, {}, {}
+                print(f"📂 Created dataset '{name}'. Please load its movies and ratings files.")
+            current = name
+            movies_path = ratings_path = None
+            if watcher is not None:
+                watcher.stop()
+                watcher = None
+                print("⏸️  Auto-reload stopped for the previous dataset.")
+
+        elif choice == "9":
+            if watcher is not None:
+                watcher.stop()
+                watcher = None
+                print("⏸️  Auto-reload stopped.")
+                continue
+            if not movies_path or not ratings_path:
+                print("⚠️  Load both a movies file and a ratings file before enabling auto-reload.")
+                continue
+            # on_reload runs in the watcher thread, so swapped-in data arrives already scored
+            watcher = DatasetWatcher(movies_path, ratings_path,
+                                     on_reload=lambda snap: prepare_rankings(snap.movies, snap.ratings))
+            watched = watcher.start().current
+            if watched is not None:
+                use_snapshot(watched)
+            print(f"▶️  Watching {movies_path} and {ratings_path} for changes.")
+
+        elif choice == "10":
+            if not check_data_loaded(movies, ratings):
+                continue
+            from title_index import resolve_title
+            title = resolve_title(title_search(), input("Enter movie title: "))
+            try:
+                n = int(input("Enter number of movies to display: "))
+                if also_index is None or also_source is not user_ratings:
+                    also_index = CooccurrenceIndex.from_user_ratings(user_ratings)
+                    also_source = user_ratings
+                show_also_rated(also_index, title, n)
+            except ValueError:
+                print("❌ Please enter a valid number.")
+
+        elif choice == "11":
+            if not check_data_loaded(movies, ratings):
+                continue
+            from movie_stats import rating_statistics, show_rating_statistics  # needs numpy
+            from title_index import resolve_title
+            title = input("Enter movie title (or press Enter for all movies): ").strip()
+            if title:
+                title = resolve_title(title_search(), title)
+            if stats is None or stats_source is not ratings:
+                stats = rating_statistics(ratings)
+                stats_source = ratings
+            show_rating_statistics(stats, title)
+
+        elif choice == "12":
+            if not check_data_loaded(movies, ratings):
+                continue
+            from title_index import show_title_search
+            show_title_search(title_search(), input("Enter part of a movie title: ").strip())
+
+        elif choice == "13":
+            if watcher is not None:
+                watcher.stop()
+            registry.close()
             print("🍿 Thank you for using Movie Recommender!")
             break
 
@@ -335,4 +568,18 @@ def main_menu():
 
 
 if __name__ == "__main__":
-    main_menu()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Interactive Movie Recommender System.")
+    parser.add_argument("--rank-by", choices=["mean", "bayesian", "wilson"], default="mean",
+                        help="score used by the top N movies/genres reports")
+    parser.add_argument("--min-support", type=int, default=1,
+                        help="leave movies with fewer ratings out of those reports")
+    parser.add_argument("--memory-budget", type=int, metavar="MB",
+                        help="memory for datasets kept side by side; least recently used ones "
+                             "are parked on disk beyond it (default 512)")
+    args = parser.parse_args()
+    if args.memory_budget is not None and args.memory_budget < 1:
+        parser.error("--memory-budget must be at least 1")
+    budget = args.memory_budget * 1024 * 1024 if args.memory_budget is not None else None
+    main_menu(budget, rank_by=args.rank_by, min_support=args.min_support)
\ No newline at end of file
@@ -0,0 +1,134 @@
+"""
+movie_stats.py
+--------------
+Per-movie rating distribution statistics computed in one vectorized pass.
+
+All ratings are laid out in one flat NumPy array ordered by movie (and by
+value within a movie), so every statistic is a segment reduction over
+contiguous runs instead of a Python loop per title:
+
+    count, mean        np.add.reduceat over the segments
+    median             the middle element(s) of each sorted segment
+    std (population)   reduceat of squared deviations from the segment mean
+    histogram          one bincount over (movie, half-star bucket) pairs
+
+Histogram buckets are half stars: bucket i holds ratings in [i/2, i/2 + 0.5),
+and the last bucket holds 5.0.
+"""
+import numpy as np
+
+
+HIST_LABELS = [i / 2 for i in range(11)]
+
+
+class RatingStatistics:
+    """Column-oriented statistics for every rated title."""
+
+    def __init__(self, titles, count, mean, median, std, histogram):
+        self.titles = titles
+        self.count = count
+        self.mean = mean
+        self.median = median
+        self.std = std
+        self.histogram = histogram
+        self._row = {t: i for i, t in enumerate(titles)}
+
+    def __len__(self):
+        return len(self.titles)
+
+    def __contains__(self, title):
+        return title in self._row
+
+    def get(self, title):
+        """Statistics for one title as a dict, or None if it has no ratings."""
+        i = self._row.get(title)
+        if i is None:
+            return None
+        return {
+            "count": int(self.count[i]),
+            "mean": float(self.mean[i]),
+            "median": float(self.median[i]),
+            "std": float(self.std[i]),
+            "histogram": dict(zip(HIST_LABELS, self.histogram[i].tolist())),
+        }
+
+    def rows(self, sort_by="title"):
+        """Yield (title, count, mean, median, std) sorted by title or by count."""
+        if sort_by == "count":
+            order = np.lexsort((np.arange(len(self.titles)), -self.count))
+        else:
+            order = sorted(range(len(self.titles)), key=self.titles.__getitem__)
+        for i in order:
+            yield (self.titles[i], int(self.count[i]), float(self.mean[i]),
+                   float(self.median[i]), float(self.std[i]))
+
+
+def statistics_from_columns(movie_ids, values, titles):
+    """
+    Compute statistics from parallel (movie_id, rating) columns, e.g. a
+    RatingsColumns view; movie_ids index into titles. Input order is free.
+    """
+    movie_ids = np.asarray(movie_ids)
+    values = np.asarray(values, dtype=np.float64)
+    n_titles = len(titles)
+
+    # Sort by movie, then by rating inside each movie
+    order = np.lexsort((values, movie_ids))
+    ids = movie_ids[order]
+    vals = values[order]
+
+    counts_all = np.bincount(ids, minlength=n_titles)
+    present = np.flatnonzero(counts_all)
+    counts = counts_all[present]
+    starts = np.zeros(len(present), dtype=np.int64)
+    np.cumsum(counts[:-1], out=starts[1:])
+
+    if len(vals) == 0:
+        empty = np.zeros(0)
+        return RatingStatistics([], counts, empty, empty, empty, np.zeros((0, len(HIST_LABELS)), dtype=np.int64))
+
+    means = np.add.reduceat(vals, starts) / counts
+    lo = vals[starts + (counts - 1) // 2]
+    hi = vals[starts + counts // 2]
+    medians = (lo + hi) / 2
+
+    segment = np.repeat(np.arange(len(present)), counts)
+    deviations = vals - means[segment]
+    stds = np.sqrt(np.add.reduceat(deviations * deviations, starts) / counts)
+
+    buckets = np.clip((vals * 2).astype(np.int64), 0, len(HIST_LABELS) - 1)
+    hist = np.bincount(segment * len(HIST_LABELS) + buckets, minlength=len(present) * len(HIST_LABELS))
+    hist = hist.reshape(len(present), len(HIST_LABELS))
+
+    return RatingStatistics([titles[i] for i in present.tolist()], counts, means, medians, stds, hist)
+
+
+def rating_statistics(ratings):
+    """Compute statistics for {movie_name: [ratings, ...]} as loaded by load_ratings_file."""
+    titles = list(ratings)
+    counts = np.fromiter((len(r) for r in ratings.values()), dtype=np.int64, count=len(titles))
+    values = np.fromiter((x for r in ratings.values() for x in r), dtype=np.float64, count=int(counts.sum()))
+    movie_ids = np.repeat(np.arange(len(titles)), counts)
+    return statistics_from_columns(movie_ids, values, titles)
+
+
+def show_rating_statistics(stats, title=None):
+    """Display one title's distribution, or a table of every title."""
+    if title:
+        title = title.strip().title()
+        s = stats.get(title)
+        if s is None:
+            print(f"No ratings found for '{title}'.")
+            return
+        print(f"\n📊 Rating statistics for '{title}':")
+        print(f"Count: {s['count']}  Mean: {s['mean']:.2f}  Median: {s['median']:.2f}  Std: {s['std']:.2f}")
+        peak = max(s["histogram"].values()) or 1
+        for label, n in s["histogram"].items():
+            if n:
+                print(f"{label:>4.1f} | {'█' * max(1, round(20 * n / peak))} {n}")
+        return
+
+    print(f"\n📊 Rating statistics for {len(stats)} movies (most rated first):")
+    print(f"{'Movie':<40} {'Count':>6} {'Mean':>6} {'Median':>7} {'Std':>6}")
+    for name, count, avg, median, std in stats.rows(sort_by="count"):
+        print(f"{name[:40]:<40} {count:>6} {avg:>6.2f} {median:>7.2f} {std:>6.2f}")
@@ -0,0 +1,274 @@
+"""
+ratings_binary.py
+-----------------
+Fixed-width columnar ratings format with zero-copy NumPy views.
+
+Converting the pipe-delimited text ratings (movie|rating|user) once
+produces a file the loaders can open through mmap without parsing:
+
+    header  : magic, version, rating width, title/rating counts, section offsets
+    columns : movie_id uint32[n], user_id uint32[n], rating float16/32[n]
+    titles  : uint64 offsets[n_titles + 1] followed by the UTF-8 title blob
+
+movie_id indexes the title dictionary. Every section starts on an 8-byte
+boundary, so the columns map straight onto NumPy arrays backed by the
+page cache: opening a file costs the same no matter how many ratings
+it holds.
+
+Usage:
+    python ratings_binary.py convert ratings.txt ratings.bin [--float16]
+    python ratings_binary.py info ratings.bin
+"""
+import argparse
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import time
+from array import array
+
+import numpy as np
+
+import movie_recommender as mr
+
+
+MAGIC = mr.BINARY_RATINGS_MAGIC
+VERSION = 1
+# magic, version, rating width (bytes), n_titles, n_ratings,
+# movie_off, user_off, rating_off, titles_off, blob_off
+HEADER = struct.Struct("<8sHHIQQQQQQ")
+RATING_DTYPES = {2: np.float16, 4: np.float32}
+MAX_USER_ID = 2 ** 32 - 1
+# Rows buffered per column before spilling to the temporary column files
+FLUSH_ROWS = 1 << 20
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+# ------------------------------
+# Conversion
+# ------------------------------
+def convert_ratings_file(src, dst, half_precision=False):
+    """
+    Convert a text ratings file into the columnar binary format.
+
+    Lines are validated exactly like load_ratings_file; user IDs outside
+    uint32 range are skipped. Columns are spilled to temporary files in
+    blocks, so memory stays bounded by the title dictionary.
+    Returns the number of ratings written.
+    """
+    width = 2 if half_precision else 4
+    rating_code = "e" if half_precision else "f"
+    titles = {}
+    n_ratings = 0
+    tmp_dir = tempfile.mkdtemp(prefix="ratings_binary_", dir=os.path.dirname(os.path.abspath(dst)))
+    col_paths = [os.path.join(tmp_dir, name) for name in ("movie", "user", "rating")]
+
+    try:
+        cols = [open(p, "wb") for p in col_paths]
+        try:
+            movie_col, user_col = array("I"), array("I")
+            rating_col = []
+
+            def flush():
+                movie_col.tofile(cols[0])
+                user_col.tofile(cols[1])
+                cols[2].write(struct.pack(f"<{len(rating_col)}{rating_code}", *rating_col))
+                del movie_col[:], user_col[:], rating_col[:]
+
+            with open(src, "r", encoding="utf-8") as f:
+                for line_num, line in enumerate(f, start=1):
+                    parsed = mr.parse_ratings_line(line, line_num)
+                    if parsed is None:
+                        continue
+                    movie_name, rating, user_id = parsed
+                    if not (0 <= user_id <= MAX_USER_ID):
+                        print(f"Skipping line {line_num}: user ID out of range -> {line.strip()}")
+                        continue
+                    movie_col.append(titles.setdefault(movie_name, len(titles)))
+                    user_col.append(user_id)
+                    rating_col.append(rating)
+                    n_ratings += 1
+                    if len(movie_col) >= FLUSH_ROWS:
+                        flush()
+            flush()
+        finally:
+            for c in cols:
+                c.close()
+
+        encoded = [t.encode("utf-8") for t in titles]
+        movie_off = _align(HEADER.size)
+        user_off = _align(movie_off + 4 * n_ratings)
+        rating_off = _align(user_off + 4 * n_ratings)
+        titles_off = _align(rating_off + width * n_ratings)
+        blob_off = titles_off + 8 * (len(encoded) + 1)
+
+        with open(dst, "wb") as out:
+            out.write(HEADER.pack(MAGIC, VERSION, width, len(encoded), n_ratings,
+                                  movie_off, user_off, rating_off, titles_off, blob_off))
+            for offset, path in zip((movie_off, user_off, rating_off), col_paths):
+                out.write(b"\0" * (offset - out.tell()))
+                with open(path, "rb") as col:
+                    shutil.copyfileobj(col, out, 1 << 20)
+            out.write(b"\0" * (titles_off - out.tell()))
+            offsets = np.zeros(len(encoded) + 1, dtype="<u8")
+            np.cumsum([len(b) for b in encoded], out=offsets[1:])
+            out.write(offsets.tobytes())
+            out.write(b"".join(encoded))
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return n_ratings
+
+
+# ------------------------------
+# Zero-copy reader
+# ------------------------------
+def ratings_to_floats(values):
+    """Stored ratings as Python floats equal to the ones parsed from text."""
+    # Shortest decimal repr recovers the typed value (3.7, not 3.700000047)
+    return values.astype("U16").astype(np.float64).tolist()
+
+
+class RatingsColumns:
+    """
+    Memory-mapped view of a columnar ratings file.
+
+    movie_ids, user_ids and ratings are read-only NumPy arrays that point
+    directly into the mapped file; nothing is copied until used.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            if size < HEADER.size:
+                raise ValueError(f"'{path}' is too short to be a columnar ratings file.")
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._file.close()
+            raise
+        self.movie_ids = self.user_ids = self.ratings = self._title_offsets = None
+        (magic, version, width, self.n_titles, n_ratings, movie_off, user_off,
+         rating_off, titles_off, blob_off) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION or width not in RATING_DTYPES:
+            self.close()
+            raise ValueError(f"'{path}' is not a supported columnar ratings file.")
+        columns = ((movie_off, 4 * n_ratings), (user_off, 4 * n_ratings), (rating_off, width * n_ratings),
+                   (titles_off, 8 * (self.n_titles + 1)))
+        if any(off + length > size for off, length in columns) or blob_off > size:
+            self.close()
+            raise ValueError(f"'{path}' is a truncated columnar ratings file.")
+
+        self.movie_ids = np.frombuffer(self._mm, dtype="<u4", count=n_ratings, offset=movie_off)
+        self.user_ids = np.frombuffer(self._mm, dtype="<u4", count=n_ratings, offset=user_off)
+        self.ratings = np.frombuffer(self._mm, dtype=np.dtype(RATING_DTYPES[width]).newbyteorder("<"),
+                                     count=n_ratings, offset=rating_off)
+        self._title_offsets = np.frombuffer(self._mm, dtype="<u8", count=self.n_titles + 1, offset=titles_off)
+        if blob_off + int(self._title_offsets[-1]) > size:
+            self.close()
+            raise ValueError(f"'{path}' is a truncated columnar ratings file.")
+        self._blob_off = blob_off
+        self._titles = None
+
+    def close(self):
+        # Drop the array views first; mmap refuses to close while exported
+        self.movie_ids = self.user_ids = self.ratings = self._title_offsets = None
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.movie_ids)
+
+    def title(self, movie_id):
+        start, end = self._title_offsets[movie_id], self._title_offsets[movie_id + 1]
+        return self._mm[self._blob_off + int(start):self._blob_off + int(end)].decode("utf-8")
+
+    @property
+    def titles(self):
+        """All titles, indexed by movie_id (decoded on first use)."""
+        if self._titles is None:
+            self._titles = [self.title(i) for i in range(self.n_titles)]
+        return self._titles
+
+    def movie_averages(self):
+        """Return {movie_name: average rating} via vectorized bincounts."""
+        counts = np.bincount(self.movie_ids, minlength=self.n_titles)
+        sums = np.bincount(self.movie_ids, weights=self.ratings, minlength=self.n_titles)
+        return {self.titles[i]: sums[i] / counts[i] for i in np.flatnonzero(counts)}
+
+    def to_dicts(self):
+        """
+        Materialize (ratings, user_ratings) exactly as load_ratings_file
+        builds them from the text file.
+        """
+        values = ratings_to_floats(self.ratings)
+        titles = self.titles
+        ratings = {}
+        user_ratings = {}
+        for movie_id, user_id, rating in zip(self.movie_ids.tolist(), self.user_ids.tolist(), values):
+            movie_name = titles[movie_id]
+            ratings.setdefault(movie_name, []).append(rating)
+            user_ratings.setdefault(user_id, {})[movie_name] = rating
+        return ratings, user_ratings
+
+
+def open_ratings_binary(path):
+    """Open a columnar ratings file as zero-copy NumPy columns."""
+    return RatingsColumns(path)
+
+
+def load_ratings_binary(filename):
+    """load_ratings_file counterpart for columnar files: (ratings, user_ratings)."""
+    try:
+        with RatingsColumns(filename) as cols:
+            return cols.to_dicts()
+    except (OSError, ValueError) as e:
+        print(f"Unexpected error while loading ratings: {e}")
+        return {}, {}
+
+
+# ------------------------------
+# CLI
+# ------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert and inspect columnar ratings files.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("convert", help="convert a text ratings file")
+    p.add_argument("source")
+    p.add_argument("output")
+    p.add_argument("--float16", action="store_true", help="store ratings as float16 (exact for half stars)")
+
+    p = sub.add_parser("info", help="open a columnar file and print a summary")
+    p.add_argument("path")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "convert":
+        start = time.perf_counter()
+        try:
+            n = convert_ratings_file(args.source, args.output, args.float16)
+        except FileNotFoundError:
+            print(f"Error: Ratings file '{args.source}' not found.")
+            return
+        print(f"📁 Wrote {n} ratings to {args.output} in {time.perf_counter() - start:.2f}s")
+
+    elif args.command == "info":
+        start = time.perf_counter()
+        with RatingsColumns(args.path) as cols:
+            opened = time.perf_counter() - start
+            print(f"Ratings: {len(cols)}  Titles: {cols.n_titles}  "
+                  f"Rating dtype: {cols.ratings.dtype}  Opened in {opened * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+"""
+ratings_diff.py
+---------------
+Streaming diff of two ratings snapshots in bounded memory.
+
+Both snapshots are turned into streams of (movie, user, rating) records
+sorted by (movie, user) and walked together in one merge-join:
+
+- files already in that order are streamed as-is (--presorted, checked
+  while reading);
+- otherwise each file is external-sorted (ExternalSorter): sorted runs
+  of at most chunk_size records are spilled to temporary files and
+  merged back with heapq.merge.
+
+While joining, only the current movie's old/new count and sum are held
+in memory, so per-movie deltas are emitted as soon as a movie ends.
+Per-user changes (added, removed or re-rated titles) go through the same
+external sort to come out grouped by user. Memory use is bounded by
+chunk_size, whatever the file sizes.
+
+A user rating the same movie twice in one snapshot counts once, with the
+later rating, as in the loaders' user_ratings.
+
+Inputs can be pipe-format, MovieLens CSV (keyed by movie ID) or binary
+ratings files, compressed or not.
+
+Usage:
+    python ratings_diff.py old.txt new.txt [--movies-out deltas.csv]
+                           [--changes-out changes.csv] [--presorted]
+"""
+import argparse
+import contextlib
+import csv
+import heapq
+import itertools
+import os
+import pickle
+import tempfile
+import time
+from operator import itemgetter
+
+import movie_recommender as mr
+
+
+DEFAULT_CHUNK_SIZE = 1_000_000   # records per sorted run
+DEFAULT_TOP = 10
+
+MOVIE_FIELDS = ["movie", "old_count", "new_count", "count_delta", "old_avg", "new_avg", "avg_delta"]
+CHANGE_FIELDS = ["user", "movie", "old_rating", "new_rating"]
+
+
+# ------------------------------
+# Reading snapshots
+# ------------------------------
+def read_records(path):
+    """Yield (movie, user, rating) from a ratings snapshot, in file order."""
+    if mr.is_binary_ratings_file(path):
+        import ratings_binary  # needs numpy
+        with ratings_binary.RatingsColumns(path) as cols:
+            titles = cols.titles
+            step = ratings_binary.FLUSH_ROWS
+            for lo in range(0, len(cols), step):
+                movie_ids = cols.movie_ids[lo:lo + step].tolist()
+                users = cols.user_ids[lo:lo + step].tolist()
+                values = ratings_binary.ratings_to_floats(cols.ratings[lo:lo + step])
+                for m, u, r in zip(movie_ids, users, values):
+                    yield titles[m], u, r
+        return
+
+    from input_formats import open_text
+
+    f, fmt = open_text(path)
+    with f:
+        if fmt == "csv":
+            reader = csv.reader(f)
+            for row in reader:
+                if len(row) < 3 or (reader.line_num == 1 and row[0] == "userId"):
+                    continue
+                try:
+                    user, rating = int(row[0]), float(row[2])
+                except ValueError:
+                    print(f"Skipping line {reader.line_num}: invalid numeric value -> {','.join(row)}")
+                    continue
+                if 0 <= rating <= 5:
+                    yield row[1], user, rating
+        else:
+            for line_num, line in enumerate(f, start=1):
+                parsed = mr.parse_ratings_line(line, line_num)
+                if parsed is not None:
+                    movie, rating, user = parsed
+                    yield movie, user, rating
+
+
+class ExternalSorter:
+    """
+    Sort more records than fit in memory: records are buffered, and every
+    chunk_size of them are sorted and spilled to a temporary run file;
+    iterating merges the runs. Stable, like list.sort.
+    """
+
+    BATCH = 10_000  # records per pickle in a run file
+
+    def __init__(self, key, chunk_size=DEFAULT_CHUNK_SIZE, tmp_dir=None):
+        self.key = key
+        self.chunk_size = chunk_size
+        self.tmp_dir = tmp_dir
+        self.buffer = []
+        self.runs = []
+
+    def add(self, record):
+        self.buffer.append(record)
+        if len(self.buffer) >= self.chunk_size:
+            self._spill()
+
+    def extend(self, records):
+        for record in records:
+            self.add(record)
+
+    def _spill(self):
+        self.buffer.sort(key=self.key)
+        fd, path = tempfile.mkstemp(prefix="ratings_run_", suffix=".pkl", dir=self.tmp_dir)
+        self.runs.append(path)
+        with os.fdopen(fd, "wb") as f:
+            for lo in range(0, len(self.buffer), self.BATCH):
+                pickle.dump(self.buffer[lo:lo + self.BATCH], f, pickle.HIGHEST_PROTOCOL)
+        self.buffer = []
+
+    @staticmethod
+    def _read_run(path):
+        with open(path, "rb") as f:
+            while True:
+                try:
+                    yield from pickle.load(f)
+                except EOFError:
+                    return
+
+    def __iter__(self):
+        if not self.runs:
+            self.buffer.sort(key=self.key)  # everything fit in memory
+            return iter(self.buffer)
+        if self.buffer:
+            self._spill()
+        # heapq.merge takes earlier runs first on ties, which keeps the sort stable
+        return heapq.merge(*map(self._read_run, self.runs), key=self.key)
+
+    def close(self):
+        for path in self.runs:
+            os.remove(path)
+        self.runs = []
+        self.buffer = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def _check_sorted(records, path):
+    """Pass records through, raising ValueError on the first one out of (movie, user) order."""
+    previous = None
+    for record in records:
+        key = record[:2]
+        if previous is not None and key < previous:
+            raise ValueError(f"'{path}' is not sorted by (movie, user) near {key}; drop --presorted.")
+        previous = key
+        yield record
+
+
+def _last_per_key(records):
+    """Collapse repeated (movie, user) keys in sorted records, keeping the last rating."""
+    for _, group in itertools.groupby(records, key=itemgetter(0, 1)):
+        for record in group:
+            pass
+        yield record
+
+
+def sorted_records(path, presorted=False, chunk_size=DEFAULT_CHUNK_SIZE, tmp_dir=None):
+    """
+    Yield a snapshot's records sorted by (movie, user), one per key.
+    Unsorted input is external-sorted through temporary run files.
+    """
+    records = read_records(path)
+    if presorted:
+        yield from _last_per_key(_check_sorted(records, path))
+        return
+    with ExternalSorter(itemgetter(0, 1), chunk_size, tmp_dir) as sorter:
+        sorter.extend(records)
+        yield from _last_per_key(sorter)
+
+
+# ------------------------------
+# Merge-join
+# ------------------------------
+_END = (None, None, None)
+
+
+def merge_join(old, new):
+    """
+    Join two (movie, user)-sorted record streams. Yields
+    (movie, user, old_rating, new_rating) for every key, with None on the
+    side where the key is missing.
+    """
+    old, new = iter(old), iter(new)
+    a = next(old, _END)
+    b = next(new, _END)
+    while a is not _END or b is not _END:
+        if b is _END or (a is not _END and a[:2] < b[:2]):
+            yield a[0], a[1], a[2], None
+            a = next(old, _END)
+        elif a is _END or b[:2] < a[:2]:
+            yield b[0], b[1], None, b[2]
+            b = next(new, _END)
+        else:
+            yield a[0], a[1], a[2], b[2]
+            a = next(old, _END)
+            b = next(new, _END)
+
+
+def movie_deltas(joined, on_change=None):
+    """
+    Fold merge_join output into per-movie rows (see MOVIE_FIELDS), yielded
+    only for movies whose ratings changed. on_change(user, movie, old, new)
+    is called for every added, removed or changed rating.
+    """
+    for movie, rows in itertools.groupby(joined, key=itemgetter(0)):
+        old_n = new_n = 0
+        old_sum = new_sum = 0.0
+        changed = False
+        for _, user, old_r, new_r in rows:
+            if old_r is not None:
+                old_n += 1
+                old_sum += old_r
+            if new_r is not None:
+                new_n += 1
+                new_sum += new_r
+            if old_r != new_r:
+                changed = True
+                if on_change is not None:
+                    on_change(user, movie, old_r, new_r)
+        if changed:
+            old_avg = old_sum / old_n if old_n else None
+            new_avg = new_sum / new_n if new_n else None
+            avg_delta = new_avg - old_avg if old_n and new_n else None
+            yield movie, old_n, new_n, new_n - old_n, old_avg, new_avg, avg_delta
+
+
+def _fmt(value):
+    return "" if value is None else f"{value:.4f}"
+
+
+def diff_ratings(old_path, new_path, movies_out=None, changes_out=None, presorted=False,
+                 chunk_size=DEFAULT_CHUNK_SIZE, top=DEFAULT_TOP, tmp_dir=None):
+    """
+    Diff two snapshots, writing per-movie deltas (in movie order) and
+    per-user changes (in user order) as CSV; either output may be None.
+    Returns a summary dict with counts and the `top` movies whose average
+    moved most.
+    """
+    summary = {"movies_changed": 0, "added": 0, "removed": 0, "changed": 0}
+    movers = []   # min-heap of (|avg_delta|, movie, avg_delta), at most `top` long
+
+    with contextlib.ExitStack() as stack:
+        # Changes come out of the join in movie order; re-sort them by user
+        changes = stack.enter_context(ExternalSorter(itemgetter(0, 1), chunk_size, tmp_dir))
+        movie_writer = None
+        if movies_out is not None:
+            movie_writer = csv.writer(stack.enter_context(open(movies_out, "w", encoding="utf-8", newline="")))
+            movie_writer.writerow(MOVIE_FIELDS)
+
+        def on_change(user, movie, old_r, new_r):
+            kind = "added" if old_r is None else "removed" if new_r is None else "changed"
+            summary[kind] += 1
+            if changes_out is not None:
+                changes.add((user, movie, old_r, new_r))
+
+        old = sorted_records(old_path, presorted, chunk_size, tmp_dir)
+        new = sorted_records(new_path, presorted, chunk_size, tmp_dir)
+        for row in movie_deltas(merge_join(old, new), on_change):
+            summary["movies_changed"] += 1
+            if movie_writer:
+                movie_writer.writerow(list(row[:4]) + [_fmt(v) for v in row[4:]])
+            movie, avg_delta = row[0], row[6]
+            if avg_delta is not None and top > 0:
+                item = (abs(avg_delta), movie, avg_delta)
+                if len(movers) < top:
+                    heapq.heappush(movers, item)
+                elif item > movers[0]:
+                    heapq.heapreplace(movers, item)
+
+        if changes_out is not None:
+            with open(changes_out, "w", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(CHANGE_FIELDS)
+                for user, movie, old_r, new_r in changes:
+                    writer.writerow([user, movie, _fmt(old_r), _fmt(new_r)])
+
+    summary["top_movers"] = [(movie, delta) for _, movie, delta in sorted(movers, reverse=True)]
+    return summary
+
+
+# ------------------------------
+# CLI
+# ------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Diff two ratings snapshots in bounded memory.")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--movies-out", help="CSV of per-movie count/average deltas")
+    parser.add_argument("--changes-out", help="CSV of per-user added/removed/changed ratings")
+    parser.add_argument("--presorted", action="store_true", help="inputs are already sorted by (movie, user)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="records per in-memory sorted run")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="movers to show in the summary")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        summary = diff_ratings(args.old, args.new, args.movies_out, args.changes_out,
+                               args.presorted, args.chunk_size, args.top)
+    except FileNotFoundError as e:
+        print(f"Error: Ratings file '{e.filename}' not found.")
+        return
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+
+    print(f"\n📊 {summary['movies_changed']} movies changed: {summary['added']} ratings added, "
+          f"{summary['removed']} removed, {summary['changed']} changed "
+          f"({time.perf_counter() - start:.2f}s)")
+    if summary["top_movers"]:
+        print(f"\n🏆 Top {len(summary['top_movers'])} Average Rating Changes:")
+        for i, (movie, delta) in enumerate(summary["top_movers"], 1):
+            print(f"{i}. {movie} — {delta:+.2f}")
+
+
+if __name__ == "__main__":
+    main()
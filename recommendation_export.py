@@ -0,0 +1,266 @@
+"""
+recommendation_export.py
+------------------------
+Precomputed recommendations in a compact fixed-width binary table.
+
+The export runs the favorite-genre recommendation (same results as
+recommend_movies / genre_recommendations) for every user and writes:
+
+    header    : magic, k, user count, title count, record size, titles offset
+    user index: sorted int64 user IDs
+    records   : one fixed-width record per user, in index order:
+                uint32 count, then k x (uint32 title id, float32 average)
+    titles    : uint64 offsets followed by the UTF-8 title blob
+
+A reader memory-maps the file and binary-searches the user index, so a
+lookup touches only a few pages and nothing is parsed up front.
+
+Usage:
+    python recommendation_export.py export movies.txt ratings.txt recs.bin -k 3
+    python recommendation_export.py lookup recs.bin 42
+    python recommendation_export.py bench recs.bin --lookups 100000
+"""
+import argparse
+import mmap
+import os
+import random
+import struct
+import time
+from statistics import mean
+
+import movie_recommender as mr
+
+
+MAGIC = b"MRECTBL1"
+HEADER = struct.Struct("<8sIIIIQ")   # magic, k, n_users, n_titles, record_size, titles_offset
+USER_ID = struct.Struct("<q")
+COUNT = struct.Struct("<I")
+ENTRY = struct.Struct("<If")         # title id, score
+OFFSET = struct.Struct("<Q")
+
+
+# ------------------------------
+# Batch recommendation
+# ------------------------------
+def batch_genre_recommendations(movies, ratings, user_ratings, n=3):
+    """
+    Yield (user_id, favorite_genre, [(movie, avg), ...]) for every user.
+
+    Produces the same lists as genre_recommendations, but ranks each genre
+    once instead of recomputing every genre average per user.
+    """
+    movie_avg = {m: mean(r) for m, r in ratings.items() if r}
+    ranked_by_genre = {}
+    for movie_name, data in movies.items():
+        if movie_name in movie_avg:
+            ranked_by_genre.setdefault(data["genre"], []).append(movie_name)
+    for genre, names in ranked_by_genre.items():
+        names.sort(key=lambda m: movie_avg[m], reverse=True)
+
+    for user_id in sorted(user_ratings):
+        favorite_genre = mr.user_favorite_genre(user_id, movies, user_ratings)
+        recs = []
+        if favorite_genre:
+            rated = user_ratings[user_id]
+            for movie_name in ranked_by_genre.get(favorite_genre, ()):
+                if movie_name not in rated:
+                    recs.append((movie_name, movie_avg[movie_name]))
+                    if len(recs) == n:
+                        break
+        yield user_id, favorite_genre, recs
+
+
+# ------------------------------
+# Writer
+# ------------------------------
+def write_table(path, user_recs, k):
+    """
+    Write {user_id: [(movie, score), ...]} as a fixed-width binary table.
+    Lists longer than k are truncated.
+    """
+    record_size = COUNT.size + k * ENTRY.size
+    user_ids = sorted(user_recs)
+    title_ids = {}
+    for user_id in user_ids:
+        for movie_name, _ in user_recs[user_id][:k]:
+            title_ids.setdefault(movie_name, len(title_ids))
+
+    index_offset = HEADER.size
+    records_offset = index_offset + len(user_ids) * USER_ID.size
+    titles_offset = records_offset + len(user_ids) * record_size
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, k, len(user_ids), len(title_ids), record_size, titles_offset))
+        f.write(struct.pack(f"<{len(user_ids)}q", *user_ids))
+
+        record = bytearray(record_size)
+        for user_id in user_ids:
+            recs = user_recs[user_id][:k]
+            record[:] = bytes(record_size)
+            COUNT.pack_into(record, 0, len(recs))
+            for i, (movie_name, score) in enumerate(recs):
+                ENTRY.pack_into(record, COUNT.size + i * ENTRY.size, title_ids[movie_name], score)
+            f.write(record)
+
+        encoded = [t.encode("utf-8") for t in title_ids]
+        offset = 0
+        for blob in encoded:
+            f.write(OFFSET.pack(offset))
+            offset += len(blob)
+        f.write(OFFSET.pack(offset))
+        for blob in encoded:
+            f.write(blob)
+    return len(user_ids)
+
+
+def export_recommendations(movies, ratings, user_ratings, path, k=3):
+    """Run genre-based recommendation for every user and write the table."""
+    user_recs = {user_id: recs for user_id, _, recs
+                 in batch_genre_recommendations(movies, ratings, user_ratings, k)}
+    return write_table(path, user_recs, k)
+
+
+# ------------------------------
+# Reader
+# ------------------------------
+class RecommendationTable:
+    """Memory-mapped reader for tables written by write_table()."""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            if size < HEADER.size:
+                raise ValueError(f"'{path}' is too short to be a recommendation table.")
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._file.close()
+            raise
+        magic, self.k, self.n_users, self.n_titles, self.record_size, self._titles_offset = \
+            HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"'{path}' is not a recommendation table.")
+        self._records_offset = HEADER.size + self.n_users * USER_ID.size
+        self._blob_offset = self._titles_offset + (self.n_titles + 1) * OFFSET.size
+        if (self.record_size != COUNT.size + self.k * ENTRY.size
+                or self._titles_offset != self._records_offset + self.n_users * self.record_size
+                or self._blob_offset > size
+                or self._blob_offset + OFFSET.unpack_from(self._mm, self._blob_offset - OFFSET.size)[0] > size):
+            self.close()
+            raise ValueError(f"'{path}' is a truncated or damaged recommendation table.")
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.n_users
+
+    def _user_at(self, i):
+        return USER_ID.unpack_from(self._mm, HEADER.size + i * USER_ID.size)[0]
+
+    def user_ids(self):
+        """All user IDs in the table, in sorted order."""
+        return list(struct.unpack_from(f"<{self.n_users}q", self._mm, HEADER.size))
+
+    def title(self, title_id):
+        pos = self._titles_offset + title_id * OFFSET.size
+        start, end = struct.unpack_from("<QQ", self._mm, pos)
+        return self._mm[self._blob_offset + start:self._blob_offset + end].decode("utf-8")
+
+    def find(self, user_id):
+        """Binary-search the user index; returns the row or -1."""
+        lo, hi = 0, self.n_users
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._user_at(mid) < user_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.n_users and self._user_at(lo) == user_id:
+            return lo
+        return -1
+
+    def lookup(self, user_id):
+        """Return [(movie, score), ...] for a user, or None if not exported."""
+        row = self.find(user_id)
+        if row < 0:
+            return None
+        base = self._records_offset + row * self.record_size
+        count = COUNT.unpack_from(self._mm, base)[0]
+        entries = struct.unpack_from("<" + "If" * count, self._mm, base + COUNT.size)
+        return [(self.title(entries[i]), entries[i + 1]) for i in range(0, 2 * count, 2)]
+
+
+def benchmark_lookups(path, lookups=100000, seed=0):
+    """Time random user lookups; returns (lookups per second, mean microseconds)."""
+    with RecommendationTable(path) as table:
+        users = table.user_ids()
+        if not users:
+            return 0.0, 0.0
+        rng = random.Random(seed)
+        sample = [rng.choice(users) for _ in range(lookups)]
+        start = time.perf_counter()
+        for user_id in sample:
+            table.lookup(user_id)
+        elapsed = time.perf_counter() - start
+    return lookups / elapsed, elapsed / lookups * 1e6
+
+
+# ------------------------------
+# CLI
+# ------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export and query precomputed recommendations.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("export", help="recommend for every user and write a table")
+    p.add_argument("movies")
+    p.add_argument("ratings")
+    p.add_argument("output")
+    p.add_argument("-k", type=int, default=3, help="recommendations stored per user")
+
+    p = sub.add_parser("lookup", help="print one user's recommendations")
+    p.add_argument("table")
+    p.add_argument("user_id", type=int)
+
+    p = sub.add_parser("bench", help="benchmark random lookups")
+    p.add_argument("table")
+    p.add_argument("--lookups", type=int, default=100000)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        movies = mr.load_movies_file(args.movies)
+        ratings, user_ratings = mr.load_ratings_file(args.ratings, movies)
+        if not mr.check_data_loaded(movies, ratings):
+            return
+        start = time.perf_counter()
+        count = export_recommendations(movies, ratings, user_ratings, args.output, args.k)
+        print(f"📁 Exported recommendations for {count} users to {args.output} "
+              f"in {time.perf_counter() - start:.2f}s")
+
+    elif args.command == "lookup":
+        with RecommendationTable(args.table) as table:
+            recs = table.lookup(args.user_id)
+        if recs is None:
+            print(f"User {args.user_id} not found.")
+        elif not recs:
+            print(f"No available recommendations for user {args.user_id}.")
+        for i, (movie, score) in enumerate(recs or [], start=1):
+            print(f"{i}. {movie} — {score:.2f}")
+
+    elif args.command == "bench":
+        rate, micros = benchmark_lookups(args.table, args.lookups)
+        print(f"{args.lookups} lookups: {rate:,.0f} lookups/s ({micros:.2f} µs each)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""
+shared_dataset.py
+-----------------
+Publish one loaded dataset to many worker processes through shared memory.
+
+A loader process packs the ratings as columnar NumPy arrays (grouped by
+user) together with precomputed per-movie aggregates into a single
+multiprocessing.shared_memory segment. Workers attach to it read-only and
+get NumPy views over the same physical pages, so N workers cost one copy
+of the data instead of N.
+
+A tiny control segment holds the name of the current data segment behind
+a sequence counter. Reloading publishes a complete new segment first and
+then flips the control block, so workers switch over atomically on their
+next lookup; the old segment is unlinked and disappears once the last
+worker lets go of it.
+
+Usage:
+    python shared_dataset.py publish movies.txt ratings.txt
+    python shared_dataset.py query <control-name> topn 5
+"""
+import argparse
+import json
+import os
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+import movie_recommender as mr
+
+
+CONTROL = struct.Struct("<Q64s")     # sequence counter, data segment name
+DATA_HEADER = struct.Struct("<8sQ")  # magic, table-of-contents length
+DATA_MAGIC = b"MSHMDS01"
+
+
+def _attach(name):
+    """
+    Attach to an existing segment without handing it to this process's
+    resource tracker, which would otherwise unlink the publisher's
+    segment when the worker exits.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass  # Python < 3.13 always tracks attached segments
+
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+# ------------------------------
+# Building the columnar arrays
+# ------------------------------
+def build_arrays(movies, ratings, user_ratings):
+    """
+    Turn the loaded dicts into the arrays that get published.
+
+    Ratings are grouped by user (user_indptr/item/rating); per-movie
+    count, sum and average come from the full ratings lists so they match
+    average_rating_for_movie.
+    """
+    titles = sorted(set(movies) | set(ratings) | {m for r in user_ratings.values() for m in r})
+    title_index = {t: i for i, t in enumerate(titles)}
+    genres = sorted({d["genre"] for d in movies.values()})
+    genre_index = {g: i for i, g in enumerate(genres)}
+
+    movie_genre = np.full(len(titles), -1, dtype=np.int32)
+    for name, data in movies.items():
+        movie_genre[title_index[name]] = genre_index[data["genre"]]
+
+    movie_count = np.zeros(len(titles), dtype=np.int64)
+    movie_sum = np.zeros(len(titles), dtype=np.float64)
+    for name, rlist in ratings.items():
+        movie_count[title_index[name]] = len(rlist)
+        movie_sum[title_index[name]] = sum(rlist)
+    movie_avg = np.divide(movie_sum, movie_count, out=np.zeros_like(movie_sum), where=movie_count > 0)
+
+    user_ids = np.array(sorted(user_ratings), dtype=np.int64)
+    user_indptr = np.zeros(len(user_ids) + 1, dtype=np.int64)
+    np.cumsum([len(user_ratings[u]) for u in user_ids.tolist()], out=user_indptr[1:])
+    items = np.fromiter((title_index[m] for u in user_ids.tolist() for m in user_ratings[u]),
+                        dtype=np.uint32, count=int(user_indptr[-1]))
+    values = np.fromiter((r for u in user_ids.tolist() for r in user_ratings[u].values()),
+                         dtype=np.float64, count=int(user_indptr[-1]))
+
+    arrays = {
+        "movie_genre": movie_genre,
+        "movie_count": movie_count,
+        "movie_sum": movie_sum,
+        "movie_avg": movie_avg,
+        "user_ids": user_ids,
+        "user_indptr": user_indptr,
+        "user_items": items,
+        "user_ratings": values,
+    }
+    return titles, genres, arrays
+
+
+def _pack_strings(strings):
+    blob = "\0".join(strings).encode("utf-8")
+    return np.frombuffer(blob, dtype=np.uint8) if blob else np.zeros(0, dtype=np.uint8)
+
+
+# ------------------------------
+# Publisher (loader process)
+# ------------------------------
+class SharedDatasetPublisher:
+    """Owns the control segment and publishes dataset versions into it."""
+
+    def __init__(self, control_name=None):
+        self.control = shared_memory.SharedMemory(name=control_name, create=True, size=CONTROL.size)
+        CONTROL.pack_into(self.control.buf, 0, 0, b"")
+        self.version = 0
+        self._data = None
+
+    @property
+    def name(self):
+        """Name workers pass to SharedDatasetClient."""
+        return self.control.name
+
+    def publish(self, movies, ratings, user_ratings):
+        """Write a new data segment, then atomically point the control block at it."""
+        titles, genres, arrays = build_arrays(movies, ratings, user_ratings)
+        arrays["titles"] = _pack_strings(titles)
+        arrays["genres"] = _pack_strings(genres)
+
+        toc = {}
+        offset = 0
+        for key, arr in arrays.items():
+            offset = (offset + 63) & ~63  # cache-line aligned
+            toc[key] = {"dtype": arr.dtype.str, "shape": arr.shape, "offset": offset}
+            offset += arr.nbytes
+        toc["_counts"] = {"titles": len(titles), "genres": len(genres)}
+        toc_bytes = json.dumps(toc).encode("utf-8")
+        base = (DATA_HEADER.size + len(toc_bytes) + 63) & ~63
+
+        data = shared_memory.SharedMemory(create=True, size=max(1, base + offset))
+        DATA_HEADER.pack_into(data.buf, 0, DATA_MAGIC, len(toc_bytes))
+        data.buf[DATA_HEADER.size:DATA_HEADER.size + len(toc_bytes)] = toc_bytes
+        for key, arr in arrays.items():
+            start = base + toc[key]["offset"]
+            data.buf[start:start + arr.nbytes] = arr.tobytes()
+
+        # Seqlock: odd while the name is being rewritten
+        seq = CONTROL.unpack_from(self.control.buf, 0)[0]
+        struct.pack_into("<Q", self.control.buf, 0, seq + 1)
+        self.control.buf[8:8 + 64] = data.name.encode("ascii").ljust(64, b"\0")
+        struct.pack_into("<Q", self.control.buf, 0, seq + 2)
+        self.version = (seq + 2) // 2
+
+        # Attached workers keep their mapping; new attaches see the new name
+        if self._data is not None:
+            self._data.close()
+            self._data.unlink()
+        self._data = data
+        return self.version
+
+    def close(self):
+        """Unpublish everything (workers keep any mapping they still hold)."""
+        if self._data is not None:
+            self._data.close()
+            self._data.unlink()
+            self._data = None
+        self.control.close()
+        self.control.unlink()
+
+
+# ------------------------------
+# Worker side
+# ------------------------------
+def read_control(control_buf):
+    """Return (version, data segment name), retrying around concurrent updates."""
+    while True:
+        seq, raw = CONTROL.unpack_from(control_buf, 0)
+        if seq % 2:
+            continue
+        if CONTROL.unpack_from(control_buf, 0)[0] == seq:
+            return seq // 2, raw.rstrip(b"\0").decode("ascii")
+
+
+class SharedDatasetView:
+    """Read-only NumPy views over one published data segment."""
+
+    def __init__(self, segment_name, version):
+        self.version = version
+        self._shm = _attach(segment_name)
+        magic, toc_len = DATA_HEADER.unpack_from(self._shm.buf, 0)
+        if magic != DATA_MAGIC:
+            self._shm.close()
+            raise ValueError(f"Segment '{segment_name}' is not a shared dataset.")
+        toc = json.loads(bytes(self._shm.buf[DATA_HEADER.size:DATA_HEADER.size + toc_len]))
+        base = (DATA_HEADER.size + toc_len + 63) & ~63
+        counts = toc.pop("_counts")
+
+        self.arrays = {}
+        for key, meta in toc.items():
+            dtype = np.dtype(meta["dtype"])
+            count = int(np.prod(meta["shape"]))
+            arr = np.frombuffer(self._shm.buf, dtype=dtype, count=count, offset=base + meta["offset"])
+            arr.flags.writeable = False
+            self.arrays[key] = arr.reshape(meta["shape"])
+
+        self.titles = bytes(self.arrays.pop("titles")).decode("utf-8").split("\0") if counts["titles"] else []
+        self.genres = bytes(self.arrays.pop("genres")).decode("utf-8").split("\0") if counts["genres"] else []
+        self._title_index = {t: i for i, t in enumerate(self.titles)}
+
+    def close(self):
+        """Detach from the segment; False if a caller still holds one of its arrays.
+
+        The mapping cannot be released while an exported array is alive, so the
+        caller keeps the view and retries once those arrays are gone.
+        """
+        self.arrays = {}
+        try:
+            self._shm.close()
+        except BufferError:
+            return False
+        return True
+
+    def movie_average(self, movie_name):
+        """Average rating for a title (0.0 if unrated), like average_rating_for_movie."""
+        i = self._title_index.get(movie_name)
+        return 0.0 if i is None else float(self.arrays["movie_avg"][i])
+
+    def top_n_movies(self, n):
+        """[(movie, avg), ...] for the n highest-average rated movies."""
+        avg = self.arrays["movie_avg"]
+        rated = np.flatnonzero(self.arrays["movie_count"] > 0)
+        order = rated[np.argsort(-avg[rated], kind="stable")][:n]
+        return [(self.titles[i], float(avg[i])) for i in order]
+
+    def user_ratings(self, user_id):
+        """{movie: rating} for one user ({} if unknown)."""
+        ids = self.arrays["user_ids"]
+        row = int(np.searchsorted(ids, user_id))
+        if row >= len(ids) or ids[row] != user_id:
+            return {}
+        lo, hi = self.arrays["user_indptr"][row:row + 2]
+        items = self.arrays["user_items"][lo:hi].tolist()
+        values = self.arrays["user_ratings"][lo:hi].tolist()
+        return {self.titles[i]: r for i, r in zip(items, values)}
+
+
+class SharedDatasetClient:
+    """Worker handle that follows the publisher's current version."""
+
+    def __init__(self, control_name):
+        self._control = _attach(control_name)
+        self._view = None
+        self._retired = []  # superseded views whose arrays are still in use
+
+    def dataset(self):
+        """Current view; re-attaches if a newer version was published."""
+        if self._retired:
+            self._retired = [old for old in self._retired if not old.close()]
+        for _ in range(100):
+            version, name = read_control(self._control.buf)
+            if version == 0:
+                raise RuntimeError("No dataset has been published yet.")
+            if self._view is not None and self._view.version == version:
+                return self._view
+            try:
+                view = SharedDatasetView(name, version)
+            except FileNotFoundError:
+                continue  # superseded between reading the name and attaching
+            if self._view is not None and not self._view.close():
+                self._retired.append(self._view)
+            self._view = view
+            return view
+        raise RuntimeError("Could not attach to the published dataset.")
+
+    def close(self):
+        if self._view is not None:
+            self._retired.append(self._view)
+            self._view = None
+        self._retired = [old for old in self._retired if not old.close()]
+        self._control.close()
+
+
+# ------------------------------
+# CLI
+# ------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a dataset to worker processes via shared memory.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("publish", help="load files and publish them; Enter reloads, q quits")
+    p.add_argument("movies")
+    p.add_argument("ratings")
+
+    p = sub.add_parser("query", help="attach to a published dataset and run a query")
+    p.add_argument("control")
+    p.add_argument("query", choices=["topn", "avg", "user"])
+    p.add_argument("arg")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "publish":
+        publisher = SharedDatasetPublisher()
+        try:
+            while True:
+                movies = mr.load_movies_file(args.movies)
+                ratings, user_ratings = mr.load_ratings_file(args.ratings, movies)
+                start = time.perf_counter()
+                version = publisher.publish(movies, ratings, user_ratings)
+                print(f"📡 Published version {version} as '{publisher.name}' "
+                      f"in {time.perf_counter() - start:.2f}s (pid {os.getpid()})")
+                if input("Press Enter to reload, or q to quit: ").strip().lower() == "q":
+                    break
+        finally:
+            publisher.close()
+
+    elif args.command == "query":
+        client = SharedDatasetClient(args.control)
+        try:
+            view = client.dataset()
+            if args.query == "topn":
+                for i, (movie, avg) in enumerate(view.top_n_movies(int(args.arg)), 1):
+                    print(f"{i}. {movie} — {avg:.2f}")
+            elif args.query == "avg":
+                print(f"{args.arg.title()} — {view.movie_average(args.arg.title()):.2f}")
+            else:
+                for movie, rating in view.user_ratings(int(args.arg)).items():
+                    print(f"{movie} — {rating:.2f}")
+        finally:
+            client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import als_recommender as als
+import movie_recommender as mr
+from test_movie_recommender import create_test_files, silent_call, print_result
+
+
+def run_tests():
+    print("🎬 Running automated tests for als_recommender.py...\n")
+    files = create_test_files()
+    _, user_ratings = silent_call(mr.load_ratings_file, files["ratings_normal"])
+
+    # --- Test 1: fit builds one factor row per user and movie ---
+    model = als.ALSModel(factors=4, regularization=0.05, iterations=15).fit(user_ratings)
+    print_result("fit - user factors shape", model.user_factors.shape, (3, 4))
+    print_result("fit - movie factors shape", model.item_factors.shape, (3, 4))
+
+    # --- Test 2: training reproduces known ratings reasonably well ---
+    pred = model.predict(1, "The Matrix")
+    print_result("predict (known rating close)", abs(pred - 5) < 1.0, True)
+    print_result("predict (unknown user)", model.predict(999, "The Matrix"), None)
+
+    # --- Test 3: recommendations exclude rated movies ---
+    recs = [m for m, _ in model.recommend(1, 3)]
+    print_result("recommend excludes rated", recs, ["Inception"])
+    print_result("recommend (unknown user)", model.recommend(999), [])
+
+    # --- Test 4: batch top-k matches single-user top-k ---
+    all_recs = model.recommend_all(3)
+    single = {u: [m for m, _ in model.recommend(u, 3)] for u in model.user_ids}
+    print_result("recommend_all matches recommend",
+                 {u: [m for m, _ in r] for u, r in all_recs.items()}, single)
+
+    # --- Test 5: .npz round trip ---
+    path = os.path.join(tempfile.mkdtemp(prefix="als_test_"), "model.npz")
+    model.save(path)
+    loaded = als.ALSModel.load(path)
+    print_result("save/load round trip", loaded.recommend(2, 3), model.recommend(2, 3))
+
+    # --- Test 6: empty input ---
+    try:
+        als.ALSModel().fit({})
+        print_result("fit (empty ratings)", "no error", "ValueError")
+    except ValueError:
+        print_result("fit (empty ratings)", "ValueError", "ValueError")
+
+    print("\n🎉 ALL TESTS FINISHED 🎉")
+
+
+if __name__ == "__main__":
+    run_tests()
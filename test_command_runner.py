@@ -0,0 +1,66 @@
+import io
+import json
+import command_runner as cr
+from test_movie_recommender import create_test_files, print_result
+
+
+def run_tests():
+    print("🎬 Running automated tests for command_runner.py...\n")
+    files = create_test_files()
+    commands = [
+        "# comment lines and blanks are skipped",
+        "",
+        "topn 2",
+        f'load "{files["movies_normal"]}" "{files["ratings_normal"]}"',
+        "topn 2",
+        "genre-topn sci-fi 5",
+        "topgenres 1",
+        "favgenre 1",
+        "recommend 1",
+        "recommend",
+        "nosuch 1",
+    ]
+    out = io.StringIO()
+    succeeded, failed = cr.run_commands(commands, out)
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+
+    # --- Test 1: one JSON record per command, in order ---
+    print_result("record count", len(records), 9)
+    print_result("counts", (succeeded, failed), (6, 3))
+    print_result("line numbers", [r["line"] for r in records], [3, 4, 5, 6, 7, 8, 9, 10, 11])
+    print_result("timings present", all(r["ms"] >= 0 for r in records), True)
+
+    # --- Test 2: results ---
+    by_line = {r["line"]: r for r in records}
+    print_result("query before load fails", by_line[3]["ok"], False)
+    print_result("load result", by_line[4]["result"], {"movies": 3, "rated_movies": 3, "users": 3})
+    print_result("topn", by_line[5]["result"][0], {"movie": "The Matrix", "score": 5})
+    print_result("genre-topn", by_line[6]["result"], [{"movie": "Inception", "score": 4.5}])
+    print_result("topgenres", by_line[7]["result"], [{"genre": "action", "score": 5}])
+    print_result("favgenre", by_line[8]["result"], {"user": 1, "genre": "action"})
+    print_result("recommend", by_line[9]["result"], {"user": 1, "genre": "action", "movies": []})
+
+    # --- Test 3: errors are reported, not raised ---
+    print_result("missing argument", by_line[10]["error"], "wrong number of arguments for 'recommend'")
+    print_result("unknown command", by_line[11]["error"], "unknown command 'nosuch'")
+
+    # --- Test 4: an unexpected exception fails only its own command ---
+    class FlakyRunner(cr.CommandRunner):
+        def execute(self, command, args):
+            if command == "boom":
+                raise ZeroDivisionError("division by zero")
+            return super().execute(command, args)
+
+    out = io.StringIO()
+    counts = cr.run_commands(["boom", f'load "{files["movies_normal"]}" "{files["ratings_normal"]}"'], out, FlakyRunner())
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    print_result("unexpected error (counts)", counts, (1, 1))
+    print_result("unexpected error (record)", (records[0]["ok"], records[0]["error"]),
+                 (False, "ZeroDivisionError: division by zero"))
+    print_result("unexpected error (next command runs)", records[1]["ok"], True)
+
+    print("\n🎉 ALL TESTS FINISHED 🎉")
+
+
+if __name__ == "__main__":
+    run_tests()
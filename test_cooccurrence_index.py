@@ -0,0 +1,64 @@
+import cooccurrence_index as ci
+import movie_recommender as mr
+from test_movie_recommender import create_test_files, silent_call, capture_output, print_result
+
+
+def run_tests():
+    print("🎬 Running automated tests for cooccurrence_index.py...\n")
+    files = create_test_files()
+    _, user_ratings = silent_call(mr.load_ratings_file, files["ratings_normal"])
+
+    # --- Test 1: counts come from users who rated both titles ---
+    user_ratings[4] = {"Titanic": 4.0, "Inception": 3.0, "The Matrix": 2.0}
+    index = ci.CooccurrenceIndex.from_user_ratings(user_ratings, top_k=2)
+    print_result("also_rated (Titanic)", index.also_rated("Titanic"), [("Inception", 2), ("The Matrix", 2)])
+    print_result("also_rated (limit n)", index.also_rated("The Matrix", 1), [("Titanic", 2)])
+    print_result("also_rated (unknown title)", index.also_rated("Nope"), [])
+
+    # --- Test 2: incremental updates re-rank only touched titles ---
+    index.add_rating(3, "Titanic")
+    print_result("add_rating (count bumped)", index.also_rated("Inception"), [("Titanic", 3), ("The Matrix", 1)])
+    index.add_rating(3, "Titanic")
+    print_result("add_rating (duplicate ignored)", index.also_rated("Inception")[0], ("Titanic", 3))
+
+    # --- Test 3: appended ratings file ---
+    applied = silent_call(index.append_ratings_file, files["ratings_negative"])
+    print_result("append_ratings_file (valid lines applied)", applied, 1)
+
+    # --- Test 4: heavy users are not paired ---
+    small = ci.CooccurrenceIndex(max_user_titles=2)
+    small.add_user(1, ["A", "B"])
+    small.add_user(2, ["A", "B", "C"])
+    print_result("heavy user skipped", (small.also_rated("A"), small.heavy_users), ([("B", 1)], {2}))
+
+    # --- Test 5: capacity pruning keeps the strongest partners ---
+    capped = ci.CooccurrenceIndex(top_k=1, capacity=2)
+    capped.add_user(1, ["A", "B"])
+    capped.add_user(2, ["A", "B"])
+    capped.add_user(3, ["A", "C", "D"])
+    print_result("capacity pruning", (capped.also_rated("A"), len(capped.counts["A"]) <= 2), ([("B", 2)], True))
+
+    # --- Test 6: pruning never keeps fewer than top_k partners ---
+    tight = ci.CooccurrenceIndex(top_k=2, capacity=2)
+    exact = ci.CooccurrenceIndex(top_k=2)
+    for user_id, titles in enumerate([["A", "B", "C"], ["A", "B", "C"], ["A", "B"], ["A", "D", "E"], ["A", "F"]]):
+        tight.add_user(user_id, titles)
+        exact.add_user(user_id, titles)
+    print_result("pruned path (top-k kept)", tight.also_rated("A"), exact.also_rated("A"))
+    print_result("pruned path (bounded)", len(tight.counts["A"]) <= 2, True)
+    try:
+        ci.CooccurrenceIndex(top_k=3, capacity=1)
+        rejected = False
+    except ValueError:
+        rejected = True
+    print_result("capacity below top_k rejected", rejected, True)
+
+    # --- Test 7: display helper normalizes the title ---
+    output = capture_output(ci.show_also_rated, index, "titanic", 1)
+    print_result("show_also_rated (print check)", "Viewers of 'Titanic' also rated" in output, True)
+
+    print("\n🎉 ALL TESTS FINISHED 🎉")
+
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import dataset_registry as dr
+import movie_recommender as mr
+from test_movie_recommender import create_test_files, silent_call, capture_output, print_result
+
+
+def run_tests():
+    print("🎬 Running automated tests for dataset_registry.py...\n")
+    files = create_test_files()
+    movies = silent_call(mr.load_movies_file, files["movies_normal"])
+    ratings, user_ratings = silent_call(mr.load_ratings_file, files["ratings_normal"])
+    size = dr.estimate_bytes(movies, ratings, user_ratings)
+
+    # --- Test 1: footprint estimate is positive and counts shared objects once ---
+    print_result("estimate_bytes (positive)", size > 0, True)
+    shared = ["x" * 1000]
+    print_result("estimate_bytes (shared counted once)",
+                 dr.estimate_bytes(shared, shared) == dr.estimate_bytes(shared), True)
+
+    # --- Test 2: budget for two datasets evicts the least recently used ---
+    registry = dr.DatasetRegistry(memory_budget=int(size * 2.5))
+    registry.add("a", movies, ratings, user_ratings)
+    silent_call(registry.load, "b", files["movies_normal"], files["ratings_normal"])
+    registry.get("a")
+    silent_call(registry.load, "c", files["movies_normal"], files["ratings_normal"])
+    print_result("LRU eviction (loaded)", registry.loaded_names(), ["a", "c"])
+    print_result("LRU eviction (snapshot written)",
+                 os.path.exists(registry._datasets["b"].snapshot_path), True)
+    print_result("LRU eviction (count)", registry.evictions, 1)
+
+    # --- Test 3: evicted dataset reloads from its snapshot ---
+    b = registry.get("b")
+    print_result("reload (data restored)", (b.movies, b.ratings, b.user_ratings), (movies, ratings, user_ratings))
+    print_result("reload (count)", registry.reloads, 1)
+    print_result("reload (budget respected)", registry.memory_usage() <= registry.memory_budget, True)
+
+    # --- Test 4: queries are routed to the named dataset ---
+    print_result("query favgenre", registry.query("b", "favgenre", 3), "sci-fi")
+    output = capture_output(registry.query, "a", "topn", 1)
+    print_result("query topn (print check)", "Top 1 Movies" in output, True)
+
+    # --- Test 5: a single dataset larger than the budget stays loaded ---
+    tiny = dr.DatasetRegistry(memory_budget=1)
+    tiny.add("only", movies, ratings, user_ratings)
+    print_result("over-budget single dataset", tiny.loaded_names(), ["only"])
+
+    # --- Test 6: remove deletes the snapshot ---
+    path = registry._datasets["b"].snapshot_path
+    registry.remove("b")
+    print_result("remove", ("b" in registry, os.path.exists(path)), (False, False))
+
+    # --- Test 7: close removes the temporary snapshot directory ---
+    registry.close()
+    tiny.close()
+    print_result("close (temporary directory removed)",
+                 (os.path.exists(registry.snapshot_dir), os.path.exists(tiny.snapshot_dir)), (False, False))
+    own = dr.DatasetRegistry(snapshot_dir=tempfile.mkdtemp(prefix="registry_test_"))
+    own.close()
+    print_result("close (given directory kept)", os.path.isdir(own.snapshot_dir), True)
+    os.rmdir(own.snapshot_dir)
+
+    print("\n🎉 ALL TESTS FINISHED 🎉")
+
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,66 @@
+import os
+import shutil
+import time
+import dataset_watcher as dw
+from test_movie_recommender import create_test_files, silent_call, print_result
+
+
+def bump(path, line):
+    """Append a line and move the mtime forward so the change is always visible."""
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def run_tests():
+    print("🎬 Running automated tests for dataset_watcher.py...\n")
+    files = create_test_files()
+    movies_path = files["movies_normal"]
+    ratings_path = os.path.join(os.path.dirname(movies_path), "ratings_watched.txt")
+    shutil.copy(files["ratings_normal"], ratings_path)
+
+    # --- Test 1: initial load builds the snapshot and derived indexes ---
+    watcher = dw.DatasetWatcher(movies_path, ratings_path, interval=0.05)
+    snap = silent_call(watcher.reload)
+    print_result("reload (version)", snap.version, 1)
+    print_result("snapshot rating statistics", snap.stats.get("Titanic")["mean"], 2.75)
+    print_result("snapshot co-occurrence index", snap.also_index.also_rated("Titanic", 1)[0][0], "Inception")
+    print_result("snapshot title index", snap.titles.prefix("titan"), ["Titanic"])
+    print_result("check (unchanged)", silent_call(watcher.check), False)
+
+    # --- Test 2: a change is applied only after it has settled for one check ---
+    bump(ratings_path, "Titanic|5|4\n")
+    print_result("check (change seen, settling)", silent_call(watcher.check), False)
+    print_result("metrics (pending staleness)", watcher.metrics()["staleness_seconds"] >= 0, True)
+    print_result("check (settled, reloaded)", silent_call(watcher.check), True)
+    print_result("atomic swap (new snapshot)",
+                 (watcher.current.version, watcher.current.stats.get("Titanic")["mean"]), (2, 3.5))
+    print_result("old snapshot untouched", snap.stats.get("Titanic")["mean"], 2.75)
+
+    # --- Test 3: an unloadable file keeps the old snapshot ---
+    with open(ratings_path, "w", encoding="utf-8") as f:
+        f.write("garbage\n")
+    silent_call(watcher.check)
+    silent_call(watcher.check)
+    print_result("failed reload keeps snapshot", watcher.current.version, 2)
+    print_result("failed reload counted", watcher.metrics()["failures"], 1)
+
+    # --- Test 4: background thread picks up changes ---
+    shutil.copy(files["ratings_normal"], ratings_path)
+    bump(ratings_path, "")
+    watcher.start()
+    deadline = time.time() + 5
+    while watcher.current.version < 3 and time.time() < deadline:
+        time.sleep(0.02)
+    watcher.stop()
+    print_result("background reload", watcher.current.version, 3)
+    metrics = watcher.metrics()
+    print_result("metrics (reloads)", metrics["reloads"], 3)
+    print_result("metrics (up to date)", metrics["staleness_seconds"], 0.0)
+
+    print("\n🎉 ALL TESTS FINISHED 🎉")
+
+
+if __name__ == "__main__":
+    run_tests()
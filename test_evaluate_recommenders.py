@@ -0,0 +1,49 @@
+import evaluate_recommenders as ev
+import movie_recommender as mr
+from test_movie_recommender import create_test_files, silent_call, print_result
+
+
+def run_tests():
+    print("🎬 Running automated tests for evaluate_recommenders.py...\n")
+    files = create_test_files()
+    movies = silent_call(mr.load_movies_file, files["movies_normal"])
+    _, user_ratings = silent_call(mr.load_ratings_file, files["ratings_normal"])
+
+    # --- Test 1: holdout_split keeps every rating exactly once ---
+    train, test = ev.holdout_split(user_ratings, test_fraction=0.5, seed=1)
+    merged = {u: {**train.get(u, {}), **test.get(u, {})} for u in user_ratings}
+    print_result("holdout_split (no ratings lost)", merged, user_ratings)
+    print_result("holdout_split (users held out)", sorted(test), [1, 2])
+    print_result("holdout_split (train never empty)", all(train[u] for u in test), True)
+
+    # --- Test 2: split is deterministic for a seed ---
+    print_result("holdout_split (deterministic)", ev.holdout_split(user_ratings, 0.5, 1), (train, test))
+
+    # --- Test 3: a strategy that returns the held-out movie scores perfectly ---
+    class Oracle:
+        def recommend(self, user_id, n):
+            return list(test[user_id])[:n]
+
+    report = ev.evaluate_strategy(Oracle(), train, test, k=1, workers=1)
+    print_result("evaluate_strategy (oracle precision)", report["precision"], 1.0)
+    print_result("evaluate_strategy (oracle recall)", report["recall"], 1.0)
+
+    # --- Test 4: parallel and serial runs agree ---
+    serial = ev.run_evaluation(movies, user_ratings, ["genre", "popular"], k=2, workers=1)
+    parallel = ev.run_evaluation(movies, user_ratings, ["genre", "popular"], k=2, workers=2)
+    keys = ("users", "precision", "recall", "coverage")
+    print_result("run_evaluation (parallel matches serial)",
+                 {s: [parallel[s][key] for key in keys] for s in parallel},
+                 {s: [serial[s][key] for key in keys] for s in serial})
+
+    # --- Test 5: percentile helper ---
+    print_result("percentile (p50)", ev.percentile([1, 2, 3, 4], 50), 2)
+    print_result("percentile (p50, odd length)", ev.percentile([1, 2, 3, 4, 5], 50), 3)
+    print_result("percentile (p90, odd length)", ev.percentile([1, 2, 3, 4, 5], 90), 5)
+    print_result("percentile (empty)", ev.percentile([], 90), 0.0)
+
+    print("\n🎉 ALL TESTS FINISHED 🎉")
+
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,102 @@
+import bz2
+import gzip
+import lzma
+import os
+import subprocess
+import sys
+import tempfile
+import input_formats as fi
+import movie_recommender as mr
+from test_movie_recommender import create_test_files, silent_call, capture_output, print_result
+
+
+MOVIES_CSV = (
+    "movieId,title,genres\n"
+    "1,Toy Story (1995),Adventure|Animation|Children\n"
+    '2,"American President, The (1995)",Comedy|Drama|Romance\n'
+    "3,Heat (1995),Action|Crime|Thriller\n"
+    "4,Unlisted (2000),(no genres listed)\n"
+)
+
+RATINGS_CSV = (
+    "userId,movieId,rating,timestamp\n"
+    "1,1,4.0,964982703\n"
+    "1,3,4.5,964981247\n"
+    "2,1,3.5,1445714835\n"
+    "2,2,5.0,1445714836\n"
+    "3,3,0.5,1306463578\n"
+)
+
+
+def write(path, text, opener=open):
+    with opener(path, "wt", encoding="utf-8") as f:
+        f.write(text)
+    return path
+
+
+def run_tests():
+    print("🎬 Running automated tests for input_formats.py...\n")
+    tmp = tempfile.mkdtemp(prefix="input_formats_test_")
+    files = create_test_files()
+
+    # --- Test 1: MovieLens movies.csv with quoted titles and genre lists ---
+    movies = silent_call(mr.load_movies_file, write(os.path.join(tmp, "movies.csv"), MOVIES_CSV))
+    print_result("movies.csv count", len(movies), 4)
+    print_result("quoted title", movies.get("American President, The (1995)"),
+                 {"id": 2, "genre": "comedy", "genres": ["comedy", "drama", "romance"]})
+    print_result("no genres listed", movies["Unlisted (2000)"]["genre"], "(no genres listed)")
+
+    # --- Test 2: ratings.csv maps movie IDs to titles ---
+    path = write(os.path.join(tmp, "ratings.csv"), RATINGS_CSV)
+    ratings, user_ratings = silent_call(mr.load_ratings_file, path, movies)
+    print_result("ratings.csv per movie", ratings["Toy Story (1995)"], [4.0, 3.5])
+    print_result("ratings.csv per user", user_ratings[1], {"Toy Story (1995)": 4.0, "Heat (1995)": 4.5})
+
+    # --- Test 3: compressed inputs are detected from their content ---
+    same = True
+    for suffix, opener in ((".gz", gzip.open), (".bz2", bz2.open), (".xz", lzma.open)):
+        packed = write(os.path.join(tmp, "ratings_data" + suffix), RATINGS_CSV, opener)
+        same = same and silent_call(mr.load_ratings_file, packed, movies) == (ratings, user_ratings)
+    print_result("gzip/bz2/xz ratings.csv", same, True)
+    with open(files["ratings_normal"], encoding="utf-8") as f:
+        piped = write(os.path.join(tmp, "ratings_pipe.gz"), f.read(), gzip.open)
+    print_result("gzip pipe format", silent_call(mr.load_ratings_file, piped),
+                 silent_call(mr.load_ratings_file, files["ratings_normal"]))
+
+    # --- Test 4: block fast path matches row-at-a-time parsing ---
+    rows = ["userId,movieId,rating,timestamp"]
+    for user in range(1, 400):
+        rows += [f"{user},{1 + (user * k) % 3},{(user + k) % 10 / 2 + 0.5},0" for k in range(5)]
+    big = write(os.path.join(tmp, "big.csv"), "\n".join(rows) + "\n")
+    fast = silent_call(mr.load_ratings_file, big, movies)
+    slow = ({}, {})
+    silent_call(fi._ratings_rows_slow, rows, 1, {str(d["id"]): t for t, d in movies.items()}, {}, *slow)
+    print_result("fast path matches csv reader", fast, slow)
+
+    # --- Test 5: bad rows are reported and skipped ---
+    bad = write(os.path.join(tmp, "bad.csv"), RATINGS_CSV + "4,1,6.0,0\n5,99,3.0,0\nx,1,3.0,0\n")
+    output = capture_output(mr.load_ratings_file, bad, movies)
+    print_result("bad rows reported",
+                 ["invalid rating" in output, "unknown movie ID" in output, "invalid numeric value" in output],
+                 [True, True, True])
+    print_result("bad rows skipped", silent_call(mr.load_ratings_file, bad, movies), (ratings, user_ratings))
+
+    # --- Test 6: a short row followed by a long one is not misaligned ---
+    ragged = write(os.path.join(tmp, "ragged.csv"), "userId,movieId,rating,timestamp\n1,2\n3,1,4,0\n")
+    output = capture_output(mr.load_ratings_file, ragged, movies)
+    print_result("ragged row reported", "wrong number of fields" in output, True)
+    print_result("ragged row skipped", silent_call(mr.load_ratings_file, ragged, movies),
+                 ({"Toy Story (1995)": [4.0]}, {3: {"Toy Story (1995)": 4.0}}))
+
+    # --- Test 7: "-" reads standard input ---
+    script = "import movie_recommender as mr; print(sorted(mr.load_movies_file('-')))"
+    with open(os.path.join(tmp, "movies.csv"), "rb") as stdin:
+        result = subprocess.run([sys.executable, "-c", script], stdin=stdin, capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    print_result("stdin", result.stdout.strip().splitlines()[-1], str(sorted(movies)))
+
+    print("\n🎉 ALL TESTS FINISHED 🎉")
+
+
+if __name__ == "__main__":
+    run_tests()
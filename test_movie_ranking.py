@@ -0,0 +1,56 @@
+from statistics import mean
+import movie_ranking as rk
+import movie_recommender as mr
+from test_movie_recommender import capture_output, print_result
+
+
+def run_tests():
+    print("🎬 Running automated tests for movie_ranking.py...\n")
+    movies = {
+        "Lucky Shot": {"id": 1, "genre": "drama"},
+        "Classic": {"id": 2, "genre": "drama"},
+        "Okay Film": {"id": 3, "genre": "comedy"},
+        "Flop": {"id": 4, "genre": "comedy"},
+    }
+    ratings = {
+        "Lucky Shot": [5.0],
+        "Classic": [4.8, 5.0, 4.6] * 20,
+        "Okay Film": [3.0, 4.0] * 5,
+        "Flop": [1.0, 2.0],
+    }
+    table = rk.RankingTable(movies, ratings)
+
+    # --- Test 1: mean ranking matches the plain report ---
+    print_result("mean ranking", [m for m, _, _ in table.top_movies(4)],
+                 ["Lucky Shot", "Classic", "Okay Film", "Flop"])
+    print_result("mean score", round(table.top_movies(2)[1][1], 6), round(mean(ratings["Classic"]), 6))
+
+    # --- Test 2: support-aware scores demote the single 5.0 ---
+    print_result("bayesian ranking", table.top_movies(1, "bayesian")[0][0], "Classic")
+    print_result("wilson ranking", table.top_movies(1, "wilson")[0][0], "Classic")
+    wilson = dict((m, s) for m, s, _ in table.top_movies(4, "wilson"))
+    print_result("wilson below mean", all(wilson[m] < mean(r) for m, r in ratings.items()), True)
+
+    # --- Test 3: minimum support filter ---
+    supported = rk.RankingTable(movies, ratings, min_support=3)
+    print_result("min_support drops movies", [m for m, _, _ in supported.top_movies(10)], ["Classic", "Okay Film"])
+    print_result("genres (min_support)", [g for g, _ in supported.top_genres(10)], ["drama", "comedy"])
+    print_result("genres (mean)", [(g, round(s, 2)) for g, s in table.top_genres(2)],
+                 [("drama", round((5.0 + mean(ratings["Classic"])) / 2, 2)), ("comedy", 2.5)])
+
+    # --- Test 4: tables are cached per loaded dataset ---
+    first = rk.ranking_table(movies, ratings, 2)
+    print_result("ranking_table cached", rk.ranking_table(movies, ratings, 2) is first, True)
+    print_result("ranking_table rebuilt for new min_support", rk.ranking_table(movies, ratings, 3) is first, False)
+
+    # --- Test 5: report functions take rank_by ---
+    output = capture_output(mr.top_n_movies, movies, ratings, 1, "bayesian")
+    print_result("top_n_movies (bayesian)", "Bayesian Average" in output and "1. Classic" in output, True)
+    output = capture_output(mr.top_n_genres, movies, ratings, 1, "wilson", 3)
+    print_result("top_n_genres (wilson)", "1. Drama" in output, True)
+
+    print("\n🎉 ALL TESTS FINISHED 🎉")
+
+
+if __name__ == "__main__":
+    run_tests()
@@ -189,6 +189,12 @@ def run_tests():
     output = capture_output(mr.load_movies_file, "nonexistent_file.txt")
     print_result("FileNotFoundError handling", "not found" in output.lower(), True)
 
+    # --- Test 19: genre_recommendations returns the ranked list ---
+    genre, recs = silent_call(mr.genre_recommendations, movies, ratings, user_ratings, 3)
+    print_result("genre_recommendations (user 3)", (genre, recs), ("sci-fi", []))
+    genre, recs = silent_call(mr.genre_recommendations, movies, ratings, user_ratings, 999)
+    print_result("genre_recommendations (unknown user)", (genre, recs), (None, []))
+
     print("\n🎉 ALL TESTS FINISHED 🎉")
 
 if __name__ == "__main__":
@@ -0,0 +1,53 @@
+import random
+from statistics import mean, median, pstdev
+import movie_stats as ms
+import movie_recommender as mr
+from test_movie_recommender import create_test_files, silent_call, capture_output, print_result
+
+
+def run_tests():
+    print("🎬 Running automated tests for movie_stats.py...\n")
+    files = create_test_files()
+    ratings, _ = silent_call(mr.load_ratings_file, files["ratings_normal"])
+    stats = ms.rating_statistics(ratings)
+
+    # --- Test 1: one title's statistics ---
+    titanic = stats.get("Titanic")
+    print_result("count/mean/median (Titanic)",
+                 (titanic["count"], titanic["mean"], titanic["median"]), (2, 2.75, 2.75))
+    print_result("std (Titanic)", round(titanic["std"], 6), 0.75)
+    print_result("histogram (Titanic)",
+                 {k: v for k, v in titanic["histogram"].items() if v}, {2.0: 1, 3.5: 1})
+    print_result("unknown title", stats.get("Nope"), None)
+
+    # --- Test 2: matches the statistics module on random data ---
+    rng = random.Random(7)
+    data = {f"Movie {i}": [rng.choice([0.5 * k for k in range(11)]) for _ in range(rng.randint(1, 30))]
+            for i in range(200)}
+    stats = ms.rating_statistics(data)
+    ok = all(
+        stats.get(m)["count"] == len(r)
+        and abs(stats.get(m)["mean"] - mean(r)) < 1e-9
+        and stats.get(m)["median"] == median(r)
+        and abs(stats.get(m)["std"] - pstdev(r)) < 1e-9
+        and sum(stats.get(m)["histogram"].values()) == len(r)
+        for m, r in data.items()
+    )
+    print_result("agrees with statistics module", ok, True)
+
+    # --- Test 3: unsorted (movie_id, rating) columns ---
+    col = ms.statistics_from_columns([1, 0, 1, 1], [4.0, 5.0, 1.0, 2.0], ["A", "B", "C"])
+    print_result("columns (unrated title dropped)", (col.titles, col.get("B")["median"]), (["A", "B"], 2.0))
+    print_result("empty ratings", len(ms.rating_statistics({})), 0)
+
+    # --- Test 4: display helper ---
+    output = capture_output(ms.show_rating_statistics, stats, "movie 3")
+    print_result("show_rating_statistics (single title)", "Rating statistics for 'Movie 3'" in output, True)
+    output = capture_output(ms.show_rating_statistics, stats)
+    print_result("show_rating_statistics (table)", "200 movies" in output, True)
+
+    print("\n🎉 ALL TESTS FINISHED 🎉")
+
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import movie_recommender as mr
+import ratings_binary as rb
+from test_movie_recommender import create_test_files, silent_call, print_result
+
+
+def run_tests():
+    print("🎬 Running automated tests for ratings_binary.py...\n")
+    files = create_test_files()
+    out_dir = tempfile.mkdtemp(prefix="ratings_binary_test_")
+
+    # --- Test 1: conversion keeps every valid rating ---
+    path = os.path.join(out_dir, "ratings.bin")
+    n = silent_call(rb.convert_ratings_file, files["ratings_normal"], path)
+    print_result("convert_ratings_file (ratings written)", n, 5)
+
+    # --- Test 2: loader detects the binary file and matches the text loader ---
+    expected = silent_call(mr.load_ratings_file, files["ratings_normal"])
+    print_result("is_binary_ratings_file", mr.is_binary_ratings_file(path), True)
+    print_result("is_binary_ratings_file (text)", mr.is_binary_ratings_file(files["ratings_normal"]), False)
+    print_result("load_ratings_file (binary)", mr.load_ratings_file(path), expected)
+
+    # --- Test 3: zero-copy columns ---
+    with rb.open_ratings_binary(path) as cols:
+        print_result("columns (length)", len(cols), 5)
+        print_result("columns (titles)", cols.titles, ["The Matrix", "Titanic", "Inception"])
+        print_result("columns (movie ids)", cols.movie_ids.tolist(), [0, 1, 2, 2, 1])
+        print_result("columns (not copied)", cols.ratings.base is not None and not cols.ratings.flags.owndata, True)
+        print_result("movie_averages", cols.movie_averages(), {"The Matrix": 5.0, "Titanic": 2.75, "Inception": 4.5})
+
+    # --- Test 4: invalid lines are skipped like the text loader ---
+    bad_path = os.path.join(out_dir, "bad.bin")
+    n = silent_call(rb.convert_ratings_file, files["ratings_negative"], bad_path)
+    print_result("convert_ratings_file (bad lines skipped)", n, 1)
+
+    # --- Test 5: float16 and non-half-star values round trip ---
+    src = os.path.join(out_dir, "decimals.txt")
+    with open(src, "w", encoding="utf-8") as f:
+        f.write("Titanic|3.7|1\n")
+    half_path = os.path.join(out_dir, "decimals.bin")
+    rb.convert_ratings_file(src, half_path, half_precision=True)
+    ratings, _ = mr.load_ratings_file(half_path)
+    print_result("float16 round trip (3.7)", ratings, {"Titanic": [3.7]})
+
+    # --- Test 6: foreign files are rejected ---
+    try:
+        rb.RatingsColumns(files["ratings_normal"])
+        print_result("RatingsColumns (text file)", "no error", "ValueError")
+    except ValueError:
+        print_result("RatingsColumns (text file)", "ValueError", "ValueError")
+
+    # --- Test 7: empty and truncated files raise ValueError; the loader reports them ---
+    with open(half_path, "rb") as f:
+        whole = f.read()
+    cut_path = os.path.join(out_dir, "cut.bin")
+    results = []
+    loaded = []
+    for cut in (0, 10, rb.HEADER.size, len(whole) - 1):
+        with open(cut_path, "wb") as f:
+            f.write(whole[:cut])
+        try:
+            rb.RatingsColumns(cut_path).close()
+            results.append("no error")
+        except ValueError:
+            results.append("ValueError")
+        loaded.append(silent_call(rb.load_ratings_binary, cut_path))
+    print_result("RatingsColumns (empty/truncated)", results, ["ValueError"] * 4)
+    print_result("load_ratings_binary (empty/truncated)", loaded, [({}, {})] * 4)
+
+    print("\n🎉 ALL TESTS FINISHED 🎉")
+
+
+if __name__ == "__main__":
+    run_tests()
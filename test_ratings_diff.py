@@ -0,0 +1,111 @@
+import csv
+import os
+import tempfile
+import ratings_diff as rd
+from test_movie_recommender import silent_call, capture_output, print_result
+
+
+OLD = (
+    "Inception|4.0|1\n"
+    "Inception|5.0|2\n"
+    "The Matrix|3.0|1\n"
+    "Avatar|2.0|3\n"
+    "Inception|3.0|1\n"       # repeated rating: the later one counts
+)
+
+NEW = (
+    "The Matrix|3.0|1\n"
+    "Inception|5.0|2\n"
+    "Inception|4.0|1\n"
+    "Inception|4.0|3\n"
+    "Titanic|5.0|2\n"
+)
+
+
+def write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return path
+
+
+def read_csv(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        return list(csv.reader(f))
+
+
+def run_tests():
+    print("🎬 Running automated tests for ratings_diff.py...\n")
+    tmp = tempfile.mkdtemp(prefix="ratings_diff_test_")
+    old = write(os.path.join(tmp, "old.txt"), OLD)
+    new = write(os.path.join(tmp, "new.txt"), NEW)
+    movies_out = os.path.join(tmp, "movies.csv")
+    changes_out = os.path.join(tmp, "changes.csv")
+
+    # --- Test 1: summary counts and top movers ---
+    summary = silent_call(rd.diff_ratings, old, new, movies_out, changes_out)
+    print_result("counts", [summary[k] for k in ("movies_changed", "added", "removed", "changed")], [3, 2, 1, 1])
+    print_result("top movers", summary["top_movers"], [("Inception", 13.0 / 3 - 4.0)])
+    # Avatar lost its only rating and Titanic is new: no average to compare
+    print_result("no delta without both sides", [m for m, _ in summary["top_movers"]], ["Inception"])
+
+    # --- Test 2: per-movie deltas, in movie order ---
+    print_result("movie deltas", read_csv(movies_out), [
+        rd.MOVIE_FIELDS,
+        ["Avatar", "1", "0", "-1", "2.0000", "", ""],
+        ["Inception", "2", "3", "1", "4.0000", "4.3333", "0.3333"],
+        ["Titanic", "0", "1", "1", "", "5.0000", ""],
+    ])
+
+    # --- Test 3: per-user changes, in user order ---
+    print_result("user changes", read_csv(changes_out), [
+        rd.CHANGE_FIELDS,
+        ["1", "Inception", "3.0000", "4.0000"],
+        ["2", "Titanic", "", "5.0000"],
+        ["3", "Avatar", "2.0000", ""],
+        ["3", "Inception", "", "4.0000"],
+    ])
+
+    # --- Test 4: spilling to sorted runs gives the same result ---
+    movies_small = os.path.join(tmp, "movies_small.csv")
+    changes_small = os.path.join(tmp, "changes_small.csv")
+    small = silent_call(rd.diff_ratings, old, new, movies_small, changes_small, chunk_size=2, tmp_dir=tmp)
+    print_result("external sort summary", small, summary)
+    print_result("external sort outputs", (read_csv(movies_small), read_csv(changes_small)),
+                 (read_csv(movies_out), read_csv(changes_out)))
+    print_result("run files removed", sorted(f for f in os.listdir(tmp) if f.startswith("ratings_run_")), [])
+
+    # --- Test 5: identical snapshots have no changes ---
+    same = silent_call(rd.diff_ratings, old, old)
+    print_result("no changes", [same["movies_changed"], same["top_movers"]], [0, []])
+
+    # --- Test 6: the same snapshot as text and as a columnar file has no changes ---
+    import ratings_binary  # needs numpy
+    text = write(os.path.join(tmp, "fractional.txt"), "Inception|3.7|1\nAvatar|4.1|2\nAvatar|0.3|1\n")
+    binary = os.path.join(tmp, "fractional.bin")
+    silent_call(ratings_binary.convert_ratings_file, text, binary)
+    mixed = silent_call(rd.diff_ratings, text, binary)
+    print_result("text vs binary", [mixed["movies_changed"], mixed["changed"]], [0, 0])
+    print_result("binary records", list(rd.read_records(binary)), list(rd.read_records(text)))
+
+    # --- Test 7: --presorted checks the order ---
+    try:
+        silent_call(rd.diff_ratings, old, new, presorted=True)
+        print_result("unsorted input rejected", "no error", "ValueError")
+    except ValueError:
+        print_result("unsorted input rejected", "ValueError", "ValueError")
+    sorted_old = write(os.path.join(tmp, "old_sorted.txt"), "".join(
+        f"{m}|{r}|{u}\n" for m, u, r in sorted(rd.read_records(old), key=lambda x: x[:2])))
+    sorted_new = write(os.path.join(tmp, "new_sorted.txt"), "".join(
+        f"{m}|{r}|{u}\n" for m, u, r in sorted(rd.read_records(new), key=lambda x: x[:2])))
+    print_result("presorted input", silent_call(rd.diff_ratings, sorted_old, sorted_new, presorted=True), summary)
+
+    # --- Test 8: CLI summary ---
+    output = capture_output(rd.main, [old, new])
+    print_result("CLI summary", "3 movies changed: 2 ratings added, 1 removed, 1 changed" in output, True)
+    print_result("CLI missing file", "not found" in capture_output(rd.main, [old, os.path.join(tmp, "nope")]), True)
+
+    print("\n🎉 ALL TESTS FINISHED 🎉")
+
+
+if __name__ == "__main__":
+    run_tests()
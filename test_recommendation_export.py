@@ -0,0 +1,66 @@
+import os
+import tempfile
+import movie_recommender as mr
+import recommendation_export as rx
+from test_movie_recommender import create_test_files, silent_call, print_result
+
+
+def run_tests():
+    print("🎬 Running automated tests for recommendation_export.py...\n")
+    files = create_test_files()
+    movies = silent_call(mr.load_movies_file, files["movies_normal"])
+    ratings, user_ratings = silent_call(mr.load_ratings_file, files["ratings_normal"])
+    movies["Speed"] = {"id": 4, "genre": "romance"}
+    ratings["Speed"] = [4.5]
+    user_ratings[4] = {"Titanic": 1.0}
+
+    # --- Test 1: batch recommendations match genre_recommendations ---
+    batch = {u: (g, recs) for u, g, recs in rx.batch_genre_recommendations(movies, ratings, user_ratings, 3)}
+    single = {u: silent_call(mr.genre_recommendations, movies, ratings, user_ratings, u, 3) for u in user_ratings}
+    print_result("batch_genre_recommendations matches genre_recommendations", batch, single)
+
+    # --- Test 2: export + memory-mapped lookup round trip ---
+    path = os.path.join(tempfile.mkdtemp(prefix="rec_export_test_"), "recs.bin")
+    count = rx.export_recommendations(movies, ratings, user_ratings, path, k=3)
+    print_result("export_recommendations (users written)", count, 4)
+    with rx.RecommendationTable(path) as table:
+        print_result("lookup (user 4)", table.lookup(4), [("Speed", 4.5)])
+        print_result("lookup (no recommendations)", table.lookup(3), [])
+        print_result("lookup (unknown user)", table.lookup(999), None)
+        print_result("user_ids (sorted index)", table.user_ids(), [1, 2, 3, 4])
+
+    # --- Test 3: lists are truncated to k and order is preserved ---
+    rx.write_table(path, {7: [("A", 3.0), ("B", 2.5), ("C", 1.0)], -2: []}, k=2)
+    with rx.RecommendationTable(path) as table:
+        print_result("write_table (truncated to k)", table.lookup(7), [("A", 3.0), ("B", 2.5)])
+        print_result("write_table (negative user id)", table.lookup(-2), [])
+
+    # --- Test 4: reader rejects foreign files ---
+    with open(path, "wb") as f:
+        f.write(b"not a table" * 10)
+    try:
+        rx.RecommendationTable(path)
+        print_result("RecommendationTable (bad magic)", "no error", "ValueError")
+    except ValueError:
+        print_result("RecommendationTable (bad magic)", "ValueError", "ValueError")
+
+    # --- Test 5: empty and truncated files are rejected with ValueError ---
+    rx.write_table(path, {1: [("Inception", 4.5)], 2: [("Titanic", 3.0)]}, 2)
+    with open(path, "rb") as f:
+        whole = f.read()
+    results = []
+    for cut in (0, 10, rx.HEADER.size, len(whole) - 1):
+        with open(path, "wb") as f:
+            f.write(whole[:cut])
+        try:
+            rx.RecommendationTable(path).close()
+            results.append("no error")
+        except ValueError:
+            results.append("ValueError")
+    print_result("RecommendationTable (empty/truncated)", results, ["ValueError"] * 4)
+
+    print("\n🎉 ALL TESTS FINISHED 🎉")
+
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,74 @@
+import multiprocessing
+import movie_recommender as mr
+import shared_dataset as sd
+from test_movie_recommender import create_test_files, silent_call, print_result
+
+
+def _worker_read(control_name, queue):
+    """Attach from another process and report what it sees."""
+    client = sd.SharedDatasetClient(control_name)
+    view = client.dataset()
+    queue.put((view.version, view.top_n_movies(1), view.user_ratings(1),
+               view.arrays["movie_avg"].flags.writeable))
+    client.close()
+
+
+def run_tests():
+    print("🎬 Running automated tests for shared_dataset.py...\n")
+    files = create_test_files()
+    movies = silent_call(mr.load_movies_file, files["movies_normal"])
+    ratings, user_ratings = silent_call(mr.load_ratings_file, files["ratings_normal"])
+
+    publisher = sd.SharedDatasetPublisher()
+    client = None
+    try:
+        # --- Test 1: publish and read back in the same process ---
+        version = publisher.publish(movies, ratings, user_ratings)
+        client = sd.SharedDatasetClient(publisher.name)
+        view = client.dataset()
+        print_result("publish (version)", version, 1)
+        print_result("movie_average", view.movie_average("Titanic"), 2.75)
+        print_result("movie_average (unrated)", view.movie_average("Nope"), 0.0)
+        print_result("top_n_movies", view.top_n_movies(2), [("The Matrix", 5.0), ("Inception", 4.5)])
+        print_result("user_ratings", view.user_ratings(1), user_ratings[1])
+        print_result("user_ratings (unknown)", view.user_ratings(999), {})
+
+        # --- Test 2: a separate worker process attaches read-only ---
+        queue = multiprocessing.Queue()
+        proc = multiprocessing.Process(target=_worker_read, args=(publisher.name, queue))
+        proc.start()
+        seen = queue.get(timeout=30)
+        proc.join()
+        print_result("worker process view", seen, (1, [("The Matrix", 5.0)], user_ratings[1], False))
+
+        # --- Test 3: republishing switches readers to the new version ---
+        ratings2 = dict(ratings)
+        ratings2["Titanic"] = [5.0, 5.0]
+        publisher.publish(movies, ratings2, user_ratings)
+        view2 = client.dataset()
+        print_result("reload (version bump)", view2.version, 2)
+        print_result("reload (new data)", view2.movie_average("Titanic"), 5.0)
+
+        # --- Test 4: an array held across a version switch stays readable ---
+        held = view2.arrays["movie_avg"]
+        before = held.tolist()
+        ratings3 = dict(ratings)
+        ratings3["Titanic"] = [1.0]
+        publisher.publish(movies, ratings3, user_ratings)
+        view3 = client.dataset()
+        print_result("held array (switch ok)", view3.movie_average("Titanic"), 1.0)
+        print_result("held array (old data)", held.tolist(), before)
+        print_result("held array (close deferred)", len(client._retired), 1)
+        del held
+        client.dataset()
+        print_result("held array (released)", len(client._retired), 0)
+    finally:
+        if client is not None:
+            client.close()
+        publisher.close()
+
+    print("\n🎉 ALL TESTS FINISHED 🎉")
+
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,62 @@
+import random
+import string
+import title_index as ti
+from test_movie_recommender import capture_output, print_result
+
+
+def brute_force(titles, text, n, threshold):
+    """Reference fuzzy search: score every title."""
+    query = ti.trigrams(ti.normalize(text))
+    scored = []
+    for title in titles:
+        other = ti.trigrams(ti.normalize(title))
+        score = len(query & other) / len(query | other)
+        if score >= threshold:
+            scored.append((-score, ti.normalize(title), title))
+    scored.sort()
+    return [(title, round(-score, 9)) for score, _, title in scored[:n]]
+
+
+def run_tests():
+    print("🎬 Running automated tests for title_index.py...\n")
+    titles = ["The Matrix", "The Matrix Reloaded", "The Mask", "Titanic", "Inception", "Interstellar"]
+    index = ti.TitleIndex(titles)
+
+    # --- Test 1: exact and prefix lookups ---
+    print_result("exact (case-insensitive)", index.exact("  the   MATRIX "), "The Matrix")
+    print_result("prefix", index.prefix("the ma"), ["The Mask", "The Matrix", "The Matrix Reloaded"])
+    print_result("prefix (limit n)", index.prefix("in", 1), ["Inception"])
+    print_result("prefix (no match)", index.prefix("zzz"), [])
+
+    # --- Test 2: fuzzy lookups ---
+    print_result("fuzzy (misspelled)", index.fuzzy("teh matrx", 1)[0][0], "The Matrix")
+    print_result("fuzzy (nothing close)", index.fuzzy("qqqq"), [])
+
+    # --- Test 3: resolve picks exact, then unique prefix, then fuzzy ---
+    print_result("resolve (unique prefix)", index.resolve("titan"), "Titanic")
+    print_result("resolve (fuzzy)", index.resolve("intersteller"), "Interstellar")
+    print_result("resolve (none)", index.resolve("qqqq"), None)
+
+    # --- Test 4: fuzzy search matches a full scan ---
+    rng = random.Random(3)
+    words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 8))) for _ in range(300)]
+    many = list({" ".join(rng.choice(words) for _ in range(rng.randint(1, 3))).title() for _ in range(2000)})
+    big = ti.TitleIndex(many, max_candidates=len(many))
+    ok = True
+    for title in rng.sample(many, 20):
+        typo = title[:-1] + "x"
+        got = [(t, round(s, 9)) for t, s in big.fuzzy(typo, 5, 0.4)]
+        ok = ok and got == brute_force(many, typo, 5, 0.4)
+    print_result("fuzzy agrees with full scan", ok, True)
+
+    # --- Test 5: display helpers ---
+    output = capture_output(ti.show_title_search, index, "inter")
+    print_result("show_title_search (prefix)", "1. Interstellar" in output, True)
+    output = capture_output(ti.resolve_title, index, "titanik")
+    print_result("resolve_title (reports correction)", "Using closest match: 'Titanic'" in output, True)
+
+    print("\n🎉 ALL TESTS FINISHED 🎉")
+
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,200 @@
+"""
+title_index.py
+--------------
+Prefix and fuzzy title search, built once when a dataset is loaded.
+
+- Prefix search: titles are kept in a sorted array of lowercase keys, so
+  all titles starting with a prefix are one contiguous run found by
+  binary search.
+- Fuzzy search: each word of a title is padded ("  word ") and broken
+  into character trigrams ("  w", " wo", "wor", ...) and an inverted index (NumPy CSR arrays) maps every
+  trigram to the sorted ids of the titles containing it. A query only
+  collects candidates from the posting lists of its rarest trigrams (a
+  title sharing none of them cannot reach the similarity threshold),
+  finishes their overlap counts by binary search in the common lists,
+  and ranks them by trigram Jaccard similarity. Queries whose rare
+  trigrams still match more than max_candidates titles keep only the
+  candidates that hit the most of them, trading exactness for latency.
+
+Usage:
+    index = TitleIndex(movies.keys() | ratings.keys())
+    index.prefix("the ma")        # ['The Mask', 'The Matrix', ...]
+    index.fuzzy("teh matrx")      # [('The Matrix', 0.43), ...]
+    index.resolve("matrx")        # 'The Matrix'
+"""
+import bisect
+import math
+
+import numpy as np
+
+
+DEFAULT_THRESHOLD = 0.3
+DEFAULT_MAX_CANDIDATES = 2000
+
+
+def normalize(text):
+    """Lowercase and collapse whitespace, the form all lookups compare in."""
+    return " ".join(text.lower().split())
+
+
+def trigrams(text):
+    """Set of character trigrams of each word, padded with "  " before and " " after."""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _code(gram):
+    """Pack a trigram into one integer (21 bits per code point)."""
+    return (ord(gram[0]) << 42) | (ord(gram[1]) << 21) | ord(gram[2])
+
+
+class TitleIndex:
+    """Sorted-array prefix index plus trigram inverted index over titles."""
+
+    def __init__(self, titles, max_candidates=DEFAULT_MAX_CANDIDATES):
+        self.max_candidates = max_candidates
+        pairs = sorted({(normalize(t), t) for t in titles})
+        self._keys = [key for key, _ in pairs]
+        self.titles = [title for _, title in pairs]
+        self._exact = {}
+        for i, key in enumerate(self._keys):
+            self._exact.setdefault(key, i)
+        self._build_postings()
+
+    def _build_postings(self):
+        """
+        Inverted index as CSR arrays: the ids of titles containing trigram
+        g are _postings[_indptr[g]:_indptr[g + 1]], in ascending order.
+        Built with NumPy over all titles at once.
+        """
+        # "the matrix" -> "  the   matrix ": every word padded as "  word "
+        padded = [f"  {key.replace(' ', '   ')} " for key in self._keys]
+        lengths = np.fromiter(map(len, padded), dtype=np.int64, count=len(padded))
+        chars = np.frombuffer("".join(padded).encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+        title_of = np.repeat(np.arange(len(padded), dtype=np.int64), lengths)
+
+        # Trigrams ending in two spaces run past the end of a word; skip them
+        space = chars == ord(" ")
+        valid = np.zeros(len(chars), dtype=bool)
+        valid[:-2] = ~(space[1:-1] & space[2:])
+        starts = np.flatnonzero(valid)
+        codes = (chars[starts] << 42) | (chars[starts + 1] << 21) | chars[starts + 2]
+        owners = title_of[starts]
+
+        # Group by trigram (stable, so titles stay ascending) and drop repeats
+        order = np.argsort(codes, kind="stable")
+        codes, owners = codes[order], owners[order]
+        keep = np.ones(len(codes), dtype=bool)
+        keep[1:] = (codes[1:] != codes[:-1]) | (owners[1:] != owners[:-1])
+        codes, owners = codes[keep], owners[keep]
+
+        first = np.ones(len(codes), dtype=bool)
+        first[1:] = codes[1:] != codes[:-1]
+        self._codes = codes[first]                      # sorted distinct trigram codes
+        self._indptr = np.append(np.flatnonzero(first), len(codes))
+        self._postings = owners.astype(np.int32)
+        self._sizes = np.bincount(owners, minlength=len(padded))  # distinct trigrams per title
+
+    def __len__(self):
+        return len(self.titles)
+
+    def __contains__(self, title):
+        return normalize(title) in self._exact
+
+    def exact(self, title):
+        """The stored title matching ignoring case/spacing, or None."""
+        i = self._exact.get(normalize(title))
+        return None if i is None else self.titles[i]
+
+    def prefix(self, text, n=10):
+        """Up to n titles starting with text (case-insensitive), alphabetically."""
+        key = normalize(text)
+        start = bisect.bisect_left(self._keys, key)
+        out = []
+        for i in range(start, min(start + n, len(self._keys))):
+            if not self._keys[i].startswith(key):
+                break
+            out.append(self.titles[i])
+        return out
+
+    def fuzzy(self, text, n=5, threshold=DEFAULT_THRESHOLD):
+        """[(title, similarity), ...] best first, for titles at or above threshold."""
+        key = normalize(text)
+        if not key:
+            return []
+        query = trigrams(key)
+        if not len(self._codes):
+            return []
+        codes = np.array(sorted(_code(g) for g in query), dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self._codes, codes), len(self._codes) - 1)
+        known = pos[self._codes[pos] == codes]
+        known = known[np.argsort(self._indptr[known + 1] - self._indptr[known], kind="stable")]
+
+        # Jaccard >= t needs at least ceil(t * |query|) shared trigrams, so a
+        # match must contain one of the len(known) - ceil(t * |query|) + 1 rarest
+        probe = len(known) - math.ceil(threshold * len(query)) + 1
+        if probe <= 0:
+            return []
+        hits = np.concatenate([self._postings[self._indptr[g]:self._indptr[g + 1]] for g in known[:probe]])
+        candidates, shared = np.unique(hits, return_counts=True)
+        if len(candidates) > self.max_candidates:
+            best = np.argpartition(-shared, self.max_candidates)[:self.max_candidates]
+            best.sort()
+            candidates, shared = candidates[best], shared[best]
+
+        # Finish the overlap counts with a binary search in each common trigram's list
+        for g in known[probe:]:
+            posting = self._postings[self._indptr[g]:self._indptr[g + 1]]
+            at = np.minimum(np.searchsorted(posting, candidates), len(posting) - 1)
+            shared += posting[at] == candidates
+
+        scores = shared / (len(query) + self._sizes[candidates] - shared)
+        ok = scores >= threshold
+        candidates, scores = candidates[ok], scores[ok]
+        order = np.lexsort((candidates, -scores))[:n]
+        return [(self.titles[i], float(scores[j])) for j, i in zip(order.tolist(), candidates[order].tolist())]
+
+    def resolve(self, text, threshold=DEFAULT_THRESHOLD):
+        """
+        Best single title for user input: an exact match, else the only
+        prefix match, else the closest fuzzy match. None if nothing fits.
+        """
+        found = self.exact(text)
+        if found is not None:
+            return found
+        matches = self.prefix(text, 2)
+        if len(matches) == 1:
+            return matches[0]
+        best = self.fuzzy(text, 1, threshold)
+        return best[0][0] if best else None
+
+
+def show_title_search(index, text, n=10):
+    """Display prefix matches, then fuzzy matches, for a partial title."""
+    matches = index.prefix(text, n)
+    if matches:
+        print(f"\n🔎 Titles starting with '{text}':")
+        for i, title in enumerate(matches, 1):
+            print(f"{i}. {title}")
+        return
+    close = index.fuzzy(text, n)
+    if not close:
+        print(f"No titles match '{text}'.")
+        return
+    print(f"\n🔎 Closest titles to '{text}':")
+    for i, (title, score) in enumerate(close, 1):
+        print(f"{i}. {title} — {score:.2f}")
+
+
+def resolve_title(index, text):
+    """Map user input to a known title, saying so when it was corrected."""
+    text = text.strip()
+    found = index.resolve(text)
+    if found is None:
+        return text.title()
+    if normalize(found) != normalize(text):
+        print(f"🔎 Using closest match: '{found}'")
+    return found